@@ -0,0 +1,192 @@
+"""
+Benchmark per stage pipeline counting (reproducible, CPU-only dengan FakeYOLO).
+
+    PYTHONPATH=src python benchmarks/bench_pipeline.py --out bench.json
+    PYTHONPATH=src python benchmarks/bench_pipeline.py --baseline benchmarks/baseline.json
+    PYTHONPATH=src python benchmarks/bench_pipeline.py --clip rekaman.mp4 --real-model
+
+Stage: screen_grab (jika ada display), detect_persons, count_in_aoi_rect,
+count_in_aoi_poly, tracker_update, draw_frame (resize ke canvas + konversi warna).
+Hasil: latency p50/p95/p99 (ms) + throughput (ops/s) per stage per resolusi,
+disimpan sebagai JSON; --baseline membandingkan p50 dan exit 1 bila regresi.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from fake_model import FakeYOLO
+
+from vas.detection import detect_persons, detect_persons_array
+from vas.utils.aoi import AOIIndex, count_in_aoi
+from vas.utils.display import DisplayBuffer
+from vas.utils.screen_capture import ScreenCapturer
+from vas.tracking.person_tracker import PersonTracker
+
+DEFAULT_RESOLUTIONS = "640x360,1280x720,1920x1080"
+CANVAS = (960, 540)
+
+def percentiles(samples_ms):
+    a = np.asarray(samples_ms, dtype=np.float64)
+    mean = float(a.mean())
+    return {
+        "p50_ms": round(float(np.percentile(a, 50)), 4),
+        "p95_ms": round(float(np.percentile(a, 95)), 4),
+        "p99_ms": round(float(np.percentile(a, 99)), 4),
+        "mean_ms": round(mean, 4),
+        "throughput_per_s": round(1000.0 / mean, 1) if mean > 0 else None,
+        "n": int(a.size),
+    }
+
+def time_stage(fn, inputs, iters, warmup=5):
+    for i in range(min(warmup, iters)):
+        fn(inputs[i % len(inputs)])
+    samples = []
+    for i in range(iters):
+        x = inputs[i % len(inputs)]
+        t0 = time.perf_counter()
+        fn(x)
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    return percentiles(samples)
+
+def synthetic_frames(w, h, n=8, seed=0):
+    rng = np.random.default_rng(seed)
+    frames = []
+    for i in range(n):
+        fr = rng.integers(0, 255, size=(h, w, 3), dtype=np.uint8)
+        fr[0, 0, 0] = i     # seed deteksi FakeYOLO per frame
+        frames.append(fr)
+    return frames
+
+def clip_frames(path, n=64):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < n:
+        ret, fr = cap.read()
+        if not ret:
+            break
+        frames.append(fr)
+    cap.release()
+    return frames
+
+def aoi_for(w, h):
+    rect = AOIIndex("rect", [int(w*0.1), int(h*0.5), int(w*0.9), int(h*0.95)])
+    # polygon tangan-bebas ~60 titik di sekitar tepi kolam
+    t = np.linspace(0, 2*np.pi, 60, endpoint=False)
+    r = 0.35 + 0.05*np.sin(7*t)
+    pts = np.stack([w*(0.5 + r*np.cos(t)), h*(0.7 + 0.5*r*np.sin(t))], 1).astype(int).tolist()
+    poly = AOIIndex("poly", None, pts)
+    return rect, poly
+
+_display = DisplayBuffer()
+
+def draw_frame_convert(fr):
+    # sama dengan App.draw_frame tanpa Tk: resize ke buffer canvas, BGR→RGB, PIL
+    _display.fit(fr, *CANVAS)
+    return Image.fromarray(_display.to_rgb())
+
+def bench_resolution(label, frames, model, iters, results):
+    h, w = frames[0].shape[:2]
+    key = lambda stage: f"{stage}@{label}"
+    results[key("detect_persons")] = time_stage(lambda f: detect_persons(model, f), frames, iters)
+    dets = [detect_persons_array(model, f) for f in frames]
+    rect, poly = aoi_for(w, h)
+    results[key("count_in_aoi_rect")] = time_stage(lambda d: count_in_aoi(d, rect), dets, iters)
+    results[key("count_in_aoi_poly")] = time_stage(lambda d: count_in_aoi(d, poly), dets, iters)
+    tracker = PersonTracker()
+    results[key("tracker_update")] = time_stage(tracker.update, dets, iters)
+    results[key("draw_frame")] = time_stage(draw_frame_convert, frames, iters)
+
+def bench_screen(iters, results):
+    cap = ScreenCapturer(True)
+    region = (0, 0, 1280, 720)
+    try:
+        if cap.grab(region) is None:
+            return
+    except Exception as e:
+        results["screen_grab@1280x720"] = {"skipped": str(e)[:120]}
+        return
+    results["screen_grab@1280x720"] = time_stage(lambda r: cap.grab(r), [region], iters)
+
+def compare(results, baseline, tolerance, min_delta_ms=0.05):
+    """→ list regresi (stage, base_p50, now_p50); selisih < min_delta_ms dianggap noise."""
+    regressions = []
+    for k, base in baseline.get("results", {}).items():
+        now = results.get(k)
+        if not now or "p50_ms" not in now or "p50_ms" not in base:
+            continue
+        if (now["p50_ms"] > base["p50_ms"] * (1 + tolerance)
+                and now["p50_ms"] - base["p50_ms"] >= min_delta_ms):
+            regressions.append((k, base["p50_ms"], now["p50_ms"]))
+    return regressions
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark stage pipeline counting")
+    ap.add_argument("--resolutions", default=DEFAULT_RESOLUTIONS)
+    ap.add_argument("--iters", type=int, default=200)
+    ap.add_argument("--clip", action="append", default=[], help="video rekaman (boleh berulang)")
+    ap.add_argument("--real-model", action="store_true", help="pakai load_model() alih-alih FakeYOLO")
+    ap.add_argument("--persons", type=int, default=40, help="jumlah orang per frame (FakeYOLO)")
+    ap.add_argument("--no-screen", action="store_true")
+    ap.add_argument("--out", default="bench.json")
+    ap.add_argument("--baseline", help="JSON hasil sebelumnya untuk dibandingkan")
+    ap.add_argument("--tolerance", type=float, default=0.15, help="batas regresi p50 (relatif)")
+    ap.add_argument("--min-delta-ms", type=float, default=0.05, help="selisih p50 minimum agar dihitung regresi")
+    args = ap.parse_args(argv)
+
+    if args.real_model:
+        from vas.model_loader import load_model
+        model = load_model()
+    else:
+        model = FakeYOLO(n_persons=args.persons)
+
+    results = {}
+    for res in [r for r in args.resolutions.split(",") if r]:
+        w, h = (int(v) for v in res.lower().split("x"))
+        bench_resolution(res, synthetic_frames(w, h), model, args.iters, results)
+    for path in args.clip:
+        frames = clip_frames(path)
+        if frames:
+            bench_resolution(f"clip:{path}", frames, model, args.iters, results)
+    if not args.no_screen:
+        bench_screen(args.iters, results)
+
+    report = {
+        "meta": {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "model": "real" if args.real_model else f"fake:{args.persons}",
+            "iters": args.iters,
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        },
+        "results": results,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    width = max(len(k) for k in results)
+    print(f"{'stage':<{width}}  {'p50':>9} {'p95':>9} {'p99':>9} {'ops/s':>10}")
+    for k, r in results.items():
+        if "p50_ms" in r:
+            print(f"{k:<{width}}  {r['p50_ms']:>9.3f} {r['p95_ms']:>9.3f} {r['p99_ms']:>9.3f} {r['throughput_per_s']:>10}")
+        else:
+            print(f"{k:<{width}}  skipped ({r.get('skipped')})")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+        for k, b, n in regressions:
+            print(f"REGRESI {k}: p50 {b:.3f}ms → {n:.3f}ms")
+        if regressions:
+            return 1
+        print("Tidak ada regresi terhadap baseline.")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
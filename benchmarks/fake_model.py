@@ -0,0 +1,43 @@
+"""
+Model palsu berantarmuka Ultralytics YOLO untuk benchmark CPU-only:
+mengembalikan `n_persons` box acak (deterministik per frame) dalam format
+results[i].boxes.data (N x 6: x1,y1,x2,y2,conf,cls), tanpa torch.
+"""
+import time
+import numpy as np
+
+class _Boxes:
+    def __init__(self, data):
+        self.data = data
+
+class _Result:
+    def __init__(self, data):
+        self.boxes = _Boxes(data)
+
+class FakeYOLO:
+    def __init__(self, n_persons=40, n_other=5, cost_ms_per_mpix=0.0, seed=0):
+        self.n_persons = n_persons
+        self.n_other = n_other
+        self.cost_ms_per_mpix = cost_ms_per_mpix   # simulasi biaya inferensi
+        self.seed = seed
+
+    def _boxes(self, h, w, rng):
+        n = self.n_persons + self.n_other
+        x1 = rng.uniform(0, w * 0.95, n)
+        y1 = rng.uniform(0, h * 0.9, n)
+        bw = rng.uniform(8, max(9, w * 0.05), n)
+        bh = rng.uniform(16, max(17, h * 0.15), n)
+        conf = rng.uniform(0.2, 0.95, n)
+        cls = np.r_[np.zeros(self.n_persons), rng.integers(1, 80, self.n_other)]
+        return np.stack([x1, y1, np.minimum(x1 + bw, w - 1), np.minimum(y1 + bh, h - 1), conf, cls], 1).astype(np.float32)
+
+    def __call__(self, source, **kw):
+        frames = source if isinstance(source, list) else [source]
+        out = []
+        for fr in frames:
+            h, w = fr.shape[:2]
+            if self.cost_ms_per_mpix:
+                time.sleep(self.cost_ms_per_mpix * h * w / 1e9)
+            rng = np.random.default_rng(self.seed + int(fr[0, 0, 0]))
+            out.append(_Result(self._boxes(h, w, rng)))
+        return out
@@ -1,14 +1,23 @@
 import time
-from typing import Dict, List, Any, Optional
+from collections import deque
+from typing import Dict, Any, Optional
+from ..metrics import ALERTS
+from ..utils.timeseries import SlidingWindow, LagBuffer
+
+HISTORY_SEC = 600
 
 class AlertManager:
     def __init__(self, cfg: dict, db=None):
         self.cfg = cfg
         self.db = db
         self.last_fire: Dict[str, float] = {}
-        self.occupancy_history: List[tuple] = []
-        self.alerts: List[Dict[str, Any]] = []
         self.keep_max = 120
+        self.alerts = deque(maxlen=self.keep_max)
+        # statistik occupancy per frame: O(1) per sampel (waktu monotonic)
+        self.occupancy_history = SlidingWindow(HISTORY_SEC)
+        self._surge_interval = None
+        self._surge_window = None
+        self._surge_lag = None
 
     def _cooldown_ok(self, key: str) -> bool:
         cd = self.cfg.get("cooldown_sec", 30)
@@ -28,8 +37,7 @@ class AlertManager:
             "occupancy": occupancy
         }
         self.alerts.append(a)
-        if len(self.alerts) > self.keep_max:
-            self.alerts.pop(0)
+        ALERTS.labels(type=atype).inc()
         if self.db:
             try:
                 self.db.insert_alert(atype, msg, occupancy, meta)
@@ -37,28 +45,46 @@ class AlertManager:
                 pass
         return a
 
-    def record_occ(self, occ: int):
-        now = time.time()
-        self.occupancy_history.append((now, occ))
-        self.occupancy_history = [x for x in self.occupancy_history if now - x[0] <= 600]
+    def _surge_buffers(self):
+        interval = self.cfg.get("surge_interval_sec", 60)
+        if interval != self._surge_interval:
+            self._surge_interval = interval
+            self._surge_window = SlidingWindow(interval)
+            self._surge_lag = LagBuffer(interval, max_age=HISTORY_SEC)
+        return self._surge_window, self._surge_lag
+
+    def record_occ(self, occ: int, now: Optional[float] = None):
+        now = time.monotonic() if now is None else now
+        self.occupancy_history.append(now, occ)
+        window, lag = self._surge_buffers()
+        window.append(now, occ)
+        lag.append(now, occ)
+
+    def occupancy_stats(self) -> Dict[str, Any]:
+        h = self.occupancy_history
+        return {"current": h.last(), "mean": round(h.mean(), 2), "peak": h.max(), "low": h.min(),
+                "samples": len(h)}
 
     def check_capacity(self, occ: int):
         cap = self.cfg.get("capacity_threshold", -1)
         if cap > 0 and occ > cap and self._cooldown_ok("capacity"):
             self.add_alert("CAPACITY", f"Occupancy {occ} > {cap}", occupancy=occ)
 
-    def check_surge(self):
+    def check_surge(self, now: Optional[float] = None):
         need = self.cfg.get("surge_count", 0)
         interval = self.cfg.get("surge_interval_sec", 60)
         if need <= 0 or not self.occupancy_history:
             return
-        now = time.time()
-        current = self.occupancy_history[-1][1]
-        baseline = None
-        for t,o in reversed(self.occupancy_history):
-            if now - t >= interval:
-                baseline = o
-                break
+        now = time.monotonic() if now is None else now
+        current = self.occupancy_history.last()
+        window, lag = self._surge_buffers()
+        if self.cfg.get("surge_baseline", "lagged") == "min":
+            # baseline = occupancy terendah dalam interval terakhir
+            window.expire(now)
+            baseline = window.min()
+        else:
+            # baseline = sampel terbaru yang berumur >= interval
+            baseline = lag.value(now)
         if baseline is None:
             return
         delta = current - baseline
@@ -84,7 +110,7 @@ class AlertManager:
             snapshot_cb(summary)
 
     def recent(self, last_n=30):
-        return self.alerts[-last_n:]
+        return list(self.alerts)[-last_n:]
 
     def clear(self):
         self.alerts.clear()
\ No newline at end of file
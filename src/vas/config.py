@@ -9,37 +9,116 @@ DEFAULT_SETTINGS = {
         "confidence_threshold": 0.35,
         "iou_threshold": 0.50,
         "detection_confidence": 0.30,
-        "device": "auto"
+        "device": "auto",
+        "backend": "torch",         # torch | onnxruntime | openvino (ekspor di-cache di sebelah .pt)
+        "export_dynamic": False     # paksa ekspor shape dinamis (otomatis untuk batch / tiled / aoi_crop / adapt_imgsz)
     },
     "runtime": {
         "imgsz": 640,
         "use_half": True,
         "detection_stride": 1,
-        "flush_frames": 2,
-        "use_mss_screen_capture": True
+        "use_mss_screen_capture": True,
+        "screen_capture_fps": 15,   # batas laju grab layar (0 = tanpa batas)
+        "max_batch_size": 4,        # frame per forward pass (batched inference)
+        "batch_max_wait_ms": 15,    # tunggu maksimum frame source lain untuk mengisi batch (scheduler)
+        "render_queue_size": 2,     # antrian inferensi → render (drop-oldest)
+        "display_fps": 15,          # batas refresh tampilan, terpisah dari laju inferensi
+        "aoi_crop": False,          # inferensi hanya pada bbox AOI (+margin), imgsz persegi panjang
+        "aoi_crop_margin": 0.15,    # margin relatif terhadap ukuran bbox AOI
+        "tiled": False,             # inferensi per tile untuk capture resolusi tinggi
+        "tile_size": 640,
+        "tile_overlap": 0.2,
+        "tile_with_full": True,     # tambah frame utuh ke batch tile
+        "tile_nms_threshold": 0.6   # NMS lintas tile (intersection / area terkecil)
     },
     "input": {
-        "type": "screen",       # screen | webcam | network
+        "type": "screen",       # screen | webcam | network | file
         "webcam_index": 0,
         "stream_url": "",
-        "screen_region": None
+        "screen_region": None,
+        "file_path": "",        # input file: video rekaman (vas-offline / headless)
+        "file_stride": 1,       # proses tiap N frame
+        "file_seek_threshold": 30,  # stride >= ini: seek, bukan grab()
+        "file_output": ""       # default: <video>.occupancy.csv
     },
     "aoi": {
         "mode": "rect",         # rect | poly
         "rect": None,           # [x1,y1,x2,y2]
         "polygon": []           # [[x,y],...]
     },
+    # multi-source (vas-headless): [{"name", "input": {...}, "aoi": {...},
+    # "priority", "weight", "target_fps", "max_frame_age_ms"}, ...],
+    # kosong = satu source dari input + aoi di atas (lihat sources.py)
+    "sources": [],
+    "scheduler": {
+        "mode": "weighted",         # weighted | round_robin (antar source dengan priority sama)
+        "max_frame_age_ms": 1000,   # default per source: frame lebih tua dibuang
+        "max_batch_size": None,     # frame lintas source per batch (default: runtime.max_batch_size)
+        "batch_max_wait_ms": None,  # default: runtime.batch_max_wait_ms
+        "rate_window_sec": 5        # jendela laju tercapai per source
+    },
     "alerts": {
         "enabled": True         # toggle dari UI
     },
+    "headless": {
+        "log_interval_sec": 5       # interval log occupancy (vas-headless)
+    },
+    "adaptive_stride": {
+        "enable": False,            # atur detection_stride otomatis dari beban
+        "target_share": 0.6,        # porsi waktu antar frame untuk inferensi
+        "min_stride": 1,
+        "max_stride": 8,
+        "adapt_imgsz": False,       # turunkan imgsz bila latency > target
+        "target_latency_ms": 100,
+        "min_imgsz": 320,
+        "max_imgsz": None,          # default: runtime.imgsz
+        "interval_sec": 1.0
+    },
+    "motion": {
+        "enable": False,            # lewati YOLO bila AOI statis
+        "width": 160,               # lebar frame diperkecil untuk differencing
+        "threshold": 12,            # selisih intensitas per piksel
+        "min_area": 0.002,          # fraksi piksel berubah agar dianggap gerak
+        "max_interval_sec": 10      # refresh inferensi paksa
+    },
+    "metrics": {
+        "enable": False,            # exporter Prometheus lokal
+        "host": "127.0.0.1",
+        "port": 9108
+    },
+    "tracking": {
+        "min_detection_size": 10,       # px, sisi bbox minimum
+        "max_match_distance": 80,       # px, jarak centroid maksimum
+        "max_track_lost_frames": 30,
+        "predict_skipped": False,       # prediksi box / AOI pada frame tanpa inferensi
+        "predict_alpha": 1.0,           # gain posisi saat koreksi (<1 meredam jitter)
+        "predict_beta": 0.5,            # gain kecepatan saat koreksi
+        "predict_lost_decay": 0.5       # redam kecepatan track hilang per update (track hilang tidak diprediksi)
+    },
+    "rollup": {
+        "enable": False,            # agregat occupancy per detik / menit / jam
+        "persist": ["1s", "1m", "1h"],  # resolusi yang ditulis ke database
+        "keep": {"1s": 3600, "1m": 1440, "1h": 168},   # bucket tertutup di memori
+        "flush_interval_sec": 10    # kirim bucket tertutup ke DBManager
+    },
     "database": {
         "enable": False,
-        "type": "mysql",
+        "type": "mysql",            # mysql | sqlite
         "host": "localhost",
         "port": 3306,
         "user": "vas_user",
         "password": "your_password_here",
-        "name": "vas_db"
+        "name": "vas_db",
+        "pool_size": 2,             # koneksi / writer thread
+        "batch_size": 200,          # baris per executemany / transaksi
+        "batch_wait_ms": 200,       # tunggu baris lain bergabung ke batch
+        "queue_max": 10000,         # batas antrian write-behind (drop-oldest)
+        "connect_timeout": 5,
+        "max_backoff_sec": 60,
+        "record_interval_sec": 0,   # >0: simpan occupancy otomatis tiap N detik
+        "sqlite_path": "vas_local.db",
+        "sync_to_mysql": False,     # sqlite: dorong baris lokal ke MySQL (host/port/... di atas)
+        "sync_interval_sec": 300
     }
 }
 
@@ -50,6 +129,16 @@ def deep_update(base, new):
         else:
             base[k] = v
 
+def parse_setting(old, text):
+    """Teks dari dialog settings → tipe nilai lama (bool dicek sebelum int: bool juga int)."""
+    text = str(text).strip()
+    if isinstance(old, bool):
+        return text.lower() in ("1", "true", "yes", "on")
+    if isinstance(old, (int, float)):
+        v = float(text)     # field int tetap menerima pecahan (mis. record_interval_sec 0.5)
+        return int(v) if isinstance(old, int) and v.is_integer() else v
+    return text
+
 class Settings:
     def __init__(self):
         self.data = json.loads(json.dumps(DEFAULT_SETTINGS))
@@ -68,6 +157,19 @@ class Settings:
                 json.dump(self.data, f, indent=2)
         except Exception:
             pass
+    def save_keys(self, section, **values):
+        """Tulis hanya key ini ke settings.json; isi file lain (dan config runtime di memori) tidak ikut."""
+        self.data[section].update(values)
+        disk = {}
+        try:
+            if SETTINGS_FILE.exists():
+                with open(SETTINGS_FILE, "r", encoding="utf-8") as f:
+                    disk = json.load(f)
+        except Exception:
+            pass
+        disk.setdefault(section, {}).update(values)
+        with open(SETTINGS_FILE, "w", encoding="utf-8") as f:
+            json.dump(disk, f, indent=2)
 
 settings = Settings()
 
@@ -77,5 +179,14 @@ INPUT_CONFIG = settings.data["input"]
 AOI_CONFIG = settings.data["aoi"]
 ALERT_CONFIG = settings.data["alerts"]
 DB_CONFIG = settings.data["database"]
+TRACKING_CONFIG = settings.data["tracking"]
+MOTION_CONFIG = settings.data["motion"]
+ADAPTIVE_STRIDE_CONFIG = settings.data["adaptive_stride"]
+HEADLESS_CONFIG = settings.data["headless"]
+METRICS_CONFIG = settings.data["metrics"]
+ROLLUP_CONFIG = settings.data["rollup"]
+SOURCES_CONFIG = settings.data["sources"]
+SCHEDULER_CONFIG = settings.data["scheduler"]
 
-CLASS_PERSON = 0
\ No newline at end of file
+CLASS_PERSON = 0
+PERSON_CLASSES = (CLASS_PERSON,)
\ No newline at end of file
@@ -0,0 +1,155 @@
+"""
+Sesi counting per source: deteksi (tiap detection_stride frame) + hitung AOI.
+Dipakai bersama oleh GUI (main.App) dan mode headless. Dengan motion.enable,
+frame tanpa gerakan di AOI memakai ulang deteksi terakhir (lihat utils.motion).
+Dengan adaptive_stride.enable, stride/imgsz diatur StrideController.
+Dengan tracking.predict_skipped, frame yang dilewati stride memakai box hasil
+prediksi PersonTracker (kecepatan konstan) sehingga box, occupancy, dan
+transisi alert tetap mengikuti gerak orang di antara inferensi; frame yang
+dilewati motion gate tetap memakai ulang deteksi terakhir.
+Dengan rollup.enable, occupancy tiap frame dilipat ke OccupancyRollup
+(agregat per detik / menit / jam; pemanggil men-drain ke DBManager).
+"""
+import time
+
+from .config import RUNTIME_CONFIG, MOTION_CONFIG, ADAPTIVE_STRIDE_CONFIG, TRACKING_CONFIG, ROLLUP_CONFIG
+from .detection import detect_persons_array
+from .utils.aoi import AOIIndex, count_in_aoi
+from .utils.motion import MotionGate
+from .utils.rollup import OccupancyRollup
+from .utils.stride_control import StrideController
+from .tracking.person_tracker import PersonTracker
+from .utils.stage_queue import StageStats
+from .metrics import (FRAMES_PROCESSED, DETECT_LATENCY, AOI_LATENCY, OCCUPANCY,
+                      CAPTURE_TO_COUNT, CAPTURE_TO_ALERT, ALERTS, INFER_SKIPPED,
+                      EFFECTIVE_STRIDE, EFFECTIVE_IMGSZ)
+
+class CountingSession:
+    def __init__(self, model, aoi_index=None, name="default"):
+        self.model = model
+        self.aoi_index = aoi_index or AOIIndex()
+        self.name = name
+        self.frame_idx = 0
+        self.occupancy = 0
+        self.inferences = 0
+        self.skipped = 0            # inferensi dilewati motion gate
+        self.motion = MotionGate(MOTION_CONFIG)
+        self._last = None           # (dets, inside) inferensi terakhir
+        self.tracker = PersonTracker() if TRACKING_CONFIG.get("predict_skipped") else None
+        self.stride_ctl = StrideController(ADAPTIVE_STRIDE_CONFIG, RUNTIME_CONFIG.get("detection_stride", 1),
+                                           RUNTIME_CONFIG.get("imgsz", 640))
+        self.rollup = OccupancyRollup(ROLLUP_CONFIG, name) if ROLLUP_CONFIG.get("enable") else None
+        self.alert_state = None     # None | occupied | clear
+        self.last_ts = 0.0          # timestamp capture frame terakhir
+        self.stats = StageStats()
+        self._m_frames = FRAMES_PROCESSED.labels(source=name)
+        self._m_detect = DETECT_LATENCY.labels(source=name)
+        self._m_aoi = AOI_LATENCY.labels(source=name)
+        self._m_occ = OCCUPANCY.labels(source=name)
+        self._m_e2e = CAPTURE_TO_COUNT.labels(source=name)
+        self._m_alert = CAPTURE_TO_ALERT.labels(source=name)
+        self._m_skipped = INFER_SKIPPED.labels(source=name)
+        self._m_stride = EFFECTIVE_STRIDE.labels(source=name)
+        self._m_imgsz = EFFECTIVE_IMGSZ.labels(source=name)
+
+    def process(self, frame, ts=None, seq=None):
+        """
+        → (dets, inside) jika inferensi dijalankan pada frame ini (atau box
+        prediksi tracker bila predict_skipped), selain itu (None, None).
+        ts: timestamp capture frame (time.time()) untuk latency end-to-end.
+        seq: nomor urut frame dari LatestFrameSlot (laju kedatangan frame).
+        """
+        need, val = self.begin(frame, ts, seq)
+        if not need:
+            return val
+        t0 = time.perf_counter()
+        dets = detect_persons_array(self.model, frame, self.aoi_index, val)
+        return self.finish(dets, time.perf_counter() - t0)
+
+    def begin(self, frame, ts=None, seq=None):
+        """
+        Tahap 1 (stride + motion gate) → (True, imgsz) bila frame perlu
+        inferensi, atau (False, hasil process). Scheduler memakai begin/finish
+        agar inferensi beberapa source bisa digabung dalam satu batch.
+        """
+        self.last_ts = ts or time.time()
+        self._m_frames.inc()
+        ctl = self.stride_ctl if self.stride_ctl.enabled else None
+        if ctl:
+            ctl.observe_frame(self.last_ts, seq)
+            stride, imgsz = ctl.stride, ctl.imgsz
+        else:
+            stride, imgsz = max(1, int(RUNTIME_CONFIG.get("detection_stride",1))), None
+        run_det = (self.frame_idx % stride == 0)
+        self.frame_idx += 1
+        if not run_det:
+            return False, self._done(self._predict() if self.tracker is not None else (None, None))
+        if (MOTION_CONFIG.get("enable") and self._last is not None
+                and not self.motion.should_infer(frame, None if self.aoi_index.is_empty() else self.aoi_index)):
+            self.skipped += 1
+            self._m_skipped.inc()
+            # AOI statis: pakai ulang deteksi terakhir, tanpa prediksi gerak
+            if self.tracker is not None:
+                self.tracker.hold()
+            dets, inside = self._last
+            self.occupancy = int(inside.sum())
+            self._m_occ.set(self.occupancy)
+            return False, self._done(self._last)
+        self._m_stride.set(stride)
+        self._m_imgsz.set(imgsz or RUNTIME_CONFIG.get("imgsz", 640))
+        return True, imgsz
+
+    def finish(self, dets, infer_sec):
+        """Tahap 2: deteksi frame dari begin (infer_sec: latency inferensi / porsi batch) → (dets, inside)."""
+        if self.stride_ctl.enabled:
+            self.stride_ctl.observe_inference(infer_sec)
+        t1 = time.perf_counter()
+        occ, inside = count_in_aoi(dets, self.aoi_index)
+        if self.tracker is not None:
+            self.tracker.update(dets)
+            self.tracker.update_occupancy(aoi_index=self.aoi_index)
+        aoi_sec = time.perf_counter() - t1
+        self.stats.add(infer_sec + aoi_sec)
+        self._m_detect.observe(infer_sec)
+        self._m_aoi.observe(aoi_sec)
+        self._m_occ.set(occ)
+        self._m_e2e.observe(max(0.0, time.time() - self.last_ts))
+        self.inferences += 1
+        self.occupancy = occ
+        self._last = (dets, inside)
+        return self._done((dets, inside))
+
+    def _done(self, res):
+        if self.rollup is not None:
+            self.rollup.add(self.occupancy, self.last_ts)
+        return res
+
+    def _predict(self):
+        self.tracker.predict()
+        self.tracker.update_occupancy(aoi_index=self.aoi_index)
+        dets, inside = self.tracker.live_detections()
+        self.occupancy = int(inside.sum())
+        self._m_occ.set(self.occupancy)
+        return dets, inside
+
+    def observe_alert(self, atype):
+        ALERTS.labels(type=atype).inc()
+        self._m_alert.observe(max(0.0, time.time() - self.last_ts))
+
+    def alert_transition(self):
+        """'occupied' / 'clear' saat status berubah, selain itu None."""
+        state = "occupied" if self.occupancy > 0 else "clear"
+        if state == self.alert_state:
+            return None
+        self.alert_state = state
+        self.observe_alert(state)
+        return state
+
+    def reset(self):
+        self.frame_idx = 0
+        self.occupancy = 0
+        self.alert_state = None
+        self._last = None
+        self.motion.reset()
+        if self.tracker is not None:
+            self.tracker.reset()
@@ -1,73 +1,212 @@
-import pymysql
-import json
+import threading
+import time
+from collections import deque
+from datetime import datetime
 from .config import DB_CONFIG
+from .metrics import DB_QUEUE_DEPTH, DB_ROWS_WRITTEN, DB_ROWS_DROPPED, DB_WRITE_LATENCY, DB_WRITE_LAG
+from .storage.mysql_store import MySQLStore
+from .storage.sqlite_store import SQLiteStore
 
-SCHEMA_PERSON_COUNTS = """
-CREATE TABLE IF NOT EXISTS vas_person_counts (
-    id BIGINT AUTO_INCREMENT PRIMARY KEY,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    occupancy INT NOT NULL,
-    note VARCHAR(255) NULL
-) ENGINE=InnoDB;
-"""
+BACKENDS = {
+    "mysql": MySQLStore,
+    "sqlite": SQLiteStore,
+}
+
+def make_backend(cfg):
+    return BACKENDS.get(cfg.get("type", "mysql"), MySQLStore)(cfg)
 
 class DBManager:
+    """
+    Write-behind: insert_* hanya memasukkan baris ke antrian (tanpa latensi di
+    thread pemanggil). Worker background menguras antrian per batch ke backend
+    (MySQL dengan pool koneksi, atau SQLite lokal), memori dibatasi queue_max
+    (drop-oldest), dan reconnect memakai exponential backoff.
+    Untuk backend sqlite dengan sync_to_mysql, baris lokal didorong ke MySQL
+    tiap sync_interval_sec (storage/sync.py).
+    Antrian berisi (tabel, baris): snapshot occupancy dan bucket rollup
+    (utils/rollup.py) ditulis dalam batch / transaksi yang sama.
+    """
     def __init__(self, status_callback=None):
         self.cfg = DB_CONFIG
-        self.conn = None
         self.status_callback = status_callback
+        self.backend = None
+        self._q = deque()
+        self._cond = threading.Condition()
+        self._workers = []
+        self._running = False
+        self._stop_evt = threading.Event()
+        self._inflight = 0
+        self._backoff = 0.0
+        self._retry_at = 0.0
+        self.connected = None       # None = belum pernah dicoba
+        self.written = 0
+        self.dropped = 0
+        self.synced = 0
+        DB_QUEUE_DEPTH.set_function(self.queue_depth)
         if self.cfg.get("enable"):
             self.connect()
 
+    # ---- status / worker ----
+    def _set_status(self, ok: bool):
+        if ok == self.connected:
+            return
+        self.connected = ok
+        if self.status_callback:
+            self.status_callback(ok)
+
     def connect(self):
-        try:
-            self.conn = pymysql.connect(
-                host=self.cfg["host"],
-                port=int(self.cfg["port"]),
-                user=self.cfg["user"],
-                password=self.cfg["password"],
-                database=self.cfg["name"],
-                autocommit=True,
-                charset="utf8mb4"
-            )
-            self._init_tables()
-            if self.status_callback:
-                self.status_callback(True)
-        except Exception:
-            self.conn = None
-            if self.status_callback:
-                self.status_callback(False)
-
-    def _init_tables(self):
-        if not self.conn:
+        """Non-blocking: (re)start worker; koneksi dibuka di background."""
+        if self._running and self.backend is not None and self.backend.name != self.cfg.get("type", "mysql"):
+            self.close(flush=False)     # tipe backend berubah
+        with self._cond:
+            if self.backend is not None:
+                self.backend.reset()    # koneksi lama (mungkin host lama)
+            self._backoff = 0.0
+            self._retry_at = 0.0
+            self._cond.notify_all()
+        if self._running:
             return
-        cur = self.conn.cursor()
-        cur.execute(SCHEMA_PERSON_COUNTS)
+        self.backend = make_backend(self.cfg)
+        self._running = True
+        self._stop_evt.clear()
+        self._workers = [threading.Thread(target=self._worker_loop, name=f"db-writer-{i}", daemon=True)
+                         for i in range(self.backend.max_writers)]
+        if self.backend.name == "sqlite" and self.cfg.get("sync_to_mysql"):
+            self._workers.append(threading.Thread(target=self._sync_loop, name="db-sync", daemon=True))
+        for t in self._workers:
+            t.start()
 
     def is_connected(self):
-        return self.conn is not None
+        return bool(self.connected)
+
+    def queue_depth(self):
+        return len(self._q)
+
+    def _take_batch(self):
+        batch_size = max(1, int(self.cfg.get("batch_size", 200)))
+        batch_wait = float(self.cfg.get("batch_wait_ms", 200)) / 1000.0
+        with self._cond:
+            while self._running:
+                wait = self._retry_at - time.monotonic()
+                if wait <= 0 and self._q:
+                    break
+                self._cond.wait(wait if wait > 0 else 1.0)
+            if not self._running and (not self._q or not self.connected):
+                return []
+            # beri kesempatan baris berikutnya bergabung ke transaksi yang sama
+            end = time.monotonic() + batch_wait
+            while self._running and len(self._q) < batch_size:
+                left = end - time.monotonic()
+                if left <= 0:
+                    break
+                self._cond.wait(left)
+            n = min(batch_size, len(self._q))
+            batch = [self._q.popleft() for _ in range(n)]
+            self._inflight += len(batch)
+            return batch
+
+    def _requeue(self, batch):
+        with self._cond:
+            self._q.extendleft(reversed(batch))
+            self._trim()
+            self._inflight -= len(batch)
+            self._backoff = min(float(self.cfg.get("max_backoff_sec", 60)), max(1.0, self._backoff * 2))
+            self._retry_at = time.monotonic() + self._backoff
+            self._cond.notify_all()
+
+    def _worker_loop(self):
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                if not self._running:
+                    return
+                continue
+            t0 = time.perf_counter()
+            persons = [row for kind, row in batch if kind == "person"]
+            rollups = [row for kind, row in batch if kind == "rollup"]
+            try:
+                self.backend.write_batch(persons, rollups)
+            except Exception:
+                self._set_status(False)
+                self._requeue(batch)
+                if not self._running:
+                    return
+                continue
+            DB_WRITE_LATENCY.observe(time.perf_counter() - t0)
+            DB_ROWS_WRITTEN.inc(len(batch))
+            now = datetime.now()
+            for row in persons:
+                DB_WRITE_LAG.observe((now - row[0]).total_seconds())
+            self._set_status(True)
+            with self._cond:
+                self._inflight -= len(batch)
+                self._backoff = 0.0
+                self.written += len(batch)
+                self._cond.notify_all()
 
-    def insert_person_snapshot(self, occupancy: int, note: str = None):
+    def _sync_loop(self):
+        from .storage.sync import sync_sqlite_to_mysql
+        interval = float(self.cfg.get("sync_interval_sec", 300))
+        while not self._stop_evt.wait(interval):
+            try:
+                self.synced += sync_sqlite_to_mysql(self.backend.path, self.cfg)
+            except Exception:
+                pass    # MySQL belum terjangkau, coba lagi interval berikutnya
+
+    def _trim(self):
+        limit = max(1, int(self.cfg.get("queue_max", 10000)))
+        while len(self._q) > limit:
+            self._q.popleft()
+            self.dropped += 1
+            DB_ROWS_DROPPED.inc()
+
+    # ---- API ----
+    def insert_person_snapshot(self, occupancy: int, note: str = None, source: str = "default"):
         if not self.cfg.get("enable"):
             return False
-        if not self.conn:
+        if not self._running:
             self.connect()
-        if not self.conn:
-            return False
-        try:
-            cur = self.conn.cursor()
-            cur.execute(
-                "INSERT INTO vas_person_counts (occupancy, note) VALUES (%s,%s)",
-                (occupancy, note)
-            )
-            return True
-        except Exception:
+        with self._cond:
+            self._q.append(("person", (datetime.now(), int(occupancy), note, source)))
+            self._trim()
+            self._cond.notify()
+        return True
+
+    def insert_rollups(self, rows):
+        """rows: hasil OccupancyRollup.drain() (bucket yang sudah tertutup)."""
+        if not self.cfg.get("enable") or not rows:
             return False
+        if not self._running:
+            self.connect()
+        with self._cond:
+            self._q.extend(("rollup", r) for r in rows)
+            self._trim()
+            self._cond.notify()
+        return True
+
+    def flush(self, timeout=5.0):
+        """Tunggu sampai antrian kosong (atau timeout); True jika kosong."""
+        end = time.monotonic() + timeout
+        with self._cond:
+            self._retry_at = 0.0
+            self._cond.notify_all()
+            while self._q or self._inflight:
+                left = end - time.monotonic()
+                if left <= 0:
+                    return False
+                self._cond.wait(min(left, 0.1))
+        return True
 
-    def close(self):
-        try:
-            if self.conn:
-                self.conn.close()
-        except Exception:
-            pass
-        self.conn = None
\ No newline at end of file
+    def close(self, flush=True):
+        if flush and self._running and self.connected:
+            self.flush(timeout=float(self.cfg.get("close_flush_sec", 3.0)))
+        with self._cond:
+            self._running = False
+            self._stop_evt.set()
+            self._cond.notify_all()
+        for t in self._workers:
+            t.join(timeout=2)
+        self._workers = []
+        if self.backend is not None:
+            self.backend.close()
+        self._set_status(False)
@@ -1,31 +1,195 @@
 """
 Fungsi deteksi sederhana: kembalikan list bbox person.
 Tanpa tracking.
+
+Post-processing dilakukan sekaligus pada seluruh tensor boxes (mask kelas,
+confidence, ukuran) dengan satu transfer ke host. Hasil mentah berupa array
+NumPy float32 N x 6: [x1, y1, x2, y2, conf, cls]; list dict dibangun hanya
+jika diminta (detect_persons / dets_to_dicts).
+
+Opsi runtime.aoi_crop: frame dipotong ke bounding box AOI + margin lalu
+diinferensi dengan imgsz persegi panjang sesuai aspek potongan, sehingga
+komputasi mengikuti luas AOI, bukan luas capture. Koordinat box dikembalikan
+ke koordinat frame.
+
+Opsi runtime.tiled: frame (atau potongan AOI) dibagi menjadi tile bertumpuk
+yang dijalankan dalam satu panggilan batch, lalu digabung dengan NMS lintas
+tile; tile di luar AOI tidak diinferensi.
+
+detect_persons_multi_array menggabungkan frame dari beberapa source (AOI dan
+ukuran berbeda) dalam satu forward pass; dipakai scheduler.py.
 """
 from typing import List, Dict
+import numpy as np
 from .config import MODEL_CONFIG, RUNTIME_CONFIG, CLASS_PERSON
+from .utils.tiling import tile_grid, nms
+
+EMPTY_DETS = np.zeros((0, 6), dtype=np.float32)
+MODEL_STRIDE = 32
 
-def detect_persons(model, frame):
-    conf = MODEL_CONFIG["confidence_threshold"]
-    iou = MODEL_CONFIG["iou_threshold"]
-    imgsz = RUNTIME_CONFIG["imgsz"]
+def _infer_kwargs(imgsz=None):
     half = (MODEL_CONFIG.get("device","cpu").startswith("cuda") and RUNTIME_CONFIG.get("use_half", True))
-    results = model(frame, conf=conf, iou=iou, imgsz=imgsz, half=half, verbose=False)
-    detections: List[Dict] = []
-    for r in results:
-        boxes = getattr(r, "boxes", None)
-        if boxes is None: 
-            continue
-        for box in boxes:
-            cls = int(box.cls[0])
-            if cls != CLASS_PERSON:
-                continue
-            score = float(box.conf[0])
-            if score < MODEL_CONFIG["detection_confidence"]:
-                continue
-            x1,y1,x2,y2 = box.xyxy[0].cpu().numpy()
-            detections.append({
-                "bbox":[int(x1),int(y1),int(x2),int(y2)],
-                "conf":score
-            })
-    return detections
\ No newline at end of file
+    return dict(conf=MODEL_CONFIG["confidence_threshold"], iou=MODEL_CONFIG["iou_threshold"],
+                imgsz=imgsz or RUNTIME_CONFIG["imgsz"], half=half, verbose=False)
+
+def _predict(model, frames, imgsz=None):
+    """
+    model(...) → list hasil per frame. Model ekspor statis (vas_static_imgsz,
+    lihat model_loader.mark_static) hanya menerima batch 1 persegi pada imgsz
+    ekspor: dipanggil per frame, imgsz rect / adaptif diabaikan.
+    """
+    static = getattr(model, "vas_static_imgsz", None)
+    if static:
+        kw = _infer_kwargs(static)
+        return [r for fr in frames for r in model(fr, **kw)]
+    return list(model(frames[0] if len(frames) == 1 else list(frames), **_infer_kwargs(imgsz)))
+
+def rect_imgsz(w, h, imgsz=None, stride=MODEL_STRIDE):
+    """
+    imgsz [h, w] untuk potongan w x h: sisi panjang = imgsz (tidak melebihi
+    ukuran potongan), sisi pendek mengikuti aspek; keduanya kelipatan stride.
+    """
+    imgsz = int(imgsz or RUNTIME_CONFIG["imgsz"])
+    up = lambda v: max(stride, int(np.ceil(v / stride)) * stride)
+    long_side = min(imgsz, up(max(w, h)))
+    short = up(min(w, h) * long_side / max(w, h))     # kali dulu: hindari 224.00000000000003 → 256
+    return [long_side, short] if h >= w else [short, long_side]
+
+def aoi_crop_window(shape, aoi_index, margin=None):
+    """(x1,y1,x2,y2) potongan frame untuk AOI, atau None (tanpa crop)."""
+    if aoi_index is None or aoi_index.is_empty() or not RUNTIME_CONFIG.get("aoi_crop", False):
+        return None
+    fh, fw = shape[:2]
+    margin = float(RUNTIME_CONFIG.get("aoi_crop_margin", 0.15) if margin is None else margin)
+    x1, y1, x2, y2 = aoi_index.bbox
+    mx = int((x2 - x1) * margin); my = int((y2 - y1) * margin)
+    x1 = max(0, x1 - mx); y1 = max(0, y1 - my)
+    x2 = min(fw, x2 + 1 + mx); y2 = min(fh, y2 + 1 + my)
+    if x2 - x1 < 2 or y2 - y1 < 2:
+        return None
+    if x1 == 0 and y1 == 0 and x2 == fw and y2 == fh:
+        return None
+    return x1, y1, x2, y2
+
+def _offset(dets, x1, y1):
+    if len(dets):
+        dets[:, [0, 2]] += x1
+        dets[:, [1, 3]] += y1
+    return dets
+
+def _to_host(t) -> np.ndarray:
+    if hasattr(t, "cpu"):
+        t = t.cpu().numpy()
+    return np.asarray(t, dtype=np.float32)
+
+def boxes_to_array(boxes, classes=(CLASS_PERSON,), min_conf=0.0, min_size=0) -> np.ndarray:
+    """Filter boxes (tensor/array N x 6, atau N x 7 dengan track id) → array N x 6."""
+    data = boxes if isinstance(boxes, np.ndarray) else getattr(boxes, "data", boxes)
+    if data is None or len(data) == 0:
+        return EMPTY_DETS
+    conf, cls = data[:, -2], data[:, -1]
+    mask = conf >= min_conf
+    cls_mask = cls == classes[0]
+    for c in classes[1:]:
+        cls_mask = cls_mask | (cls == c)
+    mask = mask & cls_mask
+    if min_size > 0:
+        mask = mask & ((data[:, 2] - data[:, 0]) >= min_size) & ((data[:, 3] - data[:, 1]) >= min_size)
+    arr = _to_host(data[mask])
+    if arr.shape[1] != 6:
+        arr = arr[:, [0, 1, 2, 3, -2, -1]]
+    return arr
+
+def _result_to_array(r) -> np.ndarray:
+    boxes = getattr(r, "boxes", None)
+    if boxes is None:
+        return EMPTY_DETS
+    return boxes_to_array(boxes, min_conf=MODEL_CONFIG["detection_confidence"])
+
+def dets_to_dicts(dets: np.ndarray) -> List[Dict]:
+    bboxes = dets[:, :4].astype(np.int32).tolist()
+    confs = dets[:, 4].tolist()
+    return [{"bbox": b, "conf": c} for b, c in zip(bboxes, confs)]
+
+def detect_persons_tiled_array(model, frame, aoi_index=None, max_batch_size=None) -> np.ndarray:
+    """Inferensi per tile (batch per max_batch_size) + NMS lintas tile."""
+    fh, fw = frame.shape[:2]
+    tile = int(RUNTIME_CONFIG.get("tile_size", 640))
+    wx1, wy1, wx2, wy2 = aoi_crop_window(frame.shape, aoi_index) or (0, 0, fw, fh)
+    tiles = tile_grid(wx1, wy1, wx2, wy2, tile=tile, overlap=float(RUNTIME_CONFIG.get("tile_overlap", 0.2)))
+    if aoi_index is not None:
+        tiles = [t for t in tiles if aoi_index.intersects(t)]
+    crops = [frame[y1:y2, x1:x2] for x1, y1, x2, y2 in tiles]
+    offsets = [(x1, y1) for x1, y1, _, _ in tiles]
+    if RUNTIME_CONFIG.get("tile_with_full", True) and len(tiles) > 1:
+        # pass jendela utuh (frame, atau crop AOI) diperkecil untuk orang besar yang terpotong tile
+        crops.append(frame[wy1:wy2, wx1:wx2]); offsets.append((wx1, wy1))
+    if not crops:
+        return EMPTY_DETS
+    max_bs = max(1, int(max_batch_size or RUNTIME_CONFIG.get("max_batch_size", 4)))
+    results = [r for i in range(0, len(crops), max_bs) for r in _predict(model, crops[i:i+max_bs], tile)]
+    arrs = [_offset(_result_to_array(r), ox, oy) for r, (ox, oy) in zip(results, offsets)]
+    dets = np.concatenate(arrs) if arrs else EMPTY_DETS
+    return nms(dets, float(RUNTIME_CONFIG.get("tile_nms_threshold", 0.6)))
+
+def detect_persons_array(model, frame, aoi_index=None, imgsz=None) -> np.ndarray:
+    if RUNTIME_CONFIG.get("tiled", False):
+        return detect_persons_tiled_array(model, frame, aoi_index)
+    win = aoi_crop_window(frame.shape, aoi_index)
+    if win is None:
+        results = _predict(model, [frame], imgsz)
+    else:
+        x1, y1, x2, y2 = win
+        results = _predict(model, [frame[y1:y2, x1:x2]], rect_imgsz(x2 - x1, y2 - y1, imgsz))
+    arrs = [_result_to_array(r) for r in results]
+    dets = arrs[0] if len(arrs) == 1 else (np.concatenate(arrs) if arrs else EMPTY_DETS)
+    return dets if win is None else _offset(dets, win[0], win[1])
+
+def detect_persons(model, frame, aoi_index=None):
+    return dets_to_dicts(detect_persons_array(model, frame, aoi_index))
+
+def detect_persons_batch_array(model, frames, max_batch_size=None, aoi_index=None) -> List[np.ndarray]:
+    """
+    Versi batch: list frame (satu source berurutan atau beberapa source) →
+    array deteksi per frame, urutan sama dengan input.
+    Frame dipotong per RUNTIME_CONFIG["max_batch_size"] per forward pass.
+    aoi_index hanya untuk frame satu source (ukuran sama, crop AOI sama).
+    """
+    if not frames:
+        return []
+    if RUNTIME_CONFIG.get("tiled", False):
+        # tiap frame sudah menjadi satu batch tile
+        return [detect_persons_tiled_array(model, fr, aoi_index, max_batch_size) for fr in frames]
+    max_bs = max(1, int(max_batch_size or RUNTIME_CONFIG.get("max_batch_size", 4)))
+    win = aoi_crop_window(frames[0].shape, aoi_index)
+    if win is not None:
+        x1, y1, x2, y2 = win
+        frames = [fr[y1:y2, x1:x2] for fr in frames]
+        imgsz = rect_imgsz(x2 - x1, y2 - y1)
+    else:
+        imgsz = None
+    out: List[np.ndarray] = []
+    for i in range(0, len(frames), max_bs):
+        out.extend(_result_to_array(r) for r in _predict(model, frames[i:i+max_bs], imgsz))
+    if win is not None:
+        out = [_offset(d, win[0], win[1]) for d in out]
+    return out
+
+def detect_persons_multi_array(model, frames, aoi_indexes, imgsz=None, max_batch_size=None) -> List[np.ndarray]:
+    """
+    Batch lintas source: tiap frame punya AOI (dan ukuran) sendiri. Frame
+    dipotong ke jendela AOI masing-masing lalu diinferensi bersama dengan
+    imgsz persegi (letterbox per frame); satu frame → jalur rect biasa.
+    """
+    if len(frames) == 1 or RUNTIME_CONFIG.get("tiled", False):
+        return [detect_persons_array(model, fr, a, imgsz) for fr, a in zip(frames, aoi_indexes)]
+    max_bs = max(1, int(max_batch_size or RUNTIME_CONFIG.get("max_batch_size", 4)))
+    wins = [aoi_crop_window(fr.shape, a) for fr, a in zip(frames, aoi_indexes)]
+    crops = [fr if w is None else fr[w[1]:w[3], w[0]:w[2]] for fr, w in zip(frames, wins)]
+    out: List[np.ndarray] = []
+    for i in range(0, len(crops), max_bs):
+        out.extend(_result_to_array(r) for r in _predict(model, crops[i:i+max_bs], imgsz))
+    return [d if w is None else _offset(d, w[0], w[1]) for d, w in zip(out, wins)]
+
+def detect_persons_batch(model, frames) -> List[List[Dict]]:
+    return [dets_to_dicts(d) for d in detect_persons_batch_array(model, frames)]
@@ -1,31 +1,31 @@
 from typing import List, Dict, Any
+import numpy as np
 from .config import MODEL_CONFIG, RUNTIME_CONFIG, TRACKING_CONFIG, PERSON_CLASSES
+from .detection import boxes_to_array, EMPTY_DETS
 
-def run_inference(model, frame):
+def run_inference_array(model, frame) -> np.ndarray:
     conf = MODEL_CONFIG["confidence_threshold"]
     iou = MODEL_CONFIG["iou_threshold"]
     imgsz = RUNTIME_CONFIG["imgsz"]
     half = (MODEL_CONFIG.get("device","cpu").startswith("cuda") and RUNTIME_CONFIG.get("use_half", True))
     results = model(frame, conf=conf, iou=iou, imgsz=imgsz, half=half, verbose=False)
-    detections: List[Dict[str, Any]] = []
+    arrs = []
     for r in results:
         boxes = getattr(r, "boxes", None)
         if boxes is None:
             continue
-        for box in boxes:
-            cls = int(box.cls[0])
-            if cls not in PERSON_CLASSES:
-                continue
-            cconf = float(box.conf[0])
-            if cconf < MODEL_CONFIG["detection_confidence"]:
-                continue
-            x1,y1,x2,y2 = box.xyxy[0].cpu().numpy()
-            w,h = (x2-x1),(y2-y1)
-            if w < TRACKING_CONFIG["min_detection_size"] or h < TRACKING_CONFIG["min_detection_size"]:
-                continue
-            detections.append({
-                "bbox": [int(x1), int(y1), int(x2), int(y2)],
-                "class": cls,
-                "confidence": cconf
-            })
-    return detections
\ No newline at end of file
+        arrs.append(boxes_to_array(boxes, classes=PERSON_CLASSES,
+                                   min_conf=MODEL_CONFIG["detection_confidence"],
+                                   min_size=TRACKING_CONFIG["min_detection_size"]))
+    if not arrs:
+        return EMPTY_DETS
+    return arrs[0] if len(arrs) == 1 else np.concatenate(arrs)
+
+def run_inference(model, frame):
+    dets = run_inference_array(model, frame)
+    bboxes = dets[:, :4].astype(np.int32).tolist()
+    detections: List[Dict[str, Any]] = [
+        {"bbox": b, "class": int(c), "confidence": s}
+        for b, s, c in zip(bboxes, dets[:, 4].tolist(), dets[:, 5].tolist())
+    ]
+    return detections
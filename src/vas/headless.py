@@ -0,0 +1,153 @@
+"""
+Counting tanpa Tk / tanpa rendering (server rack, tanpa display).
+Konfigurasi dibaca dari settings.json (direktori kerja) seperti GUI; daftar
+"sources" menjalankan beberapa kamera / region dengan satu model (sources.py).
+
+    vas-headless [--log-level INFO]
+"""
+import argparse
+import logging
+import signal
+import threading
+
+from .config import (INPUT_CONFIG, ALERT_CONFIG, DB_CONFIG, HEADLESS_CONFIG, METRICS_CONFIG,
+                     ROLLUP_CONFIG, SOURCES_CONFIG)
+from .model_loader import load_model, warmup
+from .db_manager import DBManager
+from .metrics import maybe_start_exporter
+from .scheduler import InferenceScheduler
+from .sources import Source, source_configs
+from .utils.startup import STARTUP
+from .utils.throttle import Throttle
+
+log = logging.getLogger("vas.headless")
+
+class HeadlessCounter:
+    def __init__(self, model=None):
+        cfgs = source_configs()     # validasi dulu (ValueError) sebelum model dimuat
+        if model is None:
+            model = load_model()
+            STARTUP.mark("model")
+            warmup(model)
+            STARTUP.mark("warmup")
+        self.model = model
+        # satu model untuk semua source; tiap source punya capture + session sendiri
+        self.sources = [Source(cfg, self.model) for cfg in cfgs]
+        self.session = self.sources[0].session
+        self.db = DBManager(status_callback=self.on_db_status)
+        self.stop_event = threading.Event()
+
+    def on_db_status(self, ok: bool):
+        log.info("DB %s", "connected" if ok else "disconnected")
+
+    def open_sources(self):
+        opened = []
+        for src in self.sources:
+            if src.open():
+                opened.append(src)
+            else:
+                log.error("Tidak dapat membuka source %s (%s)", src.name, src.type)
+        return opened
+
+    def close_sources(self):
+        for src in self.sources:
+            src.close()
+
+    def stop(self, *_):
+        self.stop_event.set()
+
+    def on_transition(self, src, state):
+        occ = src.session.occupancy
+        if state == "occupied":
+            log.warning("[%s] AREA OCCUPIED (%d)", src.name, occ)
+        else:
+            log.warning("[%s] AREA CLEAR", src.name)
+        if DB_CONFIG.get("enable"):
+            self.db.insert_person_snapshot(occ, note=f"alert {state}", source=src.name)
+
+    def run_file(self):
+        from pathlib import Path
+        from .offline import process_video
+        path = INPUT_CONFIG.get("file_path")
+        if not path:
+            log.error("input.file_path kosong")
+            return 1
+        out = INPUT_CONFIG.get("file_output") or str(Path(path).with_suffix(".occupancy.csv"))
+        summary = process_video(path, out, self.model, aoi_index=self.session.aoi_index)
+        log.info("Selesai: %(frames)d frame dalam %(elapsed_sec)ss (%(fps)s fps) → %(output)s", summary)
+        self.db.close()
+        return 0
+
+    def log_status(self, src, sched):
+        s = src.session
+        log.info("[%s] occupancy=%d infer=%.0fms skipped=%d dropped=%d %s db_queue=%d %s",
+                 src.name, s.occupancy, s.stats.avg_ms, s.skipped, src.worker.dropped,
+                 sched.describe(src.name), self.db.queue_depth(), s.stride_ctl.describe())
+
+    def run(self):
+        if not SOURCES_CONFIG and INPUT_CONFIG.get("type") == "file":
+            return self.run_file()
+        active = self.open_sources()
+        if not active:
+            log.error("Tidak ada source input yang dapat dibuka")
+            return 1
+        for src in active:
+            log.info("Counting dimulai: source=%s input=%s aoi=%s", src.name, src.type, src.session.aoi_index.kind)
+        log_throttle = Throttle(float(HEADLESS_CONFIG.get("log_interval_sec", 5)))
+        rec_iv = float(DB_CONFIG.get("record_interval_sec", 0) or 0)
+        db_record = Throttle(rec_iv) if rec_iv > 0 else None
+        rollup_flush = Throttle(float(ROLLUP_CONFIG.get("flush_interval_sec", 10)))
+        # satu model untuk semua source: scheduler memilih + mem-batch frame lintas source
+        sched = InferenceScheduler(active, self.model)
+        try:
+            while not self.stop_event.is_set():
+                for src, (dets, _) in sched.step():
+                    if dets is None:
+                        continue
+                    if not STARTUP.has("first_count"):
+                        STARTUP.mark("first_count")
+                        log.info("Startup: %s", STARTUP.describe())
+                    if ALERT_CONFIG.get("enabled", True):
+                        state = src.session.alert_transition()
+                        if state:
+                            self.on_transition(src, state)
+                record = db_record is not None and db_record.ready()
+                flush = rollup_flush.ready()
+                show = log_throttle.ready()
+                for src in active:
+                    s = src.session
+                    if record:
+                        self.db.insert_person_snapshot(s.occupancy, note="auto", source=src.name)
+                    if flush and s.rollup is not None:
+                        self.db.insert_rollups(s.rollup.drain())
+                    if show:
+                        self.log_status(src, sched)
+        finally:
+            self.close_sources()
+            for src in self.sources:
+                if src.session.rollup is not None:
+                    src.session.rollup.close()
+                    self.db.insert_rollups(src.session.rollup.drain())
+            self.db.close()
+            log.info("Counting berhenti")
+        return 0
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="vas-headless", description="Person counter tanpa GUI")
+    ap.add_argument("--log-level", default="INFO")
+    args = ap.parse_args(argv)
+    logging.basicConfig(level=getattr(logging, args.log_level.upper(), logging.INFO),
+                        format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    try:
+        counter = HeadlessCounter()
+    except ValueError as e:     # konfigurasi sources tidak valid
+        log.error("Konfigurasi tidak valid: %s", e)
+        return 1
+    if maybe_start_exporter():
+        log.info("Metrics di http://%s:%s/metrics", METRICS_CONFIG.get("host"), METRICS_CONFIG.get("port"))
+    signal.signal(signal.SIGTERM, counter.stop)
+    signal.signal(signal.SIGINT, counter.stop)
+    return counter.run()
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,21 +1,29 @@
+from .utils.startup import STARTUP     # paling awal: titik nol waktu startup
 import time
 import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
 
+# cv2 tetap di level modul: utils.aoi / display / motion sudah memuatnya saat
+# import dan frame pertama butuh OpenCV; yang dibuat lazy hanya torch / ultralytics
 import cv2
 import numpy as np
 from PIL import Image, ImageTk
-import pyautogui
 
 from .config import (
-    settings, MODEL_CONFIG, RUNTIME_CONFIG, INPUT_CONFIG,
-    AOI_CONFIG, ALERT_CONFIG, DB_CONFIG
+    settings, parse_setting, MODEL_CONFIG, RUNTIME_CONFIG, INPUT_CONFIG,
+    AOI_CONFIG, ALERT_CONFIG, DB_CONFIG, ROLLUP_CONFIG
 )
-from .model_loader import load_model
-from .detection import detect_persons
+from .model_loader import load_model, warmup
+from .counting import CountingSession
 from .utils.screen_capture import ScreenCapturer
+from .utils.aoi import AOIIndex, count_in_aoi
+from .utils.display import DisplayBuffer, fit_rect
+from .utils.frame_source import CaptureWorker, open_capture
+from .utils.stage_queue import DropOldestQueue, StageStats
+from .utils.throttle import Throttle
 from .db_manager import DBManager
+from .metrics import maybe_start_exporter
 
 class App:
     def __init__(self):
@@ -24,15 +32,22 @@ class App:
         self.root.geometry("1200x800")
         self.root.configure(bg="#252525")
 
-        self.model = load_model()
+        # Model dimuat + warm-up di thread latar; UI sudah bisa dipakai
+        self.model = None
+        self.model_ready = threading.Event()
+        self.session = CountingSession(None)
 
         # Input
         self.capture_region = INPUT_CONFIG.get("screen_region")
         self.input_type = INPUT_CONFIG.get("type","screen")
         self.webcam_index = INPUT_CONFIG.get("webcam_index",0)
         self.stream_url = INPUT_CONFIG.get("stream_url","")
+        self.file_path = INPUT_CONFIG.get("file_path","")
         self.cap = None
         self.cap_lock = threading.Lock()
+        self.cap_worker = None
+        self._frame_seq = 0
+        self.frame_ts = 0.0
 
         # AOI
         self.aoi_mode = AOI_CONFIG.get("mode","rect")
@@ -42,6 +57,7 @@ class App:
         self._rect_start = None
         self._drawing_poly = False
         self._poly_canvas_pts = []
+        self._rebuild_aoi_index()
 
         # Alert
         self.alert_enabled = ALERT_CONFIG.get("enabled", True)
@@ -53,16 +69,43 @@ class App:
         # Runtime flags
         self.is_preview = False
         self.is_running = False
+        self._run_gen = 0           # naik tiap Start: loop lama berhenti walau Stop/Start cepat
 
         # Frame buffer
         self.screen_cap = ScreenCapturer(RUNTIME_CONFIG.get("use_mss_screen_capture",True))
         self.frame = None
         self.occupancy = 0
 
+        # Pipeline capture → inferensi → render
+        self.render_q = DropOldestQueue(RUNTIME_CONFIG.get("render_queue_size", 2))
+        self.stage_render = StageStats()
+        self.display = DisplayBuffer()
+        self.photo = None
+        self._img_item = None
+
+        self.metrics_server = maybe_start_exporter()
+
         self.build_ui()
         self.bind_canvas()
         self.update_preview_button_state()
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        STARTUP.mark("ui")
+        threading.Thread(target=self.load_model_bg, name="model-load", daemon=True).start()
+
+    def load_model_bg(self):
+        try:
+            model = load_model()
+            STARTUP.mark("model")
+            warmup(model)
+            STARTUP.mark("warmup")
+        except Exception as e:
+            msg = str(e)
+            self.root.after(0, lambda: messagebox.showerror("Model", f"Gagal memuat model: {msg}"))
+            return
+        self.model = model
+        self.session.model = model
+        self.model_ready.set()
+        self.root.after(0, lambda: self.lbl_status.config(text=f"Status: Model siap ({STARTUP.describe()})"))
 
     # ------------- UI -------------
     def build_ui(self):
@@ -87,7 +130,7 @@ class App:
         sec_input.pack(fill=tk.X, padx=8, pady=8)
         tk.Label(sec_input, text="Type:", bg="#303030", fg="white").pack(anchor="w")
         self.var_input = tk.StringVar(value=self.input_type)
-        cb = ttk.Combobox(sec_input, textvariable=self.var_input, values=["screen","webcam","network"], state="readonly")
+        cb = ttk.Combobox(sec_input, textvariable=self.var_input, values=["screen","webcam","network","file"], state="readonly")
         cb.pack(fill=tk.X, pady=4)
         cb.bind("<<ComboboxSelected>>", lambda e: self.on_input_change())
 
@@ -101,6 +144,11 @@ class App:
         self.var_url = tk.StringVar(value=self.stream_url)
         ttk.Entry(self.row_net, textvariable=self.var_url, width=18).pack(side=tk.LEFT, padx=4)
 
+        self.row_file = tk.Frame(sec_input, bg="#303030")
+        tk.Label(self.row_file, text="File:", bg="#303030", fg="white").pack(side=tk.LEFT)
+        self.var_file = tk.StringVar(value=self.file_path)
+        ttk.Entry(self.row_file, textvariable=self.var_file, width=18).pack(side=tk.LEFT, padx=4)
+
         tk.Button(sec_input, text="Select Region", command=self.select_region, bg="#5050a0", fg="white").pack(fill=tk.X, pady=4)
         tk.Button(sec_input, text="Full Screen", command=self.full_screen_region, bg="#5050a0", fg="white").pack(fill=tk.X, pady=2)
         tk.Button(sec_input, text="Test Source", command=self.test_source, bg="#444", fg="white").pack(fill=tk.X, pady=6)
@@ -145,7 +193,12 @@ class App:
         self.lbl_alert_state = tk.Label(sec_stats, text="Alert State: -", bg="#303030", fg="#ffaa00")
         self.lbl_alert_state.pack(anchor="w", padx=6, pady=2)
         self.lbl_fps = tk.Label(sec_stats, text="FPS: 0.0", bg="#303030", fg="#00d4ff")
-        self.lbl_fps.pack(anchor="w", padx=6, pady=6)
+        self.lbl_fps.pack(anchor="w", padx=6, pady=(6,0))
+        self.lbl_dropped = tk.Label(sec_stats, text="Dropped: 0", bg="#303030", fg="#888888")
+        self.lbl_dropped.pack(anchor="w", padx=6, pady=(0,2))
+        self.lbl_pipeline = tk.Label(sec_stats, text="Pipeline: -", bg="#303030", fg="#888888",
+                                     justify=tk.LEFT, anchor="w")
+        self.lbl_pipeline.pack(anchor="w", padx=6, pady=(0,6))
 
         sec_alert_log = tk.LabelFrame(right, text="Alert Log", bg="#303030", fg="white")
         sec_alert_log.pack(fill=tk.BOTH, expand=True, padx=8, pady=8)
@@ -164,15 +217,14 @@ class App:
     def on_input_change(self):
         t = self.var_input.get()
         self.input_type = t
+        for row in (self.row_webcam, self.row_net, self.row_file):
+            row.forget()
         if t == "webcam":
             self.row_webcam.pack(fill=tk.X, pady=2)
-            self.row_net.forget()
         elif t == "network":
             self.row_net.pack(fill=tk.X, pady=2)
-            self.row_webcam.forget()
-        else:
-            self.row_net.forget()
-            self.row_webcam.forget()
+        elif t == "file":
+            self.row_file.pack(fill=tk.X, pady=2)
         self.update_preview_button_state()
         self.persist_settings()
 
@@ -181,6 +233,8 @@ class App:
             self.btn_preview.config(state="normal" if self.capture_region else "disabled")
         elif self.input_type == "network":
             self.btn_preview.config(state="normal" if self.var_url.get().strip() else "disabled")
+        elif self.input_type == "file":
+            self.btn_preview.config(state="normal" if self.var_file.get().strip() else "disabled")
         else:
             self.btn_preview.config(state="normal")
 
@@ -188,6 +242,7 @@ class App:
         INPUT_CONFIG["type"] = self.input_type
         INPUT_CONFIG["webcam_index"] = int(self.var_cam_index.get())
         INPUT_CONFIG["stream_url"] = self.var_url.get().strip()
+        INPUT_CONFIG["file_path"] = self.var_file.get().strip()
         if self.capture_region:
             INPUT_CONFIG["screen_region"] = list(self.capture_region)
         AOI_CONFIG["mode"] = self.aoi_mode
@@ -245,6 +300,7 @@ class App:
     def full_screen_region(self):
         if self.input_type != "screen":
             return
+        import pyautogui
         w,h = pyautogui.size()
         self.capture_region = (0,0,w,h)
         self.update_preview_button_state()
@@ -252,43 +308,52 @@ class App:
 
     def open_video_source(self):
         self.close_video_source()
-        if self.input_type == "webcam":
-            idx = int(self.var_cam_index.get())
-            cap = cv2.VideoCapture(idx, cv2.CAP_DSHOW)
-        elif self.input_type == "network":
-            url = self.var_url.get().strip()
-            if not url:
-                return False
-            cap = cv2.VideoCapture(url)
-        else:
+        if self.input_type not in ("webcam","network","file"):
             return True
-        if not cap or not cap.isOpened():
+        cap = open_capture(self.input_type, self.var_cam_index.get(), self.var_url.get().strip(),
+                           self.var_file.get().strip())
+        if cap is None:
             return False
         with self.cap_lock:
             self.cap = cap
+            self._frame_seq = 0
+            self.cap_worker = CaptureWorker.from_videocapture(cap, name=f"capture-{self.input_type}").start()
         return True
 
     def close_video_source(self):
         with self.cap_lock:
-            if self.cap:
-                try: self.cap.release()
-                except Exception: pass
-                self.cap = None
+            if self.cap_worker:
+                # worker me-release cap sendiri setelah thread keluar (read RTSP bisa macet)
+                self.cap_worker.stop()
+                self.cap_worker = None
+            self.cap = None
+
+    def start_screen_worker(self):
+        with self.cap_lock:
+            if self.cap_worker:
+                return
+            self._frame_seq = 0
+            self.cap_worker = CaptureWorker(lambda: self.screen_cap.grab(self.capture_region),
+                                            name="capture-screen",
+                                            max_fps=float(RUNTIME_CONFIG.get("screen_capture_fps", 15) or 0)).start()
 
     def get_frame(self):
-        if self.input_type == "screen":
-            if not self.capture_region:
+        with self.cap_lock:
+            worker = self.cap_worker
+        if worker is None:
+            if self.input_type != "screen" or not self.capture_region:
                 return None
+            self.frame_ts = time.time()
             return self.screen_cap.grab(self.capture_region)
-        with self.cap_lock:
-            cap = self.cap
-        if cap is None: return None
-        flush_n = max(1, int(RUNTIME_CONFIG.get("flush_frames",2)))
-        for _ in range(flush_n-1):
-            try: cap.grab()
-            except Exception: break
-        ret, fr = cap.read()
-        return fr if ret else None
+        # Non-blocking: hanya frame terbaru yang belum pernah diproses
+        got = worker.slot.get(self._frame_seq, timeout=0.02)
+        if got is None: return None
+        self._frame_seq, self.frame_ts, fr = got
+        return fr
+
+    def dropped_frames(self):
+        w = self.cap_worker
+        return w.dropped if w else 0
 
     def test_source(self):
         fr = self.get_frame()
@@ -305,17 +370,20 @@ class App:
         self._drawing_rect = True
         self._rect_start = None
         self.aoi_mode = "rect"
+        self._rebuild_aoi_index()
         messagebox.showinfo("AOI","Klik & drag di canvas.")
 
     def start_poly_aoi(self):
         self._drawing_poly = True
         self._poly_canvas_pts = []
         self.aoi_mode = "poly"
+        self._rebuild_aoi_index()
         messagebox.showinfo("AOI","Klik titik-titik; klik kanan untuk selesai.")
 
     def clear_aoi(self):
         self.aoi_rect = None
         self.aoi_poly = []
+        self._rebuild_aoi_index()
         self.lbl_aoi.config(text="AOI: none")
         self.persist_settings()
         self.draw_frame()
@@ -331,7 +399,7 @@ class App:
         if self._drawing_rect and self._rect_start:
             self.draw_frame()
             x0,y0 = self._rect_start
-            self.canvas.create_rectangle(x0,y0,event.x,event.y,outline="#ffcc00",width=2)
+            self.canvas.create_rectangle(x0,y0,event.x,event.y,outline="#ffcc00",width=2,tags="overlay")
 
     def on_canvas_release(self, event):
         if self._drawing_rect and self._rect_start:
@@ -339,6 +407,7 @@ class App:
             x1,y1 = event.x,event.y
             if abs(x1-x0)>10 and abs(y1-y0)>10:
                 self.aoi_rect = self.canvas_to_frame_rect(x0,y0,x1,y1)
+                self._rebuild_aoi_index()
                 self.lbl_aoi.config(text=f"AOI Rect: {self.aoi_rect}")
                 self.persist_settings()
             self._drawing_rect = False
@@ -348,6 +417,7 @@ class App:
     def on_canvas_right_click(self, event):
         if self._drawing_poly and len(self._poly_canvas_pts)>=3:
             self.aoi_poly = [self.canvas_to_frame_point(px,py) for (px,py) in self._poly_canvas_pts]
+            self._rebuild_aoi_index()
             self.lbl_aoi.config(text=f"AOI Poly: {len(self.aoi_poly)} pts")
             self._drawing_poly=False
             self._poly_canvas_pts=[]
@@ -360,17 +430,19 @@ class App:
             messagebox.showwarning("Warn","Pilih region dulu."); return
         if self.input_type=="network" and not self.var_url.get().strip():
             messagebox.showwarning("Warn","Isi URL stream."); return
+        if self.input_type=="file" and not self.var_file.get().strip():
+            messagebox.showwarning("Warn","Isi path file video."); return
         self.is_preview = not self.is_preview
         self.btn_preview.config(text="Stop Preview" if self.is_preview else "Preview")
         if self.is_preview:
-            if self.input_type in ("webcam","network"):
+            if self.input_type in ("webcam","network","file"):
                 if not self.open_video_source():
                     self.is_preview=False
                     self.btn_preview.config(text="Preview")
                     return
             threading.Thread(target=self.preview_loop, daemon=True).start()
         else:
-            if not self.is_running and self.input_type in ("webcam","network"):
+            if not self.is_running and self.input_type in ("webcam","network","file"):
                 self.close_video_source()
 
     def preview_loop(self):
@@ -387,7 +459,8 @@ class App:
                 fps=10/(now-start)
                 start=now
                 self.lbl_fps.config(text=f"FPS: {fps:.1f}")
-            time.sleep(0.03)
+                self.lbl_dropped.config(text=f"Dropped: {self.dropped_frames()}")
+            time.sleep(self.display_interval())
 
     # ------------- Run Counting -------------
     def toggle_run(self):
@@ -395,49 +468,63 @@ class App:
             messagebox.showwarning("Warn","Pilih region screen."); return
         if self.input_type=="network" and not self.var_url.get().strip():
             messagebox.showwarning("Warn","Isi URL stream."); return
+        if self.input_type=="file" and not self.var_file.get().strip():
+            messagebox.showwarning("Warn","Isi path file video."); return
         self.is_running = not self.is_running
         self.btn_run.config(text="Stop" if self.is_running else "Start Counting")
         if self.is_running:
             if self.is_preview:
                 self.is_preview=False
                 self.btn_preview.config(text="Preview")
-            if self.input_type in ("webcam","network"):
+            if self.input_type in ("webcam","network","file"):
                 if not self.open_video_source():
                     self.is_running=False
                     self.btn_run.config(text="Start Counting")
                     return
-            threading.Thread(target=self.run_loop, daemon=True).start()
+            else:
+                self.start_screen_worker()
+            self._run_gen += 1
+            threading.Thread(target=self.run_loop, args=(self._run_gen,), daemon=True).start()
         else:
-            if self.input_type in ("webcam","network") and not self.is_preview:
+            if not self.is_preview:
                 self.close_video_source()
 
-    def run_loop(self):
-        stride = max(1, int(RUNTIME_CONFIG.get("detection_stride",1)))
-        frame_idx=0
+    def _active(self, gen):
+        return self.is_running and gen == self._run_gen
+
+    def run_loop(self, gen):
+        # Stage inferensi. Capture berjalan di CaptureWorker, render di render_loop;
+        # inferensi frame N overlap dengan capture N+1 dan render N-1.
+        if not self.model_ready.is_set():
+            self.lbl_status.config(text="Status: Menunggu model...")
+            while self._active(gen) and not self.model_ready.wait(0.1):
+                pass
+            if not self._active(gen):
+                return
+        self.render_q.clear()
+        threading.Thread(target=self.render_loop, args=(gen,), daemon=True).start()
+        self.session.frame_idx = 0
+        rec_iv = float(DB_CONFIG.get("record_interval_sec", 0) or 0)
+        db_record = Throttle(rec_iv) if rec_iv > 0 else None
+        rollup_flush = Throttle(float(ROLLUP_CONFIG.get("flush_interval_sec", 10)))
         fps_cnt=0
         start=time.time()
-        while self.is_running:
+        while self._active(gen):
             fr = self.get_frame()
             if fr is None:
-                time.sleep(0.01); continue
-            run_det = (frame_idx % stride == 0)
-            if run_det:
-                dets = detect_persons(self.model, fr)
-                occ = self.count_in_aoi(dets, fr.shape[:2])
-                self.occupancy = occ
+                time.sleep(0.001); continue
+            dets, inside = self.session.process(fr, self.frame_ts, self._frame_seq)
+            if dets is not None:
+                self.occupancy = self.session.occupancy
                 self.update_alert_logic()
-                # Draw boxes for visualization (optional)
-                for d in dets:
-                    x1,y1,x2,y2 = d["bbox"]
-                    if self._inside_aoi(((x1+x2)//2,(y1+y2)//2), fr.shape[:2]):
-                        cv2.rectangle(fr,(x1,y1),(x2,y2),(0,255,0),2)
-                    else:
-                        cv2.rectangle(fr,(x1,y1),(x2,y2),(128,128,128),1)
-
-            self.draw_aoi(fr)
-            self.frame = fr
-            self.draw_frame()
-            self.lbl_occupancy.config(text=f"Occupancy: {self.occupancy}")
+                if not STARTUP.has("first_count"):
+                    STARTUP.mark("first_count")
+                    self.lbl_status.config(text=f"Status: Startup {STARTUP.describe()}")
+            if db_record and db_record.ready():
+                self.db.insert_person_snapshot(self.occupancy, note="auto")
+            if self.session.rollup is not None and rollup_flush.ready():
+                self.db.insert_rollups(self.session.rollup.drain())
+            self.render_q.put((fr, dets, inside))
 
             fps_cnt+=1
             if fps_cnt%5==0:
@@ -445,48 +532,78 @@ class App:
                 fps=5/(now-start)
                 start=now
                 self.lbl_fps.config(text=f"FPS: {fps:.1f}")
-
-            frame_idx+=1
-            time.sleep(0.005)
+                self.lbl_dropped.config(text=f"Dropped: {self.dropped_frames()}")
+                self.lbl_pipeline.config(text=self.pipeline_report())
+
+    def display_interval(self):
+        return 1.0 / max(1.0, float(RUNTIME_CONFIG.get("display_fps", 15)))
+
+    def render_loop(self, gen):
+        # Dibatasi display_fps; inferensi tidak pernah menunggu render
+        # (render_q drop-oldest, render hanya mengambil frame terbaru).
+        next_t = 0.0
+        boxes = (None, None)
+        while self._active(gen):
+            wait = next_t - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            item = self.render_q.get_latest(timeout=0.1)
+            if item is None:
+                continue
+            next_t = time.monotonic() + self.display_interval()
+            t0 = time.perf_counter()
+            fr, dets, inside = item
+            if dets is not None:
+                boxes = (dets, inside)
+            self.frame = fr
+            self.draw_frame(*boxes, aoi=True)
+            self.lbl_occupancy.config(text=f"Occupancy: {self.occupancy}")
+            self.stage_render.add(time.perf_counter() - t0)
+
+    def stride_report(self):
+        ctl = self.session.stride_ctl
+        if ctl.enabled:
+            return f"Adaptive: {ctl.describe()}"
+        return f"Stride: {RUNTIME_CONFIG.get('detection_stride',1)} imgsz={RUNTIME_CONFIG.get('imgsz')}"
+
+    def pipeline_report(self):
+        w = self.cap_worker
+        cap_ms = w.stats.avg_ms if w else 0.0
+        cap_q = w.depth() if w else 0
+        return (f"Capture: {cap_ms:.0f}ms q={cap_q}\n"
+                f"Infer: {self.session.stats.avg_ms:.0f}ms n={self.session.inferences} skip={self.session.skipped}\n"
+                f"{self.stride_report()}\n"
+                f"Render: {self.stage_render.avg_ms:.0f}ms q={self.render_q.depth()} drop={self.render_q.dropped}\n"
+                f"DB: q={self.db.queue_depth()} drop={self.db.dropped}")
 
     # ------------- AOI & Counting -------------
+    def _rebuild_aoi_index(self):
+        # Dipanggil setiap AOI berubah; containment per frame cukup lookup.
+        self._aoi_index = AOIIndex(self.aoi_mode, self.aoi_rect, self.aoi_poly)
+        self.session.aoi_index = self._aoi_index
+
     def count_in_aoi(self, detections, shape):
-        h,w = shape
-        c = 0
-        for d in detections:
-            x1,y1,x2,y2 = d["bbox"]
-            cx,cy = (x1+x2)//2,(y1+y2)//2
-            if self._inside_aoi((cx,cy), shape):
-                c+=1
-        return c
+        return count_in_aoi(detections, self._aoi_index)[0]
 
     def _inside_aoi(self, pt, shape):
-        if self.aoi_mode == "poly" and self.aoi_poly and len(self.aoi_poly)>=3:
-            return self._point_in_poly(pt, self.aoi_poly)
-        if self.aoi_rect:
-            x1,y1,x2,y2 = self.aoi_rect
-            return x1 <= pt[0] <= x2 and y1 <= pt[1] <= y2
         # Jika AOI belum ditentukan → semua dihitung
-        return True
+        return self._aoi_index.contains_point(pt)
 
-    def _point_in_poly(self, p, poly):
-        x,y=p
-        inside=False
-        n=len(poly)
-        for i in range(n):
-            x1,y1=poly[i]; x2,y2=poly[(i+1)%n]
-            cond=((y1>y)!=(y2>y)) and (x < (x2-x1)*(y-y1)/((y2-y1) if (y2-y1)!=0 else 1e-6) + x1)
-            if cond: inside=not inside
-        return inside
-
-    def draw_aoi(self, frame):
+    def draw_aoi(self, frame, scale=1.0):
         if self.aoi_rect:
-            x1,y1,x2,y2 = self.aoi_rect
+            x1,y1,x2,y2 = (int(v*scale) for v in self.aoi_rect)
             cv2.rectangle(frame,(x1,y1),(x2,y2),(0,0,255),2)
         elif self.aoi_poly and len(self.aoi_poly)>=3:
-            pts = np.array(self.aoi_poly,dtype=np.int32)
+            pts = (np.array(self.aoi_poly,dtype=np.float32)*scale).astype(np.int32)
             cv2.polylines(frame,[pts],True,(0,0,255),2)
 
+    def draw_boxes(self, frame, dets, inside, scale=1.0):
+        for (x1,y1,x2,y2), ins in zip((dets[:, :4]*scale).astype(int).tolist(), inside.tolist()):
+            if ins:
+                cv2.rectangle(frame,(x1,y1),(x2,y2),(0,255,0),2)
+            else:
+                cv2.rectangle(frame,(x1,y1),(x2,y2),(128,128,128),1)
+
     # ------------- Alert Logic -------------
     def toggle_alert(self):
         self.alert_enabled = not self.alert_enabled
@@ -501,40 +618,47 @@ class App:
             return
         if self.occupancy > 0:
             if self.last_alert_state != "occupied":
+                self.session.observe_alert("occupied")
                 self.alert_list.insert(tk.END, f"[{time.strftime('%H:%M:%S')}] AREA OCCUPIED ({self.occupancy})")
                 self.alert_list.yview_moveto(1.0)
                 self.lbl_alert_state.config(text="Alert State: OCCUPIED", fg="#ff5555")
                 self.last_alert_state = "occupied"
         else:
             if self.last_alert_state != "clear":
+                self.session.observe_alert("clear")
                 self.alert_list.insert(tk.END, f"[{time.strftime('%H:%M:%S')}] AREA CLEAR")
                 self.alert_list.yview_moveto(1.0)
                 self.lbl_alert_state.config(text="Alert State: CLEAR", fg="#28a745")
                 self.last_alert_state = "clear"
 
     # ------------- Drawing / Canvas Transform -------------
-    def draw_frame(self):
+    def draw_frame(self, dets=None, inside=None, aoi=False):
         if self.frame is None:
             return
-        img = cv2.cvtColor(self.frame, cv2.COLOR_BGR2RGB)
-        im = Image.fromarray(img)
         cw = self.canvas.winfo_width() or 1
         ch = self.canvas.winfo_height() or 1
-        iw,ih = im.size
-        ar=iw/ih; car=cw/ch
-        if ar>car:
-            new_w=cw; new_h=int(cw/ar)
+        # Resize dulu ke ukuran canvas, overlay digambar di resolusi tampilan
+        buf = self.display.fit(self.frame, cw, ch)
+        if dets is not None:
+            self.draw_boxes(buf, dets, inside, self.display.scale)
+        if aoi:
+            self.draw_aoi(buf, self.display.scale)
+        im = Image.fromarray(self.display.to_rgb())
+        if self.photo is None or (self.photo.width(), self.photo.height()) != im.size:
+            self.photo = ImageTk.PhotoImage(im)
+            if self._img_item is None:
+                self._img_item = self.canvas.create_image(cw//2, ch//2, image=self.photo, anchor=tk.CENTER)
+            else:
+                self.canvas.itemconfigure(self._img_item, image=self.photo)
         else:
-            new_h=ch; new_w=int(ch*ar)
-        im=im.resize((new_w,new_h), Image.LANCZOS)
-        self.photo = ImageTk.PhotoImage(im)
-        self.canvas.delete("all")
-        self.canvas.create_image(cw//2, ch//2, image=self.photo, anchor=tk.CENTER)
+            self.photo.paste(im)
+        self.canvas.coords(self._img_item, cw//2, ch//2)
         # poly preview
+        self.canvas.delete("overlay")
         if self._drawing_poly and self._poly_canvas_pts:
             for i in range(1,len(self._poly_canvas_pts)):
                 p1=self._poly_canvas_pts[i-1]; p2=self._poly_canvas_pts[i]
-                self.canvas.create_line(p1[0],p1[1],p2[0],p2[1],fill="#ffcc00",width=2)
+                self.canvas.create_line(p1[0],p1[1],p2[0],p2[1],fill="#ffcc00",width=2,tags="overlay")
 
     def canvas_to_frame_point(self, cx, cy):
         if self.frame is None:
@@ -542,15 +666,7 @@ class App:
         fh,fw = self.frame.shape[:2]
         cw = self.canvas.winfo_width() or 1
         ch = self.canvas.winfo_height() or 1
-        ar_f = fw/fh; ar_c = cw/ch
-        if ar_f>ar_c:
-            scale = cw/fw
-            new_h=int(fh*scale)
-            y_off=(ch-new_h)//2; x_off=0
-        else:
-            scale = ch/fh
-            new_w=int(fw*scale)
-            x_off=(cw-new_w)//2; y_off=0
+        _, _, x_off, y_off, scale = fit_rect(fw, fh, cw, ch)
         x_adj = cx - x_off
         y_adj = cy - y_off
         fx = int(x_adj/scale); fy=int(y_adj/scale)
@@ -569,7 +685,7 @@ class App:
             return
         ok = self.db.insert_person_snapshot(self.occupancy, note="manual store")
         if ok:
-            self.alert_list.insert(tk.END, f"[{time.strftime('%H:%M:%S')}] DB STORE OK (occ={self.occupancy})")
+            self.alert_list.insert(tk.END, f"[{time.strftime('%H:%M:%S')}] DB STORE QUEUED (occ={self.occupancy}, q={self.db.queue_depth()})")
         else:
             self.alert_list.insert(tk.END, f"[{time.strftime('%H:%M:%S')}] DB STORE FAILED")
         self.alert_list.yview_moveto(1.0)
@@ -599,14 +715,12 @@ class App:
             e=ttk.Entry(win); e.insert(0,str(v)); e.grid(row=i,column=1,sticky="ew")
             entries[k]=e
         def save():
-            for k,e in entries.items():
-                val=e.get().strip()
-                if k=="enable":
-                    DB_CONFIG[k] = val.lower() in ("1","true","yes","on")
-                elif k in ("port",):
-                    DB_CONFIG[k] = int(val)
-                else:
-                    DB_CONFIG[k] = val
+            try:
+                vals = {k: parse_setting(DB_CONFIG.get(k), e.get()) for k,e in entries.items()}
+            except ValueError as ex:
+                messagebox.showerror("DB Settings", f"Nilai tidak valid: {ex}", parent=win)
+                return
+            DB_CONFIG.update(vals)
             settings.save()
             if DB_CONFIG.get("enable"):
                 self.db.connect()
@@ -641,8 +755,10 @@ class App:
     def on_close(self):
         self.is_running=False
         self.is_preview=False
-        if self.cap and self.cap.isOpened():
-            self.cap.release()
+        self.close_video_source()
+        if self.session.rollup is not None:
+            self.session.rollup.close()
+            self.db.insert_rollups(self.session.rollup.drain())
         self.db.close()
         settings.save()
         self.root.destroy()
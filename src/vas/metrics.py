@@ -0,0 +1,242 @@
+"""
+Instrumentasi ringan: counter, gauge, histogram + exporter HTTP format
+Prometheus (text 0.0.4). Update metrik hanya increment di bawah lock;
+serialisasi teks baru dikerjakan saat /metrics di-scrape.
+
+    from .metrics import REGISTRY
+    FRAMES = REGISTRY.counter("vas_frames_total", "Frame diproses", ["source"])
+    FRAMES.labels(source="cam1").inc()
+"""
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .config import METRICS_CONFIG
+
+# detik; cocok untuk latency capture / inferensi / DB
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _fmt_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    esc = lambda v: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in pairs) + "}"
+
+def _fmt_value(v):
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, doc, labelnames=(), **kw):
+        self.name = name
+        self.doc = doc
+        self.labelnames = tuple(labelnames)
+        self._kw = kw
+        self._lock = threading.Lock()
+        self._children = {}
+        if not self.labelnames:
+            self._init_value()
+
+    def _init_value(self):
+        pass
+
+    def labels(self, *values, **kv):
+        if kv:
+            values = tuple(kv[n] for n in self.labelnames)
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.get(key)
+                if child is None:
+                    child = type(self)(self.name, self.doc, **self._kw)
+                    self._children[key] = child
+        return child
+
+    def _samples(self):
+        """→ list (suffix, label_values, extra_label, value)."""
+        if not self.labelnames:
+            return [(s, (), e, v) for s, e, v in self._own_samples()]
+        out = []
+        for key, child in list(self._children.items()):
+            out.extend((s, key, e, v) for s, e, v in child._own_samples())
+        return out
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, values, extra, v in self._samples():
+            lines.append(f"{self.name}{suffix}{_fmt_labels(self.labelnames, values, extra)} {_fmt_value(v)}")
+        return "\n".join(lines)
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _init_value(self):
+        self.value = 0
+
+    def inc(self, n=1):
+        with self._lock:
+            self.value += n
+
+    def _own_samples(self):
+        return [("_total" if not self.name.endswith("_total") else "", None, self.value)]
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _init_value(self):
+        self.value = 0
+        self._fn = None
+
+    def set(self, v):
+        self.value = v
+
+    def inc(self, n=1):
+        with self._lock:
+            self.value += n
+
+    def dec(self, n=1):
+        self.inc(-n)
+
+    def set_function(self, fn):
+        """Nilai dihitung saat scrape (mis. kedalaman antrian)."""
+        self._fn = fn
+
+    def _own_samples(self):
+        v = self.value
+        if self._fn is not None:
+            try:
+                v = self._fn()
+            except Exception:
+                pass
+        return [("", None, v)]
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, doc, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, doc, labelnames, buckets=self.buckets)
+
+    def _init_value(self):
+        self._counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, v):
+        i = bisect.bisect_left(self.buckets, v)
+        with self._lock:
+            self._counts[i] += 1
+            self.sum += v
+            self.count += 1
+
+    def _own_samples(self):
+        with self._lock:
+            counts = list(self._counts)
+            total, s = self.count, self.sum
+        out = []
+        acc = 0
+        for le, c in zip(self.buckets + (float("inf"),), counts):
+            acc += c
+            out.append(("_bucket", ("le", _fmt_value(le) if le == float("inf") else repr(le)), acc))
+        out.append(("_sum", None, s))
+        out.append(("_count", None, total))
+        return out
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, doc, labelnames=(), **kw):
+        with self._lock:
+            m = self._metrics.get(name)
+            if m is None:
+                m = cls(name, doc, labelnames, **kw)
+                self._metrics[name] = m
+            return m
+
+    def counter(self, name, doc, labelnames=()):
+        return self._get(Counter, name, doc, labelnames)
+
+    def gauge(self, name, doc, labelnames=()):
+        return self._get(Gauge, name, doc, labelnames)
+
+    def histogram(self, name, doc, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._get(Histogram, name, doc, labelnames, buckets=buckets)
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(m.render() for m in metrics) + "\n"
+
+REGISTRY = Registry()
+
+# ---- metrik pipeline ----
+CAPTURE_FRAMES = REGISTRY.counter("vas_capture_frames_total", "Frame dibaca dari source", ["source"])
+CAPTURE_DROPPED = REGISTRY.counter("vas_capture_dropped_total", "Frame tertimpa sebelum diproses", ["source"])
+CAPTURE_LATENCY = REGISTRY.histogram("vas_capture_seconds", "Latency baca satu frame", ["source"])
+FRAMES_PROCESSED = REGISTRY.counter("vas_frames_processed_total", "Frame masuk stage counting", ["source"])
+DETECT_LATENCY = REGISTRY.histogram("vas_detect_seconds", "Latency inferensi detect_persons", ["source"])
+AOI_LATENCY = REGISTRY.histogram("vas_aoi_count_seconds", "Latency hitung AOI", ["source"])
+INFER_SKIPPED = REGISTRY.counter("vas_inference_skipped_total", "Inferensi dilewati motion gate", ["source"])
+EFFECTIVE_STRIDE = REGISTRY.gauge("vas_detection_stride", "detection_stride efektif", ["source"])
+EFFECTIVE_IMGSZ = REGISTRY.gauge("vas_imgsz", "imgsz inferensi efektif", ["source"])
+OCCUPANCY = REGISTRY.gauge("vas_occupancy", "Occupancy terakhir di AOI", ["source"])
+CAPTURE_TO_COUNT = REGISTRY.histogram("vas_capture_to_count_seconds", "Capture → occupancy terhitung", ["source"])
+CAPTURE_TO_ALERT = REGISTRY.histogram("vas_capture_to_alert_seconds", "Capture → alert dipicu", ["source"])
+SCHED_SERVED = REGISTRY.counter("vas_scheduler_frames_total", "Frame masuk batch inferensi scheduler", ["source"])
+SCHED_SKIPPED = REGISTRY.counter("vas_scheduler_skipped_total", "Frame tanpa inferensi (stride / motion gate)", ["source"])
+SCHED_STALE = REGISTRY.counter("vas_scheduler_stale_total", "Frame dibuang karena melewati max_frame_age_ms", ["source"])
+SCHED_RATE = REGISTRY.gauge("vas_scheduler_rate", "Laju inferensi terjadwal (fps)", ["source"])
+SCHED_BATCH = REGISTRY.histogram("vas_scheduler_batch_size", "Frame per batch inferensi lintas source",
+                                 buckets=(1, 2, 3, 4, 6, 8, 12, 16))
+STARTUP_SECONDS = REGISTRY.gauge("vas_startup_seconds", "Detik sejak launch per tahap startup", ["stage"])
+ALERTS = REGISTRY.counter("vas_alerts_total", "Alert / transisi status", ["type"])
+DB_QUEUE_DEPTH = REGISTRY.gauge("vas_db_queue_depth", "Baris menunggu ditulis ke DB")
+DB_ROWS_WRITTEN = REGISTRY.counter("vas_db_rows_written_total", "Baris berhasil ditulis ke DB")
+DB_ROWS_DROPPED = REGISTRY.counter("vas_db_rows_dropped_total", "Baris dibuang karena antrian penuh")
+DB_WRITE_LATENCY = REGISTRY.histogram("vas_db_write_seconds", "Latency tulis satu batch")
+DB_WRITE_LAG = REGISTRY.histogram("vas_db_write_lag_seconds", "Umur baris saat berhasil ditulis",
+                                  buckets=(0.1, 0.5, 1, 2, 5, 10, 30, 60, 300, 900, 3600))
+
+class _Handler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def start_http_server(port=None, host=None, registry=REGISTRY):
+    """Exporter /metrics di thread daemon → server (None jika gagal bind)."""
+    port = int(port if port is not None else METRICS_CONFIG.get("port", 9108))
+    host = host or METRICS_CONFIG.get("host", "127.0.0.1")
+    handler = type("MetricsHandler", (_Handler,), {"registry": registry})
+    try:
+        server = ThreadingHTTPServer((host, port), handler)
+    except OSError:
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+def maybe_start_exporter():
+    if METRICS_CONFIG.get("enable"):
+        return start_http_server()
+    return None
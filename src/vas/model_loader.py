@@ -1,18 +1,114 @@
-from ultralytics import YOLO
-from .config import MODEL_CONFIG, RUNTIME_CONFIG
-import torch
+"""
+Muat model YOLO sesuai MODEL_CONFIG["backend"]:
+  torch       → .pt lewat Ultralytics (CPU / CUDA)
+  onnxruntime → .pt diekspor sekali ke ONNX
+  openvino    → .pt diekspor sekali ke direktori *_openvino_model
+Hasil ekspor di-cache di sebelah .pt dengan nama <stem>.<hash>.<imgsz>,
+sehingga start berikutnya langsung memuat file ekspor. Semua backend dipanggil
+lewat objek YOLO yang sama, jadi detect_persons tidak berubah.
+Ekspor otomatis memakai shape dinamis bila batching / tiling / aoi_crop /
+adapt_imgsz dipakai (needs_dynamic). Model ekspor statis ditandai
+vas_static_imgsz sehingga detection.py memanggilnya per frame pada imgsz ekspor.
+torch / ultralytics baru diimpor saat model dimuat (startup UI tetap cepat).
+"""
+import hashlib
+import logging
+import re
+from pathlib import Path
+
+import numpy as np
+
+from .config import MODEL_CONFIG, RUNTIME_CONFIG, ADAPTIVE_STRIDE_CONFIG
+
+log = logging.getLogger("vas.model_loader")
+
+# backend → (format export Ultralytics, suffix file/direktori hasil)
+EXPORT_FORMATS = {
+    "onnxruntime": ("onnx", ".onnx"),
+    "openvino": ("openvino", "_openvino_model"),
+}
+
+# <stem>.<hash>.<imgsz>[d][.int8]<suffix>, lihat export_path / vas-quantize
+_EXPORT_NAME = re.compile(r"\.(\d+)(d?)(?:\.int8)?(?:\.onnx|_openvino_model)$")
 
 def resolve_device():
     dev = MODEL_CONFIG.get("device", "auto")
     if dev == "auto":
         try:
+            import torch
             return "cuda" if torch.cuda.is_available() else "cpu"
         except Exception:
             return "cpu"
     return dev
 
+def file_hash(path, n=12):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()[:n]
+
+def is_exported(path) -> bool:
+    p = str(path).rstrip("/\\")
+    return any(p.endswith(sfx) for _, sfx in EXPORT_FORMATS.values()) or p.endswith((".xml", ".engine"))
+
+def export_path(pt_path, backend, imgsz, dynamic=False) -> Path:
+    pt = Path(pt_path)
+    _, sfx = EXPORT_FORMATS[backend]
+    tag = f"{imgsz}d" if dynamic else str(imgsz)
+    return pt.with_name(f"{pt.stem}.{file_hash(pt)}.{tag}{sfx}")
+
+def export_info(path):
+    """(imgsz, dynamic) dari nama file ekspor, atau None bila tidak dikenali."""
+    m = _EXPORT_NAME.search(str(path).rstrip("/\\"))
+    return (int(m.group(1)), m.group(2) == "d") if m else None
+
+def needs_dynamic() -> bool:
+    """Konfigurasi yang mengirim batch > 1 atau input non-persegi / berubah ke model."""
+    return bool(int(RUNTIME_CONFIG.get("max_batch_size", 1) or 1) > 1 or RUNTIME_CONFIG.get("tiled")
+                or RUNTIME_CONFIG.get("aoi_crop")
+                or (ADAPTIVE_STRIDE_CONFIG.get("enable") and ADAPTIVE_STRIDE_CONFIG.get("adapt_imgsz")))
+
+def mark_static(model, path, imgsz=None):
+    """Tandai model ekspor statis → detection.py memanggilnya per frame pada imgsz ekspor."""
+    info = export_info(path)
+    if info is None or not info[1]:
+        model.vas_static_imgsz = info[0] if info else int(imgsz or RUNTIME_CONFIG.get("imgsz", 640))
+    return model
+
+def export_cached(pt_path, backend, imgsz=None, dynamic=None) -> Path:
+    """Ekspor .pt ke format backend bila belum ada di cache → path hasil ekspor."""
+    imgsz = int(imgsz or RUNTIME_CONFIG.get("imgsz", 640))
+    if dynamic is None:
+        dynamic = MODEL_CONFIG.get("export_dynamic", False) or needs_dynamic()
+    dynamic = bool(dynamic)
+    out = export_path(pt_path, backend, imgsz, dynamic)
+    if out.exists():
+        return out
+    fmt, _ = EXPORT_FORMATS[backend]
+    from ultralytics import YOLO
+    log.info("Ekspor %s → %s (imgsz=%d, sekali saja)", pt_path, fmt, imgsz)
+    kw = {"batch": max(1, int(RUNTIME_CONFIG.get("max_batch_size", 4) or 1))} if dynamic else {}
+    produced = YOLO(str(pt_path)).export(format=fmt, imgsz=imgsz, dynamic=dynamic, half=False, **kw)
+    Path(produced).replace(out)
+    return out
+
 def load_model():
-    m = YOLO(MODEL_CONFIG["model_path"])
+    from ultralytics import YOLO
+    path = MODEL_CONFIG["model_path"]
+    backend = MODEL_CONFIG.get("backend", "torch")
+    if backend in EXPORT_FORMATS and not is_exported(path):
+        try:
+            path = str(export_cached(path, backend))
+        except Exception as e:
+            log.warning("Ekspor %s gagal (%s), kembali ke torch", backend, e)
+            backend = "torch"
+    if backend != "torch" or is_exported(path):
+        # model ekspor FP32 untuk CPU: tanpa .to() / half
+        m = mark_static(YOLO(path, task="detect"), path)
+        MODEL_CONFIG["device"] = "cpu"
+        return m
+    m = YOLO(path)
     device = resolve_device()
     m.to(device)
     if device.startswith("cuda") and RUNTIME_CONFIG.get("use_half", True):
@@ -21,4 +117,12 @@ def load_model():
         except Exception:
             pass
     MODEL_CONFIG["device"] = device
-    return m
\ No newline at end of file
+    return m
+
+def warmup(model, imgsz=None, runs=1):
+    """Inferensi dummy pada imgsz: alokasi, konteks CUDA, dan kompilasi graph dibayar di sini."""
+    from .detection import detect_persons_array
+    imgsz = int(imgsz or RUNTIME_CONFIG.get("imgsz", 640))
+    frame = np.zeros((imgsz, imgsz, 3), np.uint8)
+    for _ in range(max(1, runs)):
+        detect_persons_array(model, frame)
@@ -0,0 +1,187 @@
+"""
+Proses file video rekaman secepat hardware mampu (bukan real-time).
+Decode berjalan di thread terpisah, frame diinferensi per batch, dan
+occupancy per frame ditulis ke CSV (atau Parquet jika pyarrow tersedia).
+Subsampling: frame yang dilewati cukup grab() tanpa retrieve, atau seek
+langsung bila stride >= file_seek_threshold.
+
+    vas-offline rekaman.mp4 [-o hasil.csv] [--stride 5]
+"""
+import argparse
+import csv
+import logging
+import queue
+import threading
+import time
+from pathlib import Path
+
+import cv2
+
+from .config import RUNTIME_CONFIG, INPUT_CONFIG, AOI_CONFIG
+from .detection import detect_persons_batch_array
+from .utils.aoi import AOIIndex, count_in_aoi
+
+log = logging.getLogger("vas.offline")
+
+COLUMNS = ["frame", "time_sec", "occupancy", "detections"]
+
+def iter_frames(cap, stride=1, seek_threshold=30):
+    """Yield (frame_idx, frame) tiap `stride` frame."""
+    stride = max(1, int(stride))
+    idx = 0
+    while True:
+        ret, fr = cap.read()
+        if not ret:
+            return
+        yield idx, fr
+        idx += stride
+        if stride == 1:
+            continue
+        if stride >= seek_threshold:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, idx)
+        else:
+            for _ in range(stride - 1):
+                if not cap.grab():
+                    return
+
+class _RowWriter:
+    def __init__(self, path: Path):
+        self.path = path
+        self.parquet = path.suffix.lower() == ".parquet"
+        if self.parquet:
+            try:
+                import pyarrow  # noqa: F401
+            except Exception:
+                raise RuntimeError("output .parquet butuh paket pyarrow")
+            self._cols = {c: [] for c in COLUMNS}
+        else:
+            self._f = open(path, "w", newline="", encoding="utf-8")
+            self._w = csv.writer(self._f)
+            self._w.writerow(COLUMNS)
+
+    def write(self, rows):
+        if self.parquet:
+            for r in rows:
+                for c, v in zip(COLUMNS, r):
+                    self._cols[c].append(v)
+        else:
+            self._w.writerows(rows)
+
+    def close(self):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            pq.write_table(pa.table(self._cols), str(self.path))
+        else:
+            self._f.close()
+
+def process_video(path, out_path, model, stride=None, aoi_index=None, batch_size=None, progress_cb=None):
+    """Hitung occupancy per frame untuk satu file → dict ringkasan."""
+    stride = max(1, int(stride or INPUT_CONFIG.get("file_stride", 1)))
+    batch_size = max(1, int(batch_size or RUNTIME_CONFIG.get("max_batch_size", 4)))
+    aoi_index = aoi_index or AOIIndex.from_config(AOI_CONFIG)
+    cap = cv2.VideoCapture(str(path))
+    if not cap or not cap.isOpened():
+        raise RuntimeError(f"Tidak dapat membuka video: {path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+
+    # Decode di thread sendiri, antrian blocking (offline: tidak ada frame dibuang).
+    # Marker akhir (None) dikirim dengan retry yang sama seperti frame; error
+    # reader diteruskan ke thread utama dan di-raise ulang.
+    q = queue.Queue(maxsize=batch_size * 4)
+    stop = threading.Event()
+    errors = []
+    def put(item):
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+    def reader():
+        try:
+            for item in iter_frames(cap, stride, int(INPUT_CONFIG.get("file_seek_threshold", 30))):
+                if not put(item):
+                    return
+        except Exception as e:
+            errors.append(e)
+        finally:
+            put(None)
+    th = threading.Thread(target=reader, name="offline-decode", daemon=True)
+    th.start()
+
+    writer = _RowWriter(Path(out_path))
+    processed = 0
+    t0 = time.perf_counter()
+    done = False
+    try:
+        while not done:
+            batch = []
+            while len(batch) < batch_size:
+                try:
+                    item = q.get(timeout=0.5)
+                except queue.Empty:
+                    if th.is_alive():
+                        continue
+                    item = None     # reader mati tanpa marker
+                if item is None:
+                    done = True
+                    break
+                batch.append(item)
+            if not batch:
+                break
+            results = detect_persons_batch_array(model, [fr for _, fr in batch], max_batch_size=batch_size,
+                                                  aoi_index=aoi_index)
+            rows = []
+            for (idx, _), dets in zip(batch, results):
+                occ, _ = count_in_aoi(dets, aoi_index)
+                rows.append((idx, round(idx / fps, 3), occ, len(dets)))
+            writer.write(rows)
+            processed += len(batch)
+            if progress_cb:
+                progress_cb(batch[-1][0], total)
+    finally:
+        stop.set()
+        th.join(timeout=2)
+        cap.release()
+        writer.close()
+    if errors:
+        raise errors[0]
+    elapsed = time.perf_counter() - t0
+    return {
+        "frames": processed,
+        "elapsed_sec": round(elapsed, 2),
+        "fps": round(processed / elapsed, 1) if elapsed > 0 else 0.0,
+        "video_frames": total,
+        "stride": stride,
+        "output": str(out_path),
+    }
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="vas-offline", description="Hitung occupancy dari file video")
+    ap.add_argument("video", nargs="?", default=INPUT_CONFIG.get("file_path") or None)
+    ap.add_argument("-o", "--output", help="file .csv / .parquet (default: <video>.occupancy.csv)")
+    ap.add_argument("--stride", type=int, default=None, help="proses tiap N frame")
+    ap.add_argument("--batch", type=int, default=None, help="frame per forward pass")
+    args = ap.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    if not args.video:
+        ap.error("path video wajib (argumen atau input.file_path)")
+    out = args.output or INPUT_CONFIG.get("file_output") or str(Path(args.video).with_suffix(".occupancy.csv"))
+    from .model_loader import load_model
+    model = load_model()
+    last = [0.0]
+    def progress(idx, total):
+        now = time.time()
+        if now - last[0] >= 5:
+            last[0] = now
+            log.info("frame %d/%d", idx, total)
+    summary = process_video(args.video, out, model, stride=args.stride, batch_size=args.batch,
+                            progress_cb=progress)
+    log.info("Selesai: %(frames)d frame dalam %(elapsed_sec)ss (%(fps)s fps) → %(output)s", summary)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
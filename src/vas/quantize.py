@@ -0,0 +1,194 @@
+"""
+Kuantisasi INT8 post-training untuk CPU (mini-PC di pintu masuk curug).
+model_path (.pt) diekspor ke ONNX FP32, dikalibrasi dengan frame milik kita
+sendiri (onnxruntime.quantization.quantize_static), lalu dibandingkan dengan
+FP32 pada klip held-out: throughput dan selisih count di AOI.
+
+    vas-quantize --calib frames/ --clip uji.mp4 [--apply]
+
+--apply hanya menulis model_path (INT8) + backend onnxruntime ke settings.json;
+--imgsz dipakai untuk ekspor / kalibrasi / evaluasi tanpa mengubah config runtime.
+"""
+import argparse
+import json
+import logging
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from .config import settings, MODEL_CONFIG, RUNTIME_CONFIG, AOI_CONFIG
+from .utils.aoi import AOIIndex
+
+log = logging.getLogger("vas.quantize")
+
+IMAGE_EXT = {".jpg", ".jpeg", ".png", ".bmp"}
+VIDEO_EXT = {".mp4", ".avi", ".mkv", ".mov"}
+
+def letterbox(frame, imgsz):
+    """BGR HxWx3 → NCHW float32 [0,1], letterbox persegi (padding 114) seperti Ultralytics."""
+    h, w = frame.shape[:2]
+    r = min(imgsz / h, imgsz / w)
+    nw, nh = int(round(w * r)), int(round(h * r))
+    out = np.full((imgsz, imgsz, 3), 114, np.uint8)
+    top, left = (imgsz - nh) // 2, (imgsz - nw) // 2
+    out[top:top+nh, left:left+nw] = cv2.resize(frame, (nw, nh), interpolation=cv2.INTER_LINEAR)
+    x = cv2.cvtColor(out, cv2.COLOR_BGR2RGB).transpose(2, 0, 1)[None]
+    return np.ascontiguousarray(x, dtype=np.float32) / 255.0
+
+def iter_calib_frames(folder, limit=200, video_step=30):
+    """Frame kalibrasi dari folder berisi gambar dan/atau video."""
+    n = 0
+    for p in sorted(Path(folder).rglob("*")):
+        ext = p.suffix.lower()
+        if ext in IMAGE_EXT:
+            fr = cv2.imread(str(p))
+            if fr is not None:
+                yield fr; n += 1
+        elif ext in VIDEO_EXT:
+            cap = cv2.VideoCapture(str(p))
+            idx = 0
+            while n < limit:
+                ret, fr = cap.read()
+                if not ret:
+                    break
+                if idx % video_step == 0:
+                    yield fr; n += 1
+                idx += 1
+            cap.release()
+        if n >= limit:
+            return
+
+def clip_frames(path, limit=300):
+    cap = cv2.VideoCapture(str(path))
+    frames = []
+    while len(frames) < limit:
+        ret, fr = cap.read()
+        if not ret:
+            break
+        frames.append(fr)
+    cap.release()
+    return frames
+
+def quantize_onnx(fp32_path, out_path, calib_frames, imgsz):
+    from onnxruntime import InferenceSession
+    from onnxruntime.quantization import (CalibrationDataReader, QuantFormat, QuantType,
+                                          quantize_static)
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    input_name = InferenceSession(str(fp32_path), providers=["CPUExecutionProvider"]).get_inputs()[0].name
+
+    class Reader(CalibrationDataReader):
+        def __init__(self):
+            self._it = iter(calib_frames)
+        def get_next(self):
+            fr = next(self._it, None)
+            return None if fr is None else {input_name: letterbox(fr, imgsz)}
+
+    prep = Path(out_path).with_suffix(".prep.onnx")
+    try:
+        quant_pre_process(str(fp32_path), str(prep))
+        src = prep
+    except Exception as e:
+        log.warning("pre-process ONNX dilewati: %s", e)
+        src = fp32_path
+    quantize_static(str(src), str(out_path), Reader(), quant_format=QuantFormat.QDQ,
+                    per_channel=True, activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8)
+    if prep.exists():
+        prep.unlink()
+    _copy_metadata(fp32_path, out_path)
+    return Path(out_path)
+
+def _copy_metadata(src, dst):
+    # metadata Ultralytics (names, stride, imgsz) agar YOLO(int8.onnx) sama dengan FP32
+    try:
+        import onnx
+        m_src, m_dst = onnx.load(str(src)), onnx.load(str(dst))
+        have = {p.key for p in m_dst.metadata_props}
+        for p in m_src.metadata_props:
+            if p.key not in have:
+                m_dst.metadata_props.add(key=p.key, value=p.value)
+        onnx.save(m_dst, str(dst))
+    except Exception as e:
+        log.warning("metadata ONNX tidak tersalin: %s", e)
+
+def evaluate(model_path, frames, aoi_index, imgsz=None):
+    """→ (counts per frame, fps) memakai jalur detect_persons_array yang sama pada imgsz ekspor."""
+    from ultralytics import YOLO
+    from .detection import detect_persons_array
+    from .model_loader import mark_static
+    from .utils.aoi import count_in_aoi
+    model = mark_static(YOLO(str(model_path), task="detect"), model_path, imgsz)
+    detect_persons_array(model, frames[0], imgsz=imgsz)     # warm-up
+    counts = []
+    t0 = time.perf_counter()
+    for fr in frames:
+        counts.append(count_in_aoi(detect_persons_array(model, fr, imgsz=imgsz), aoi_index)[0])
+    elapsed = time.perf_counter() - t0
+    return np.asarray(counts), len(frames) / elapsed if elapsed > 0 else 0.0
+
+def compare(fp32_counts, int8_counts, fp32_fps, int8_fps):
+    diff = np.abs(fp32_counts - int8_counts)
+    return {
+        "frames": int(len(diff)),
+        "fp32_fps": round(fp32_fps, 1),
+        "int8_fps": round(int8_fps, 1),
+        "speedup": round(int8_fps / fp32_fps, 2) if fp32_fps else None,
+        "count_mae": round(float(diff.mean()), 3) if len(diff) else 0.0,
+        "count_exact": round(float((diff == 0).mean()), 3) if len(diff) else 1.0,
+        "fp32_mean_count": round(float(fp32_counts.mean()), 2) if len(diff) else 0.0,
+        "int8_mean_count": round(float(int8_counts.mean()), 2) if len(diff) else 0.0,
+    }
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="vas-quantize", description="Kuantisasi INT8 model person detector")
+    ap.add_argument("--calib", required=True, help="folder frame / video kalibrasi")
+    ap.add_argument("--clip", help="video held-out untuk evaluasi")
+    ap.add_argument("--model", default=MODEL_CONFIG["model_path"], help="bobot .pt (default: model_path)")
+    ap.add_argument("--imgsz", type=int, default=RUNTIME_CONFIG.get("imgsz", 640))
+    ap.add_argument("--calib-frames", type=int, default=200)
+    ap.add_argument("--eval-frames", type=int, default=300)
+    ap.add_argument("-o", "--output", help="default: <stem>.<hash>.<imgsz>.int8.onnx")
+    ap.add_argument("--report", help="tulis ringkasan evaluasi ke JSON")
+    ap.add_argument("--apply", action="store_true", help="pakai model INT8 di settings.json")
+    args = ap.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    from .model_loader import export_cached, export_info, is_exported
+    fp32 = Path(args.model) if is_exported(args.model) else export_cached(args.model, "onnxruntime", args.imgsz, False)
+    out = Path(args.output) if args.output else fp32.with_name(fp32.name[:-len(".onnx")] + ".int8.onnx")
+
+    calib = list(iter_calib_frames(args.calib, args.calib_frames))
+    if not calib:
+        log.error("Tidak ada frame kalibrasi di %s", args.calib)
+        return 1
+    log.info("Kalibrasi %d frame → %s", len(calib), out)
+    quantize_onnx(fp32, out, calib, args.imgsz)
+
+    if args.clip:
+        frames = clip_frames(args.clip, args.eval_frames)
+        if not frames:
+            log.error("Klip evaluasi kosong: %s", args.clip)
+            return 1
+        aoi_index = AOIIndex.from_config(AOI_CONFIG)
+        c32, fps32 = evaluate(fp32, frames, aoi_index, args.imgsz)
+        c8, fps8 = evaluate(out, frames, aoi_index, args.imgsz)
+        summary = compare(c32, c8, fps32, fps8)
+        log.info("FP32 %(fp32_fps)s fps, INT8 %(int8_fps)s fps (%(speedup)sx); "
+                 "selisih count MAE %(count_mae)s, sama persis %(count_exact)s", summary)
+        if args.report:
+            with open(args.report, "w", encoding="utf-8") as f:
+                json.dump({"fp32": str(fp32), "int8": str(out), **summary}, f, indent=2)
+
+    if args.apply:
+        # hanya model_path + backend; imgsz runtime tidak diubah (model ekspor membawa imgsz di namanya)
+        settings.save_keys("model", model_path=str(out), backend="onnxruntime")
+        if export_info(out) is None and args.imgsz != RUNTIME_CONFIG.get("imgsz", 640):
+            log.warning("Nama %s tidak memuat imgsz: runtime memakai imgsz=%s, bukan %d",
+                        out.name, RUNTIME_CONFIG.get("imgsz", 640), args.imgsz)
+        log.info("settings.json: model_path=%s backend=onnxruntime", out)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,159 @@
+"""
+Scheduler inferensi lintas source di depan detect_persons (vas-headless).
+Tiap step:
+  1. source dengan frame baru dan sudah jatuh tempo (target_fps) menjadi
+     kandidat; frame yang umurnya > max_frame_age_ms dibuang (deadline lewat).
+  2. kandidat diurutkan: priority tertinggi dulu, lalu virtual time (mode
+     weighted: tiap frame menambah 1/weight; round_robin: weight = 1), lalu
+     deadline terdekat.
+  3. sesuai urutan itu, CountingSession.begin (stride / motion gate) dipanggil
+     sampai batch berisi max_batch_size frame yang benar-benar perlu
+     inferensi; hanya frame itu yang dibebani virtual time, target_fps, dan
+     slot batch. Frame tanpa inferensi dihitung terpisah (skipped).
+     Batch yang belum penuh menunggu maksimal batch_max_wait_ms agar frame
+     baru dari source lain (satu frame per source per step) ikut masuk.
+  4. batch diinferensi lintas source (detect_persons_multi_array), hasil
+     dibagikan ke session masing-masing (finish).
+Source sibuk (RTSP 30 fps) tidak bisa memonopoli model: sumber lain tetap
+mendapat giliran sesuai bobotnya. Laju inferensi tercapai, frame basi,
+dan frame tanpa inferensi per source tersedia lewat stats() / describe() dan metrik vas_scheduler_*.
+"""
+import time
+from collections import deque
+
+from .config import RUNTIME_CONFIG, SCHEDULER_CONFIG
+from .detection import detect_persons_multi_array
+from .metrics import SCHED_SERVED, SCHED_STALE, SCHED_SKIPPED, SCHED_RATE, SCHED_BATCH
+
+class _SourceState:
+    def __init__(self, src, cfg, weighted):
+        sched = src.sched
+        self.src = src
+        self.priority = int(sched.get("priority", 0))
+        self.weight = max(0.01, float(sched.get("weight", 1.0))) if weighted else 1.0
+        fps = float(sched.get("target_fps", 0) or 0)
+        self.interval = 1.0 / fps if fps > 0 else 0.0
+        self.max_age = float(sched.get("max_frame_age_ms", cfg.get("max_frame_age_ms", 1000)) or 0) / 1000.0
+        self.next_due = 0.0
+        self.vtime = 0.0
+        self.served = 0             # frame yang masuk batch inferensi
+        self.stale = 0
+        self.skipped = 0            # frame diambil tapi dilewati stride / motion gate
+        self.times = deque()        # waktu inferensi dalam rate window
+        self._m_served = SCHED_SERVED.labels(source=src.name)
+        self._m_stale = SCHED_STALE.labels(source=src.name)
+        self._m_skipped = SCHED_SKIPPED.labels(source=src.name)
+        self._m_rate = SCHED_RATE.labels(source=src.name)
+
+    def deadline(self, ts):
+        return ts + self.max_age if self.max_age > 0 else float("inf")
+
+class InferenceScheduler:
+    def __init__(self, sources, model, cfg=None, idle_sleep=0.002):
+        self.cfg = SCHEDULER_CONFIG if cfg is None else cfg
+        self.model = model
+        weighted = self.cfg.get("mode", "weighted") == "weighted"
+        self.states = [_SourceState(src, self.cfg, weighted) for src in sources]
+        self.max_batch = max(1, int(self.cfg.get("max_batch_size") or RUNTIME_CONFIG.get("max_batch_size", 4)))
+        wait = self.cfg.get("batch_max_wait_ms")
+        wait = RUNTIME_CONFIG.get("batch_max_wait_ms", 15) if wait is None else wait
+        self.max_wait = max(0.0, float(wait or 0)) / 1000.0
+        self.window = max(0.1, float(self.cfg.get("rate_window_sec", 5)))
+        self.idle_sleep = idle_sleep
+        self.vclock = 0.0
+        self.batches = 0
+
+    def _ready(self, now, mono):
+        ready = []
+        for st in self.states:
+            src = st.src
+            slot = src.worker.slot
+            if slot.seq <= src.seq or mono < st.next_due:
+                continue
+            if st.max_age > 0 and now - slot.ts > st.max_age:
+                got = slot.get(src.seq)     # buang: frame ini tidak relevan lagi
+                if got is not None:
+                    src.seq = got[0]
+                    st.stale += 1
+                    st._m_stale.inc()
+                continue
+            # source yang baru aktif lagi tidak "menabung" giliran
+            st.vtime = max(st.vtime, self.vclock)
+            ready.append(st)
+        ready.sort(key=lambda st: (-st.priority, st.vtime, st.deadline(st.src.worker.slot.ts)))
+        return ready
+
+    def _serve(self, st, mono):
+        self.vclock = st.vtime
+        st.vtime += 1.0 / st.weight
+        if st.interval:
+            st.next_due = max(st.next_due, mono - st.interval) + st.interval
+        st.served += 1
+        st._m_served.inc()
+        st.times.append(mono)
+        while st.times[0] < mono - self.window:
+            st.times.popleft()
+        st._m_rate.set(len(st.times) / self.window)
+
+    def step(self):
+        """Satu putaran penjadwalan → [(source, (dets, inside))] untuk frame yang diproses."""
+        now, mono = time.time(), time.monotonic()
+        ready = self._ready(now, mono)
+        if not ready:
+            time.sleep(self.idle_sleep)
+            return []
+        out, pending, n = [], {}, 0
+        taken = set()
+        deadline = mono + self.max_wait
+        while True:
+            for st in ready:
+                if n >= self.max_batch:
+                    break           # sisa kandidat tidak disentuh, tetap di slot
+                src = st.src
+                got = src.worker.slot.get(src.seq)
+                if got is None:
+                    continue
+                taken.add(st)
+                src.seq, ts, fr = got
+                need, val = src.session.begin(fr, ts, src.seq)
+                if not need:
+                    st.skipped += 1
+                    st._m_skipped.inc()
+                    out.append((src, val))
+                    continue
+                self._serve(st, mono)
+                pending.setdefault(val, []).append((src, fr))
+                n += 1
+            # batch belum penuh: tunggu frame source lain sampai batch_max_wait_ms
+            if n == 0 or n >= self.max_batch or len(taken) == len(self.states) or mono >= deadline:
+                break
+            time.sleep(min(self.idle_sleep, deadline - mono))
+            now, mono = time.time(), time.monotonic()
+            ready = [st for st in self._ready(now, mono) if st not in taken]
+        # satu forward pass per imgsz (adaptive_stride bisa berbeda per source)
+        for imgsz, items in pending.items():
+            t0 = time.perf_counter()
+            dets = detect_persons_multi_array(self.model, [fr for _, fr in items],
+                                              [src.session.aoi_index for src, _ in items], imgsz, self.max_batch)
+            share = (time.perf_counter() - t0) / len(items)
+            SCHED_BATCH.observe(len(items))
+            self.batches += 1
+            for (src, _), d in zip(items, dets):
+                out.append((src, src.session.finish(d, share)))
+        return out
+
+    def _stat(self, st, mono):
+        rate = sum(1 for t in st.times if t >= mono - self.window) / self.window
+        st._m_rate.set(rate)
+        return {"rate": rate, "served": st.served, "stale": st.stale, "skipped": st.skipped,
+                "dropped": st.src.worker.dropped if st.src.worker else 0}
+
+    def stats(self):
+        """name → {rate, served, stale, skipped, dropped}; rate = inferensi/detik, dropped = tertimpa di slot capture."""
+        mono = time.monotonic()
+        return {st.src.name: self._stat(st, mono) for st in self.states}
+
+    def describe(self, name):
+        st = next(st for st in self.states if st.src.name == name)
+        s = self._stat(st, time.monotonic())
+        return f"rate={s['rate']:.1f}fps stale={s['stale']} sched_skip={s['skipped']}"
@@ -0,0 +1,101 @@
+"""
+Beberapa source (kamera / region layar) dalam satu proses, satu model.
+settings.json:
+
+    "sources": [
+      {"name": "curug",  "input": {"type": "network", "stream_url": "rtsp://..."}, "aoi": {"rect": [..]}},
+      {"name": "parkir", "input": {"type": "webcam", "webcam_index": 1}}
+    ]
+
+Key input yang tidak diisi mengikuti "input" global. AOI tidak diwarisi
+(koordinat piksel milik kamera lain): tanpa "aoi" = seluruh frame; mode
+default "poly" bila hanya polygon diisi, selain itu "rect".
+priority / weight / target_fps / max_frame_age_ms dipakai scheduler.py. Tanpa
+"sources", satu source "default" dibentuk dari input + aoi global (perilaku
+lama). Input "file" hanya untuk mode satu source (vas-headless → offline.py):
+di sini file habis di EOF sementara CaptureWorker terus mencoba membaca. Tiap source punya CaptureWorker dan CountingSession sendiri
+(occupancy, status alert, rollup, label metrik, kolom source di DB).
+"""
+import copy
+
+from .config import RUNTIME_CONFIG, INPUT_CONFIG, AOI_CONFIG, SOURCES_CONFIG
+from .counting import CountingSession
+from .utils.aoi import AOIIndex
+from .utils.frame_source import CaptureWorker, open_capture
+from .utils.screen_capture import ScreenCapturer
+
+DEFAULT_SOURCE = "default"
+SCHED_KEYS = ("priority", "weight", "target_fps", "max_frame_age_ms")
+
+def source_aoi(aoi):
+    """AOI satu source secara utuh (tanpa merge dengan aoi global) → dict config AOIIndex."""
+    aoi = aoi or {}
+    rect, polygon = aoi.get("rect"), aoi.get("polygon") or []
+    mode = aoi.get("mode") or ("poly" if polygon and not rect else "rect")
+    return {"mode": mode, "rect": rect, "polygon": polygon}
+
+def source_configs(sources=None):
+    """
+    → [{"name", "input", "aoi", "sched"}] dengan default global; entri enable=false dilewati.
+    ValueError bila nama duplikat, ada input file, atau semua entri dinonaktifkan.
+    """
+    sources = SOURCES_CONFIG if sources is None else sources
+    if not sources:
+        return [{"name": DEFAULT_SOURCE, "input": INPUT_CONFIG, "aoi": AOI_CONFIG, "sched": {}}]
+    out, seen = [], set()
+    for i, s in enumerate(sources):
+        if not s.get("enable", True):
+            continue
+        name = str(s.get("name") or f"source{i}")
+        if name in seen:
+            raise ValueError(f"nama source duplikat: {name}")
+        seen.add(name)
+        inp = copy.deepcopy(INPUT_CONFIG)
+        inp.update(s.get("input", {}))
+        if inp.get("type") == "file":
+            raise ValueError(f"source {name}: input file tidak didukung di multi-source (pakai input global)")
+        out.append({"name": name, "input": inp, "aoi": source_aoi(s.get("aoi")),
+                    "sched": {k: s[k] for k in SCHED_KEYS if s.get(k) is not None}})
+    if not out:
+        raise ValueError("semua entri sources dinonaktifkan (enable=false)")
+    return out
+
+class Source:
+    def __init__(self, cfg, model):
+        self.name = cfg["name"]
+        self.input = cfg["input"]
+        self.sched = cfg.get("sched", {})
+        self.session = CountingSession(model, AOIIndex.from_config(cfg["aoi"]), self.name)
+        self.cap = None
+        self.worker = None
+        self.seq = 0
+
+    @property
+    def type(self):
+        return self.input.get("type", "screen")
+
+    def open(self):
+        t = self.type
+        # source default mempertahankan label capture lama (capture-<type>)
+        label = f"capture-{t}" if self.name == DEFAULT_SOURCE else f"capture-{self.name}"
+        if t == "screen":
+            region = self.input.get("screen_region")
+            if not region:
+                return False
+            screen_cap = ScreenCapturer(RUNTIME_CONFIG.get("use_mss_screen_capture", True))
+            self.worker = CaptureWorker(lambda: screen_cap.grab(region), name=label,
+                                        max_fps=float(RUNTIME_CONFIG.get("screen_capture_fps", 15) or 0))
+        else:
+            self.cap = open_capture(t, self.input.get("webcam_index", 0), self.input.get("stream_url", ""),
+                                    self.input.get("file_path", ""))
+            if self.cap is None:
+                return False
+            self.worker = CaptureWorker.from_videocapture(self.cap, name=label)
+        self.worker.start()
+        return True
+
+    def close(self):
+        if self.worker:
+            self.worker.stop()      # cap di-release oleh thread capture saat keluar
+            self.worker = None
+        self.cap = None
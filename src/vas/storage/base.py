@@ -0,0 +1,34 @@
+"""
+Interface backend penyimpanan occupancy. Dipakai DBManager (write-behind):
+worker memanggil write_batch dengan baris snapshot
+(created_at: datetime, occupancy: int, note: str|None, source: str) dan baris rollup
+(bucket_start: datetime, resolution, source, occ_min, occ_max, occ_mean, samples).
+"""
+
+class StorageBackend:
+    name = "base"
+    max_writers = 1     # jumlah writer thread yang aman dipakai paralel
+
+    def open(self):
+        """Siapkan koneksi + schema; raise Exception bila gagal."""
+        raise NotImplementedError
+
+    def write_person_counts(self, rows):
+        """Tulis satu batch dalam satu transaksi; raise Exception bila gagal."""
+        raise NotImplementedError
+
+    def write_rollups(self, rows):
+        raise NotImplementedError
+
+    def write_batch(self, person_counts=(), rollups=()):
+        """Batch campuran dari antrian DBManager; backend sebaiknya satu transaksi."""
+        if person_counts:
+            self.write_person_counts(person_counts)
+        if rollups:
+            self.write_rollups(rollups)
+
+    def reset(self):
+        """Buang koneksi yang ada (mis. setelah konfigurasi berubah)."""
+
+    def close(self):
+        pass
@@ -0,0 +1,164 @@
+import threading
+import pymysql
+from .base import StorageBackend
+
+SCHEMA_PERSON_COUNTS = """
+CREATE TABLE IF NOT EXISTS vas_person_counts (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    occupancy INT NOT NULL,
+    note VARCHAR(255) NULL,
+    source VARCHAR(64) NOT NULL DEFAULT 'default',
+    sync_key VARCHAR(64) NULL,
+    UNIQUE KEY uq_vas_person_counts_sync (sync_key)
+) ENGINE=InnoDB;
+"""
+
+INSERT_PERSON_COUNT = "INSERT INTO vas_person_counts (created_at, occupancy, note, source) VALUES (%s,%s,%s,%s)"
+
+# append-only: bucket parsial saat shutdown + sisa bucket setelah restart jadi
+# dua baris; gabungkan dengan MIN/MAX dan rata-rata berbobot samples.
+SCHEMA_ROLLUPS = """
+CREATE TABLE IF NOT EXISTS vas_occupancy_rollups (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    bucket_start DATETIME NOT NULL,
+    resolution VARCHAR(4) NOT NULL,
+    source VARCHAR(64) NOT NULL DEFAULT 'default',
+    occ_min INT NOT NULL,
+    occ_max INT NOT NULL,
+    occ_mean FLOAT NOT NULL,
+    samples INT NOT NULL,
+    sync_key VARCHAR(64) NULL,
+    KEY idx_vas_rollups_bucket (resolution, source, bucket_start),
+    UNIQUE KEY uq_vas_rollups_sync (sync_key)
+) ENGINE=InnoDB;
+"""
+
+INSERT_ROLLUP = ("INSERT INTO vas_occupancy_rollups "
+                 "(bucket_start, resolution, source, occ_min, occ_max, occ_mean, samples) "
+                 "VALUES (%s,%s,%s,%s,%s,%s,%s)")
+
+# storage/sync.py: sync_key = "<origin SQLite>:<id lokal>" (NULL untuk tulisan
+# langsung); batch yang terkirim ulang setelah crash dilewati, bukan diduplikasi.
+SYNC_INSERT_PERSON_COUNT = ("INSERT INTO vas_person_counts (created_at, occupancy, note, source, sync_key) "
+                            "VALUES (%s,%s,%s,%s,%s) ON DUPLICATE KEY UPDATE id=id")
+SYNC_INSERT_ROLLUP = ("INSERT INTO vas_occupancy_rollups "
+                      "(bucket_start, resolution, source, occ_min, occ_max, occ_mean, samples, sync_key) "
+                      "VALUES (%s,%s,%s,%s,%s,%s,%s,%s) ON DUPLICATE KEY UPDATE id=id")
+
+def mysql_connect(cfg, autocommit=False):
+    return pymysql.connect(
+        host=cfg["host"],
+        port=int(cfg["port"]),
+        user=cfg["user"],
+        password=cfg["password"],
+        database=cfg["name"],
+        autocommit=autocommit,
+        charset="utf8mb4",
+        connect_timeout=int(cfg.get("connect_timeout", 5))
+    )
+
+class ConnectionPool:
+    """Pool kecil koneksi pymysql; koneksi dibuat lazily sampai `size`."""
+    def __init__(self, cfg, size=2, on_new=None):
+        self.cfg = cfg
+        self.size = max(1, int(size))
+        self.on_new = on_new
+        self._idle = []
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def _open(self):
+        conn = mysql_connect(self.cfg)
+        if self.on_new:
+            try:
+                self.on_new(conn)
+            except Exception:
+                conn.close()
+                raise
+        return conn
+
+    def acquire(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+            if self._count >= self.size:
+                raise RuntimeError("connection pool exhausted")
+            self._count += 1
+        try:
+            return self._open()
+        except Exception:
+            with self._lock:
+                self._count -= 1
+            raise
+
+    def release(self, conn, broken=False):
+        if broken:
+            try: conn.close()
+            except Exception: pass
+            with self._lock:
+                self._count -= 1
+            return
+        with self._lock:
+            self._idle.append(conn)
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self._count -= len(idle)
+        for c in idle:
+            try: c.close()
+            except Exception: pass
+
+def init_mysql_tables(conn):
+    cur = conn.cursor()
+    cur.execute(SCHEMA_PERSON_COUNTS)
+    cur.execute("SHOW COLUMNS FROM vas_person_counts LIKE 'source'")
+    if not cur.fetchone():      # tabel dari versi sebelum multi-source
+        cur.execute("ALTER TABLE vas_person_counts ADD COLUMN source VARCHAR(64) NOT NULL DEFAULT 'default'")
+    cur.execute(SCHEMA_ROLLUPS)
+    for table, key in (("vas_person_counts", "uq_vas_person_counts_sync"), ("vas_occupancy_rollups", "uq_vas_rollups_sync")):
+        cur.execute(f"SHOW COLUMNS FROM {table} LIKE 'sync_key'")
+        if not cur.fetchone():  # tabel dari versi sebelum sync idempoten
+            cur.execute(f"ALTER TABLE {table} ADD COLUMN sync_key VARCHAR(64) NULL, ADD UNIQUE KEY {key} (sync_key)")
+    conn.commit()
+
+class MySQLStore(StorageBackend):
+    name = "mysql"
+
+    def __init__(self, cfg):
+        self.cfg = cfg
+        self.max_writers = max(1, int(cfg.get("pool_size", 2)))
+        self.pool = ConnectionPool(cfg, self.max_writers, on_new=init_mysql_tables)
+
+    def open(self):
+        self.pool.release(self.pool.acquire())
+
+    def _executemany(self, *stmts):
+        """stmts: (sql, rows) ...; semua dalam satu transaksi."""
+        conn = self.pool.acquire()
+        try:
+            cur = conn.cursor()
+            for sql, rows in stmts:
+                if rows:
+                    cur.executemany(sql, rows)
+            conn.commit()
+        except Exception:
+            self.pool.release(conn, broken=True)
+            raise
+        self.pool.release(conn)
+
+    def write_person_counts(self, rows):
+        self._executemany((INSERT_PERSON_COUNT, rows))
+
+    def write_rollups(self, rows):
+        self._executemany((INSERT_ROLLUP, rows))
+
+    def write_batch(self, person_counts=(), rollups=()):
+        self._executemany((INSERT_PERSON_COUNT, person_counts), (INSERT_ROLLUP, rollups))
+
+    def reset(self):
+        self.pool.close_all()
+
+    def close(self):
+        self.pool.close_all()
@@ -0,0 +1,110 @@
+"""
+Backend lokal SQLite untuk kiosk offline: WAL, synchronous=NORMAL, satu
+transaksi per batch dan index waktu pada created_at. Schema mengikuti
+vas_person_counts / vas_occupancy_rollups di MySQL; vas_sync_state mencatat id terakhir yang sudah
+didorong ke MySQL dan vas_sync_origin id unik file ini (lihat storage/sync.py).
+"""
+import sqlite3
+import threading
+from .base import StorageBackend
+
+SQLITE_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS vas_person_counts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        occupancy INTEGER NOT NULL,
+        note TEXT NULL,
+        source TEXT NOT NULL DEFAULT 'default'
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_vas_person_counts_created_at ON vas_person_counts(created_at)",
+    """
+    CREATE TABLE IF NOT EXISTS vas_occupancy_rollups (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        bucket_start TEXT NOT NULL,
+        resolution TEXT NOT NULL,
+        source TEXT NOT NULL DEFAULT 'default',
+        occ_min INTEGER NOT NULL,
+        occ_max INTEGER NOT NULL,
+        occ_mean REAL NOT NULL,
+        samples INTEGER NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_vas_rollups_bucket ON vas_occupancy_rollups(resolution, source, bucket_start)",
+    """
+    CREATE TABLE IF NOT EXISTS vas_sync_state (
+        name TEXT PRIMARY KEY,
+        last_id INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS vas_sync_origin (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        origin TEXT NOT NULL
+    )
+    """,
+)
+
+INSERT_PERSON_COUNT = "INSERT INTO vas_person_counts (created_at, occupancy, note, source) VALUES (?,?,?,?)"
+INSERT_ROLLUP = ("INSERT INTO vas_occupancy_rollups "
+                 "(bucket_start, resolution, source, occ_min, occ_max, occ_mean, samples) "
+                 "VALUES (?,?,?,?,?,?,?)")
+
+TS_FMT = "%Y-%m-%d %H:%M:%S"
+
+def sqlite_connect(path):
+    conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    with conn:
+        for stmt in SQLITE_SCHEMA:
+            conn.execute(stmt)
+        cols = {r[1] for r in conn.execute("PRAGMA table_info(vas_person_counts)")}
+        if "source" not in cols:    # file dari versi sebelum multi-source
+            conn.execute("ALTER TABLE vas_person_counts ADD COLUMN source TEXT NOT NULL DEFAULT 'default'")
+    return conn
+
+class SQLiteStore(StorageBackend):
+    name = "sqlite"
+    max_writers = 1
+
+    def __init__(self, cfg):
+        self.cfg = cfg
+        self.conn = None
+        self._lock = threading.Lock()
+
+    @property
+    def path(self):
+        return self.cfg.get("sqlite_path", "vas_local.db")
+
+    def open(self):
+        with self._lock:
+            if self.conn is None:
+                self.conn = sqlite_connect(self.path)
+
+    def write_person_counts(self, rows):
+        self.write_batch(person_counts=rows)
+
+    def write_rollups(self, rows):
+        self.write_batch(rollups=rows)
+
+    def write_batch(self, person_counts=(), rollups=()):
+        self.open()
+        pc = [(ts.strftime(TS_FMT), occ, note, src) for ts, occ, note, src in person_counts]
+        ru = [(r[0].strftime(TS_FMT),) + tuple(r[1:]) for r in rollups]
+        with self._lock, self.conn:
+            if pc:
+                self.conn.executemany(INSERT_PERSON_COUNT, pc)
+            if ru:
+                self.conn.executemany(INSERT_ROLLUP, ru)
+
+    def reset(self):
+        self.close()
+
+    def close(self):
+        with self._lock:
+            if self.conn is not None:
+                try: self.conn.close()
+                except Exception: pass
+                self.conn = None
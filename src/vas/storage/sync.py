@@ -0,0 +1,96 @@
+"""
+Dorong baris SQLite lokal ke MySQL secara bulk saat koneksi tersedia.
+Posisi sinkronisasi (id terakhir) disimpan di tabel vas_sync_state sehingga
+tabel lokal tetap append-only. Commit MySQL dan update posisi tidak satu
+transaksi: crash di antaranya mengirim ulang batch, tapi tiap baris membawa
+sync_key "<origin>:<id>" (unique di MySQL) sehingga kiriman ulang dilewati dan
+job aman diulang.
+
+    vas-db-sync [--sqlite vas_local.db] [--batch 1000]
+"""
+import argparse
+import logging
+import uuid
+
+from ..config import DB_CONFIG
+from .mysql_store import mysql_connect, init_mysql_tables, SYNC_INSERT_PERSON_COUNT, SYNC_INSERT_ROLLUP
+from .sqlite_store import sqlite_connect
+
+log = logging.getLogger("vas.storage.sync")
+
+SYNC_NAME = "mysql"
+
+# (nama posisi di vas_sync_state, SELECT lokal, INSERT MySQL)
+SYNC_TABLES = (
+    (SYNC_NAME, "SELECT id, created_at, occupancy, note, source FROM vas_person_counts "
+                "WHERE id>? ORDER BY id LIMIT ?", SYNC_INSERT_PERSON_COUNT),
+    (SYNC_NAME + ":rollups", "SELECT id, bucket_start, resolution, source, occ_min, occ_max, occ_mean, samples "
+                             "FROM vas_occupancy_rollups WHERE id>? ORDER BY id LIMIT ?", SYNC_INSERT_ROLLUP),
+)
+
+def _last_id(conn, name=SYNC_NAME):
+    row = conn.execute("SELECT last_id FROM vas_sync_state WHERE name=?", (name,)).fetchone()
+    return row[0] if row else 0
+
+def sync_origin(conn):
+    """Id unik file SQLite ini (dibuat sekali) → prefix sync_key."""
+    row = conn.execute("SELECT origin FROM vas_sync_origin WHERE id=1").fetchone()
+    if row:
+        return row[0]
+    with conn:
+        conn.execute("INSERT OR IGNORE INTO vas_sync_origin (id, origin) VALUES (1, ?)", (uuid.uuid4().hex,))
+    return conn.execute("SELECT origin FROM vas_sync_origin WHERE id=1").fetchone()[0]
+
+def _sync_table(lconn, mconn, name, select_sql, insert_sql, batch, origin):
+    last = _last_id(lconn, name)
+    total = 0
+    while True:
+        rows = lconn.execute(select_sql, (last, int(batch))).fetchall()
+        if not rows:
+            break
+        cur = mconn.cursor()
+        cur.executemany(insert_sql, [r[1:] + (f"{origin}:{r[0]}",) for r in rows])
+        mconn.commit()
+        last = rows[-1][0]
+        with lconn:
+            lconn.execute("INSERT OR REPLACE INTO vas_sync_state (name, last_id) VALUES (?,?)", (name, last))
+        total += len(rows)
+    return total
+
+def sync_sqlite_to_mysql(sqlite_path=None, mysql_cfg=None, batch=1000, sqlite_conn=None):
+    """→ jumlah baris yang dipindahkan. Raise Exception bila MySQL tidak terjangkau."""
+    mysql_cfg = mysql_cfg or DB_CONFIG
+    own = sqlite_conn is None
+    lconn = sqlite_conn or sqlite_connect(sqlite_path or mysql_cfg.get("sqlite_path", "vas_local.db"))
+    mconn = None
+    total = 0
+    try:
+        mconn = mysql_connect(mysql_cfg)
+        init_mysql_tables(mconn)
+        origin = sync_origin(lconn)
+        for name, select_sql, insert_sql in SYNC_TABLES:
+            total += _sync_table(lconn, mconn, name, select_sql, insert_sql, batch, origin)
+    finally:
+        if mconn is not None:
+            try: mconn.close()
+            except Exception: pass
+        if own:
+            lconn.close()
+    return total
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="vas-db-sync", description="Sinkronisasi SQLite lokal → MySQL")
+    ap.add_argument("--sqlite", default=DB_CONFIG.get("sqlite_path", "vas_local.db"))
+    ap.add_argument("--batch", type=int, default=1000)
+    args = ap.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    try:
+        n = sync_sqlite_to_mysql(args.sqlite, batch=args.batch)
+    except Exception as e:
+        log.error("Sync gagal: %s", e)
+        return 1
+    log.info("Sync selesai: %d baris", n)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,132 +1,236 @@
-import math
 import time
-from collections import deque
-from typing import Dict, List, Any, Tuple
+from typing import NamedTuple
+import numpy as np
 from ..config import TRACKING_CONFIG
+from ..utils.aoi import AOIIndex, box_centers
 
-def point_in_poly(pt, poly):
-    if not poly:
-        return False
-    x,y = pt
-    inside = False
-    n = len(poly)
-    for i in range(n):
-        x1,y1 = poly[i]
-        x2,y2 = poly[(i+1)%n]
-        cond = ((y1>y)!=(y2>y)) and (x < (x2 - x1)*(y - y1)/((y2 - y1) if (y2 - y1)!=0 else 1e-6) + x1)
-        if cond:
-            inside = not inside
-    return inside
-
-def point_in_rect(pt, rect):
-    if not rect:
-        return False
-    x,y = pt
-    x1,y1,x2,y2 = rect
-    return (x1 <= x <= x2) and (y1 <= y <= y2)
+try:
+    from scipy.optimize import linear_sum_assignment
+    HAS_SCIPY = True
+except Exception:
+    HAS_SCIPY = False
+
+PATH_LEN = 64
+
+def _as_array(detections) -> np.ndarray:
+    """List dict {bbox,class,confidence} atau array N x 6 → array float32 N x 6."""
+    if isinstance(detections, np.ndarray):
+        return detections[:, :6].astype(np.float32, copy=False)
+    if not detections:
+        return np.zeros((0, 6), np.float32)
+    return np.array([(*d["bbox"], d.get("confidence", 0.0), d.get("class", 0)) for d in detections],
+                    dtype=np.float32)
+
+def match_greedy(dist: np.ndarray, max_dist: float):
+    """
+    Greedy global (pasangan terdekat dulu) lewat mutual-nearest-neighbour
+    berulang; tiap putaran vektor penuh → (det_idx, track_idx).
+    """
+    d = np.where(dist <= max_dist, dist, np.inf)
+    rows, cols = [], []
+    while d.size and np.isfinite(d).any():
+        r_best = d.argmin(axis=1)                   # track terdekat per deteksi
+        c_best = d.argmin(axis=0)                   # deteksi terdekat per track
+        r = np.nonzero(np.isfinite(d[np.arange(len(d)), r_best]) & (c_best[r_best] == np.arange(len(d))))[0]
+        if not len(r):
+            break
+        c = r_best[r]
+        rows.append(r); cols.append(c)
+        d[r, :] = np.inf
+        d[:, c] = np.inf
+    if not rows:
+        return np.zeros(0, np.int64), np.zeros(0, np.int64)
+    return np.concatenate(rows), np.concatenate(cols)
+
+def match_hungarian(dist: np.ndarray, max_dist: float):
+    cost = np.where(dist <= max_dist, dist, 1e6)
+    r, c = linear_sum_assignment(cost)
+    ok = dist[r, c] <= max_dist
+    return r[ok], c[ok]
+
+class TrackSnapshot(NamedTuple):
+    """View read-only status track; dibangun ulang hanya setelah update."""
+    ids: np.ndarray         # int64 M
+    boxes: np.ndarray       # float32 M x 4
+    confidence: np.ndarray  # float32 M
+    cls: np.ndarray         # int32 M
+    inside: np.ndarray      # bool M
+    dwell_sec: np.ndarray   # int64 M
 
 class PersonTracker:
     """
     Tracking sederhana + occupancy + dwell.
+    State track disimpan sebagai array paralel (satu baris per track aktif);
+    asosiasi deteksi ↔ track memakai satu matriks jarak centroid, dengan
+    Hungarian (scipy, opsional) atau greedy tervektorisasi.
+    Tiap track punya kecepatan konstan (filter alpha-beta, per frame):
+    predict() menggeser box sekaligus pada frame tanpa inferensi, tetapi hanya
+    track yang cocok pada update terakhir (age 0); track hilang (terhalang /
+    berhenti) diam di posisi terakhir dan kecepatannya diredam
+    (predict_lost_decay) tiap update tanpa pasangan.
+    update() memprediksi satu frame lalu mengoreksi dengan deteksi.
     """
-    def __init__(self):
+    def __init__(self, use_hungarian=None):
         self.next_id = 1
-        self.tracks: Dict[int, Dict[str, Any]] = {}
         self.unique_count = 0
+        self.use_hungarian = HAS_SCIPY if use_hungarian is None else (use_hungarian and HAS_SCIPY)
+        self.ids = np.zeros(0, np.int64)
+        self.boxes = np.zeros((0, 4), np.float32)
+        self.conf = np.zeros(0, np.float32)
+        self.cls = np.zeros(0, np.int32)
+        self.age = np.zeros(0, np.int32)
+        self.enter_time = np.zeros(0, np.float64)   # nan = belum pernah masuk AOI
+        self.inside = np.zeros(0, bool)
+        self.paths = np.zeros((0, PATH_LEN, 2), np.int32)   # ring buffer centroid
+        self.path_n = np.zeros(0, np.int64)
+        self.vel = np.zeros((0, 2), np.float32)     # px / frame (centroid)
+        self.since = np.zeros(0, np.int32)          # frame sejak pengukuran terakhir
+        self.alpha = float(TRACKING_CONFIG.get("predict_alpha", 1.0))
+        self.beta = float(TRACKING_CONFIG.get("predict_beta", 0.5))
+        self.lost_decay = float(TRACKING_CONFIG.get("predict_lost_decay", 0.5))
         self._inside_ids = set()
         self._prev_inside_ids = set()
+        self._aoi_key = None
+        self._aoi_index = None
+        self._version = 0
+        self._snap = None
+        self._status = None
 
-    def update(self, detections: List[Dict[str, Any]]):
-        for tr in self.tracks.values():
-            tr["age"] += 1
-            tr["_updated"] = False
-
-        used = set()
-        for det in detections:
-            x1,y1,x2,y2 = det["bbox"]
-            cx,cy = (x1+x2)//2, (y1+y2)//2
-            best_id = None
-            best_dist = 1e9
-            for tid,tr in self.tracks.items():
-                if tid in used:
-                    continue
-                tx1,ty1,tx2,ty2 = tr["bbox"]
-                tcx,tcy = (tx1+tx2)//2, (ty1+ty2)//2
-                d = math.hypot(cx - tcx, cy - tcy)
-                if d < best_dist and d <= TRACKING_CONFIG["max_match_distance"]:
-                    best_dist = d
-                    best_id = tid
-            if best_id is None:
-                tid = self.next_id; self.next_id += 1
-                self.unique_count += 1
-                self.tracks[tid] = {
-                    "bbox": det["bbox"],
-                    "class": det["class"],
-                    "confidence": det["confidence"],
-                    "path": deque(maxlen=64),
-                    "age": 0,
-                    "missed": 0,
-                    "_updated": True,
-                    "enter_time": None
-                }
-                self.tracks[tid]["path"].append((cx,cy))
-                used.add(tid)
-            else:
-                tr = self.tracks[best_id]
-                tr["bbox"] = det["bbox"]
-                tr["class"] = det["class"]
-                tr["confidence"] = det["confidence"]
-                tr["age"] = 0
-                tr["missed"] = 0
-                tr["_updated"] = True
-                tr["path"].append((cx,cy))
-                used.add(best_id)
-
-        stale = [tid for tid,tr in self.tracks.items() if tr["age"] > TRACKING_CONFIG["max_track_lost_frames"]]
-        for tid in stale:
-            self.tracks.pop(tid, None)
-
-    def update_occupancy(self, rect=None, poly=None, dwell_exit_callback=None):
-        self._prev_inside_ids = set(self._inside_ids)
+    def __len__(self):
+        return len(self.ids)
+
+    def _get_aoi_index(self, rect, poly):
+        # Kompilasi ulang hanya jika AOI berubah
+        key = (tuple(rect) if rect else None, tuple(map(tuple, poly)) if poly else None)
+        if key != self._aoi_key:
+            mode = "poly" if poly and len(poly) >= 3 else "rect"
+            self._aoi_index = AOIIndex(mode, rect, poly)
+            self._aoi_key = key
+        return self._aoi_index
+
+    def _keep(self, mask):
+        for name in ("ids", "boxes", "conf", "cls", "age", "enter_time", "inside", "paths", "path_n",
+                     "vel", "since"):
+            setattr(self, name, getattr(self, name)[mask])
+
+    def _push_path(self, rows, centers):
+        self.paths[rows, self.path_n[rows] % PATH_LEN] = centers
+        self.path_n[rows] += 1
+
+    def predict(self, steps=1):
+        """Majukan track yang baru terukur `steps` frame dengan kecepatan konstan (tanpa deteksi)."""
+        if len(self.ids):
+            live = self.age == 0
+            shift = self.vel[live] * steps
+            self.boxes[live, 0::2] += shift[:, 0:1]
+            self.boxes[live, 1::2] += shift[:, 1:2]
+            self.since += steps
+        self._version += 1
+
+    def hold(self):
+        """Scene statis (motion gate): hentikan semua track di posisi sekarang."""
+        self.vel[:] = 0
+        self._version += 1
+
+    def live_detections(self):
+        """Box prediksi track yang cocok pada inferensi terakhir → (array N x 6, inside N)."""
+        live = self.age == 0
+        dets = np.concatenate([self.boxes[live], self.conf[live, None], self.cls[live, None].astype(np.float32)], 1)
+        return dets, self.inside[live]
+
+    def update(self, detections):
+        """detections: list dict {bbox,class,confidence} atau array N x 6."""
+        dets = _as_array(detections)
+        self.predict()
+        self.age += 1
+        n_det = len(dets)
+        centers = box_centers(dets) if n_det else np.zeros((0, 2), np.int64)
+        det_idx = trk_idx = np.zeros(0, np.int64)
+        if n_det and len(self.ids):
+            tc = box_centers(self.boxes).astype(np.float32)
+            dx = centers[:, 0, None].astype(np.float32) - tc[None, :, 0]
+            dy = centers[:, 1, None].astype(np.float32) - tc[None, :, 1]
+            dist = np.sqrt(dx * dx + dy * dy)
+            max_d = float(TRACKING_CONFIG["max_match_distance"])
+            det_idx, trk_idx = (match_hungarian if self.use_hungarian else match_greedy)(dist, max_d)
+        if len(det_idx):
+            # koreksi: residual pengukuran - prediksi → posisi (alpha) & kecepatan (beta)
+            pred = self.boxes[trk_idx]
+            resid = centers[det_idx] - box_centers(pred)
+            k = np.maximum(self.since[trk_idx], 1)[:, None]
+            self.vel[trk_idx] += self.beta * resid / k
+            self.boxes[trk_idx] = pred + self.alpha * (dets[det_idx, :4] - pred)
+            self.since[trk_idx] = 0
+            self.conf[trk_idx] = dets[det_idx, 4]
+            self.cls[trk_idx] = dets[det_idx, 5]
+            self.age[trk_idx] = 0
+            self._push_path(trk_idx, centers[det_idx])
+
+        lost = np.ones(len(self.ids), bool)
+        lost[trk_idx] = False
+        self.vel[lost] *= self.lost_decay
+
+        new = np.ones(n_det, bool)
+        new[det_idx] = False
+        k = int(new.sum())
+        if k:
+            start = len(self.ids)
+            self.ids = np.concatenate([self.ids, np.arange(self.next_id, self.next_id + k)])
+            self.next_id += k
+            self.unique_count += k
+            self.boxes = np.concatenate([self.boxes, dets[new, :4]])
+            self.conf = np.concatenate([self.conf, dets[new, 4]])
+            self.cls = np.concatenate([self.cls, dets[new, 5].astype(np.int32)])
+            self.age = np.concatenate([self.age, np.zeros(k, np.int32)])
+            self.enter_time = np.concatenate([self.enter_time, np.full(k, np.nan)])
+            self.inside = np.concatenate([self.inside, np.zeros(k, bool)])
+            self.paths = np.concatenate([self.paths, np.zeros((k, PATH_LEN, 2), np.int32)])
+            self.path_n = np.concatenate([self.path_n, np.zeros(k, np.int64)])
+            self.vel = np.concatenate([self.vel, np.zeros((k, 2), np.float32)])
+            self.since = np.concatenate([self.since, np.zeros(k, np.int32)])
+            self._push_path(np.arange(start, start + k), centers[new])
+
+        stale = self.age > TRACKING_CONFIG["max_track_lost_frames"]
+        if stale.any():
+            self._keep(~stale)
+        self._version += 1
+
+    def update_occupancy(self, rect=None, poly=None, dwell_exit_callback=None, aoi_index=None):
+        self._prev_inside_ids = self._inside_ids
         now = time.time()
-        inside = set()
-        for tid,tr in self.tracks.items():
-            x1,y1,x2,y2 = tr["bbox"]
-            cx,cy = (x1+x2)//2,(y1+y2)//2
-            ins = False
-            if poly and len(poly)>=3:
-                ins = point_in_poly((cx,cy), poly)
-            elif rect:
-                ins = point_in_rect((cx,cy), rect)
-            if ins:
-                inside.add(tid)
-                if tr.get("enter_time") is None:
-                    tr["enter_time"] = now
+        if aoi_index is None and (rect or (poly and len(poly) >= 3)):
+            aoi_index = self._get_aoi_index(rect, poly)
+        if aoi_index is not None and len(self.ids):
+            self.inside = aoi_index.contains(box_centers(self.boxes))
+            self.enter_time[self.inside & np.isnan(self.enter_time)] = now
+        else:
+            self.inside = np.zeros(len(self.ids), bool)
+        inside = set(self.ids[self.inside].tolist())
 
         # Detect exit (untuk dwell session logging)
         exited = self._prev_inside_ids - inside
         if exited and dwell_exit_callback:
+            pos = {tid: i for i, tid in enumerate(self.ids.tolist())}
             for tid in exited:
-                tr = self.tracks.get(tid)
-                if tr and tr.get("enter_time"):
-                    dwell_sec = int(now - tr["enter_time"])
-                    dwell_exit_callback(tid, tr["enter_time"], now, dwell_sec)
+                i = pos.get(tid)
+                if i is not None and not np.isnan(self.enter_time[i]):
+                    t_enter = float(self.enter_time[i])
+                    dwell_exit_callback(tid, t_enter, now, int(now - t_enter))
 
         self._inside_ids = inside
+        self._version += 1
 
     def get_current_occupancy(self):
         return len(self._inside_ids)
 
+    def _dwell(self, now):
+        et = np.where(self.inside & ~np.isnan(self.enter_time), self.enter_time, now)
+        return (now - et).astype(np.int64)
+
     def get_longest_dwell(self):
-        now = time.time()
-        longest = 0
-        for tid in self._inside_ids:
-            tr = self.tracks.get(tid)
-            if tr and tr.get("enter_time"):
-                d = int(now - tr["enter_time"])
-                if d > longest:
-                    longest = d
-        return longest
+        if not len(self.ids):
+            return 0
+        return int(self._dwell(time.time()).max())
 
     def get_summary(self):
         return {
@@ -135,23 +239,43 @@ class PersonTracker:
             "longest_dwell": self.get_longest_dwell()
         }
 
+    def snapshot(self) -> TrackSnapshot:
+        """Status semua track sebagai array read-only (cache per update, tanpa salinan per panggilan)."""
+        if self._snap is None or self._snap[0] != self._version:
+            views = []
+            for a in (self.ids, self.boxes, self.conf, self.cls, self.inside, self._dwell(time.time())):
+                v = a.view(); v.flags.writeable = False
+                views.append(v)
+            self._snap = (self._version, TrackSnapshot(*views))
+        return self._snap[1]
+
+    def path(self, tid) -> np.ndarray:
+        """Riwayat centroid (terlama → terbaru) untuk satu track, N x 2."""
+        i = np.nonzero(self.ids == tid)[0]
+        if not len(i):
+            return np.zeros((0, 2), np.int32)
+        i = int(i[0]); n = int(self.path_n[i])
+        if n <= PATH_LEN:
+            return self.paths[i, :n]
+        h = n % PATH_LEN
+        return np.concatenate([self.paths[i, h:], self.paths[i, :h]])
+
     def get_tracks_status(self):
-        now = time.time()
-        out = {}
-        for tid,tr in self.tracks.items():
-            inside = (tid in self._inside_ids)
-            dwell = 0
-            if inside and tr.get("enter_time"):
-                dwell = int(now - tr["enter_time"])
-            out[tid] = {
-                "bbox": tr["bbox"],
-                "class": tr["class"],
-                "confidence": tr["confidence"],
-                "path": list(tr["path"]),
-                "inside": inside,
-                "dwell_sec": dwell
-            }
-        return out
+        """Dict per track (kompatibel format lama); dibangun sekali per update."""
+        if self._status is None or self._status[0] != self._version:
+            s = self.snapshot()
+            out = {}
+            for i, tid in enumerate(s.ids.tolist()):
+                out[tid] = {
+                    "bbox": s.boxes[i].astype(int).tolist(),
+                    "class": int(s.cls[i]),
+                    "confidence": float(s.confidence[i]),
+                    "path": self.path(tid),
+                    "inside": bool(s.inside[i]),
+                    "dwell_sec": int(s.dwell_sec[i])
+                }
+            self._status = (self._version, out)
+        return self._status[1]
 
     def reset(self):
-        self.__init__()
\ No newline at end of file
+        self.__init__(self.use_hungarian)
@@ -0,0 +1,74 @@
+"""
+AOI (rect / polygon) dikompilasi sekali menjadi struktur cache.
+Polygon di-raster ke mask boolean seukuran bounding box-nya, sehingga tes
+containment per titik = lookup array (O(1)), sekompleks apa pun polygonnya.
+"""
+import numpy as np
+import cv2
+
+class AOIIndex:
+    def __init__(self, mode="rect", rect=None, poly=None):
+        self.kind = "all"       # all | rect | poly  (tanpa AOI → semua dihitung)
+        self.bbox = None        # (x1,y1,x2,y2) inklusif
+        self._mask = None
+        if mode == "poly" and poly and len(poly) >= 3:
+            pts = np.asarray(poly, dtype=np.int32).reshape(-1, 2)
+            x1, y1 = pts.min(axis=0)
+            x2, y2 = pts.max(axis=0)
+            mask = np.zeros((int(y2-y1)+1, int(x2-x1)+1), dtype=np.uint8)
+            cv2.fillPoly(mask, [pts - (x1, y1)], 1)
+            self._mask = mask.astype(bool)
+            self.kind = "poly"
+            self.bbox = (int(x1), int(y1), int(x2), int(y2))
+        elif rect:
+            x1, y1, x2, y2 = (int(v) for v in rect)
+            self.kind = "rect"
+            self.bbox = (x1, y1, x2, y2)
+
+    @classmethod
+    def from_config(cls, aoi_cfg: dict):
+        return cls(aoi_cfg.get("mode", "rect"), aoi_cfg.get("rect"), aoi_cfg.get("polygon"))
+
+    def is_empty(self):
+        return self.kind == "all"
+
+    def contains(self, pts) -> np.ndarray:
+        """pts: array N x 2 (x,y) → array bool N."""
+        pts = np.asarray(pts).reshape(-1, 2)
+        if self.kind == "all":
+            return np.ones(len(pts), dtype=bool)
+        x = pts[:, 0].astype(np.int64)
+        y = pts[:, 1].astype(np.int64)
+        x1, y1, x2, y2 = self.bbox
+        inb = (x >= x1) & (x <= x2) & (y >= y1) & (y <= y2)
+        if self.kind == "rect":
+            return inb
+        out = np.zeros(len(pts), dtype=bool)
+        out[inb] = self._mask[y[inb] - y1, x[inb] - x1]
+        return out
+
+    def intersects(self, rect) -> bool:
+        """Apakah rect (x1,y1,x2,y2, x2/y2 eksklusif) menyentuh AOI."""
+        if self.kind == "all":
+            return True
+        rx1, ry1, rx2, ry2 = (int(v) for v in rect)
+        x1, y1, x2, y2 = self.bbox
+        if rx2 <= x1 or rx1 > x2 or ry2 <= y1 or ry1 > y2:
+            return False
+        if self.kind == "rect":
+            return True
+        return bool(self._mask[max(ry1, y1) - y1:min(ry2, y2 + 1) - y1,
+                               max(rx1, x1) - x1:min(rx2, x2 + 1) - x1].any())
+
+    def contains_point(self, pt) -> bool:
+        return bool(self.contains((pt,))[0])
+
+def box_centers(dets: np.ndarray) -> np.ndarray:
+    """Centroid integer (sama dengan (x1+x2)//2) dari array deteksi N x >=4."""
+    b = dets[:, :4].astype(np.int64)
+    return np.stack(((b[:, 0] + b[:, 2]) // 2, (b[:, 1] + b[:, 3]) // 2), axis=1)
+
+def count_in_aoi(dets: np.ndarray, index: AOIIndex):
+    """→ (jumlah di dalam AOI, mask bool per deteksi)."""
+    inside = index.contains(box_centers(dets))
+    return int(inside.sum()), inside
@@ -0,0 +1,39 @@
+"""
+Skala frame ke ukuran canvas untuk tampilan. Buffer BGR/RGB dialokasikan
+sekali per ukuran canvas; resize & konversi warna menulis langsung ke buffer.
+"""
+import cv2
+import numpy as np
+
+def fit_rect(fw, fh, cw, ch):
+    """Letterbox frame fw×fh ke canvas cw×ch → (new_w, new_h, x_off, y_off, scale)."""
+    if fw / fh > cw / ch:
+        scale = cw / fw
+    else:
+        scale = ch / fh
+    new_w = max(1, int(fw * scale)); new_h = max(1, int(fh * scale))
+    return new_w, new_h, (cw - new_w) // 2, (ch - new_h) // 2, scale
+
+class DisplayBuffer:
+    def __init__(self):
+        self.bgr = None
+        self.rgb = None
+        self.scale = 1.0
+        self.offset = (0, 0)
+
+    def fit(self, frame, cw, ch):
+        """Resize frame ke buffer BGR seukuran area tampil → buffer (boleh digambari overlay)."""
+        fh, fw = frame.shape[:2]
+        new_w, new_h, x_off, y_off, self.scale = fit_rect(fw, fh, max(1, cw), max(1, ch))
+        self.offset = (x_off, y_off)
+        if self.bgr is None or self.bgr.shape[:2] != (new_h, new_w):
+            self.bgr = np.empty((new_h, new_w, 3), np.uint8)
+            self.rgb = np.empty((new_h, new_w, 3), np.uint8)
+        # INTER_AREA untuk downscale (umumnya), INTER_LINEAR jika diperbesar
+        interp = cv2.INTER_AREA if self.scale < 1.0 else cv2.INTER_LINEAR
+        cv2.resize(frame, (new_w, new_h), dst=self.bgr, interpolation=interp)
+        return self.bgr
+
+    def to_rgb(self):
+        cv2.cvtColor(self.bgr, cv2.COLOR_BGR2RGB, dst=self.rgb)
+        return self.rgb
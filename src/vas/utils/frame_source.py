@@ -0,0 +1,165 @@
+"""
+Capture worker per source: thread yang terus menguras stream ke slot
+"latest frame" (satu slot, dengan nomor urut + timestamp capture).
+Loop inferensi tidak pernah menunggu I/O dan selalu memproses frame terbaru;
+frame yang tertimpa sebelum sempat dibaca dihitung sebagai dropped.
+Worker dari from_videocapture memiliki cap: release() dipanggil oleh thread
+capture sendiri saat keluar, tidak pernah di tengah cap.read() yang macet.
+"""
+import sys
+import threading
+import time
+
+from .stage_queue import StageStats
+from ..metrics import CAPTURE_FRAMES, CAPTURE_DROPPED, CAPTURE_LATENCY
+
+def open_capture(input_type, webcam_index=0, stream_url="", file_path=""):
+    """cv2.VideoCapture untuk source webcam / network / file, atau None."""
+    import cv2
+    if input_type == "webcam":
+        # DirectShow hanya ada di Windows; Linux (headless / rack) pakai backend default
+        api = cv2.CAP_DSHOW if sys.platform == "win32" else cv2.CAP_ANY
+        cap = cv2.VideoCapture(int(webcam_index), api)
+    elif input_type == "network":
+        if not stream_url:
+            return None
+        cap = cv2.VideoCapture(stream_url)
+    elif input_type == "file":
+        if not file_path:
+            return None
+        cap = cv2.VideoCapture(file_path)
+    else:
+        return None
+    if not cap or not cap.isOpened():
+        return None
+    return cap
+
+class LatestFrameSlot:
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._frame = None
+        self.seq = 0
+        self.ts = 0.0
+        self.dropped = 0
+        self._read_seq = 0
+
+    def put(self, frame, ts=None):
+        with self._cond:
+            if self.seq > self._read_seq:
+                self.dropped += 1
+            self._frame = frame
+            self.seq += 1
+            self.ts = time.time() if ts is None else ts
+            self._cond.notify_all()
+
+    def get(self, last_seq=0, timeout=0.0):
+        """Frame terbaru dengan seq > last_seq → (seq, ts, frame), atau None."""
+        with self._cond:
+            if self.seq <= last_seq and timeout:
+                self._cond.wait_for(lambda: self.seq > last_seq, timeout)
+            if self.seq <= last_seq:
+                return None
+            self._read_seq = max(self._read_seq, self.seq)
+            return self.seq, self.ts, self._frame
+
+    def pending(self):
+        return 1 if self.seq > self._read_seq else 0
+
+    def reset(self):
+        with self._cond:
+            self._frame = None
+            self._read_seq = self.seq
+
+class CaptureWorker:
+    def __init__(self, read_fn, name="capture", retry_sleep=0.05, max_fps=0, on_exit=None):
+        self.read_fn = read_fn      # () -> frame | None
+        self.on_exit = on_exit      # dipanggil di thread capture setelah loop selesai
+        self.name = name
+        self.retry_sleep = retry_sleep
+        # >0: batas laju baca (screen grab tidak punya laju alami, tanpa batas memakan satu core)
+        self.interval = 1.0 / max_fps if max_fps and max_fps > 0 else 0.0
+        self.slot = LatestFrameSlot()
+        self.frames = 0
+        self.failures = 0
+        self.stats = StageStats()
+        self._m_frames = CAPTURE_FRAMES.labels(source=name)
+        self._m_dropped = CAPTURE_DROPPED.labels(source=name)
+        self._m_latency = CAPTURE_LATENCY.labels(source=name)
+        self._running = False
+        self._thread = None
+        self._exited = False
+
+    @classmethod
+    def from_videocapture(cls, cap, name="capture"):
+        def read():
+            ret, fr = cap.read()
+            return fr if ret else None
+        return cls(read, name=name, on_exit=cap.release)
+
+    @property
+    def dropped(self):
+        return self.slot.dropped
+
+    def start(self):
+        if self._running:
+            return self
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        """→ True bila thread sudah keluar; bila read_fn macet, on_exit tetap jalan saat read kembali."""
+        self._running = False
+        th, self._thread = self._thread, None
+        if th:
+            th.join(timeout=timeout)
+            return not th.is_alive()
+        self._exit()        # tidak pernah di-start
+        return True
+
+    def depth(self):
+        # slot = antrian 1 elemen: 1 jika ada frame yang belum diambil
+        return self.slot.pending()
+
+    def is_alive(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _exit(self):
+        if self.on_exit and not self._exited:
+            self._exited = True
+            try: self.on_exit()
+            except Exception: pass
+
+    def _loop(self):
+        try:
+            self._run()
+        finally:
+            self._exit()
+
+    def _run(self):
+        next_t = 0.0
+        while self._running:
+            if self.interval:
+                wait = next_t - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+                next_t = max(next_t, time.monotonic() - self.interval) + self.interval
+            t0 = time.perf_counter()
+            try:
+                fr = self.read_fn()
+            except Exception:
+                fr = None
+            if fr is None:
+                self.failures += 1
+                time.sleep(self.retry_sleep)
+                continue
+            dt = time.perf_counter() - t0
+            self.stats.add(dt)
+            self._m_latency.observe(dt)
+            self._m_frames.inc()
+            self.frames += 1
+            dropped = self.slot.dropped
+            self.slot.put(fr, time.time())
+            if self.slot.dropped != dropped:
+                self._m_dropped.inc()
@@ -0,0 +1,57 @@
+"""
+Gate gerakan murah di dalam AOI: frame diperkecil + grayscale lalu
+dibandingkan dengan frame referensi (frame saat inferensi terakhir).
+Jika piksel berubah < min_area, inferensi YOLO dilewati dan deteksi terakhir
+dipakai ulang; refresh dipaksa tiap max_interval_sec agar count tidak basi.
+"""
+import time
+
+import cv2
+import numpy as np
+
+class MotionGate:
+    def __init__(self, cfg: dict):
+        self.width = int(cfg.get("width", 160))
+        self.threshold = int(cfg.get("threshold", 12))
+        self.min_area = float(cfg.get("min_area", 0.002))
+        self.max_interval = float(cfg.get("max_interval_sec", 10))
+        self._ref = None
+        self._roi = None
+        self._last = 0.0
+        self.changed = 0.0          # fraksi piksel berubah pada cek terakhir
+
+    def _small(self, frame, roi):
+        if roi is not None:
+            x1, y1, x2, y2 = roi
+            frame = frame[max(0, y1):y2+1, max(0, x1):x2+1]
+        h, w = frame.shape[:2]
+        if h == 0 or w == 0:
+            return None
+        sw = min(self.width, w)
+        sh = max(1, int(h * sw / w))
+        small = cv2.resize(frame, (sw, sh), interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(small, (3, 3), 0)
+
+    def should_infer(self, frame, aoi_index=None, now=None) -> bool:
+        now = time.monotonic() if now is None else now
+        roi = aoi_index.bbox if aoi_index is not None else None
+        small = self._small(frame, roi)
+        if small is None:
+            return True
+        if (self._ref is None or roi != self._roi or self._ref.shape != small.shape
+                or now - self._last >= self.max_interval):
+            self.changed = 1.0
+        else:
+            diff = cv2.absdiff(small, self._ref)
+            self.changed = np.count_nonzero(diff > self.threshold) / diff.size
+            if self.changed < self.min_area:
+                return False
+        self._ref = small
+        self._roi = roi
+        self._last = now
+        return True
+
+    def reset(self):
+        self._ref = None
@@ -0,0 +1,105 @@
+"""
+Rollup occupancy multi-resolusi (per detik / menit / jam) di dalam proses.
+Tiap frame yang dihitung dilipat ke bucket terbuka tiap resolusi (min, max,
+jumlah, sampel); saat bucket berganti, bucket lama ditutup ke ring array
+berukuran tetap. drain() mengembalikan bucket tertutup yang belum diambil
+sebagai baris DB (lihat DBManager.insert_rollups), jadi memori tetap O(keep)
+berapa pun lama counting berjalan.
+"""
+from datetime import datetime
+
+import numpy as np
+
+RESOLUTIONS = (("1s", 1), ("1m", 60), ("1h", 3600))
+
+class _Level:
+    def __init__(self, name, sec, keep):
+        self.name = name
+        self.sec = sec
+        self.keep = max(1, int(keep))
+        self.start = np.zeros(self.keep, np.int64)      # epoch awal bucket
+        self.min = np.zeros(self.keep, np.int32)
+        self.max = np.zeros(self.keep, np.int32)
+        self.sum = np.zeros(self.keep, np.float64)
+        self.n = np.zeros(self.keep, np.int32)
+        self.closed = 0             # total bucket tertutup (posisi ring = closed % keep)
+        self.drained = 0
+        self.bucket = None          # bucket terbuka
+        self.b_min = self.b_max = self.b_n = 0
+        self.b_sum = 0.0
+
+    def add(self, occ, ts):
+        b = int(ts // self.sec)
+        if self.bucket is None or b > self.bucket:
+            self.close()
+            self.bucket = b
+            self.b_min = self.b_max = occ
+            self.b_sum, self.b_n = 0.0, 0
+        elif occ < self.b_min:
+            self.b_min = occ
+        elif occ > self.b_max:
+            self.b_max = occ
+        self.b_sum += occ
+        self.b_n += 1
+
+    def close(self):
+        if self.bucket is None or self.b_n == 0:
+            return
+        i = self.closed % self.keep
+        self.start[i] = self.bucket * self.sec
+        self.min[i], self.max[i] = self.b_min, self.b_max
+        self.sum[i], self.n[i] = self.b_sum, self.b_n
+        self.closed += 1
+        self.bucket = None
+        self.b_n = 0
+
+    def _idx(self, first, last):
+        return np.arange(first, last) % self.keep
+
+    def take(self):
+        """Index ring bucket tertutup yang belum di-drain (yang tertimpa hilang)."""
+        first = max(self.drained, self.closed - self.keep)
+        idx = self._idx(first, self.closed)
+        self.drained = self.closed
+        return idx
+
+    def series(self):
+        idx = self._idx(max(0, self.closed - self.keep), self.closed)
+        n = self.n[idx]
+        return {"start": self.start[idx], "min": self.min[idx], "max": self.max[idx],
+                "mean": self.sum[idx] / np.maximum(n, 1), "samples": n}
+
+class OccupancyRollup:
+    def __init__(self, cfg: dict, source="default"):
+        self.source = source
+        keep = cfg.get("keep", {})
+        self.persist = set(cfg.get("persist", [name for name, _ in RESOLUTIONS]))
+        self.levels = {name: _Level(name, sec, keep.get(name, 3600 if sec == 1 else 1440 if sec == 60 else 168))
+                       for name, sec in RESOLUTIONS}
+
+    def add(self, occ, ts):
+        occ = int(occ)
+        for lv in self.levels.values():
+            lv.add(occ, ts)
+
+    def close(self):
+        """Tutup bucket yang masih terbuka (shutdown); bucket parsial ikut di-drain."""
+        for lv in self.levels.values():
+            lv.close()
+
+    def drain(self):
+        """→ baris (bucket_start, resolution, source, occ_min, occ_max, occ_mean, samples)."""
+        rows = []
+        for name, lv in self.levels.items():
+            idx = lv.take()
+            if name not in self.persist:
+                continue
+            for i in idx:
+                n = int(lv.n[i])
+                rows.append((datetime.fromtimestamp(int(lv.start[i])), name, self.source,
+                             int(lv.min[i]), int(lv.max[i]), round(float(lv.sum[i]) / n, 3), n))
+        return rows
+
+    def series(self, name):
+        """Bucket tertutup yang masih di ring untuk satu resolusi, terlama dulu."""
+        return self.levels[name].series()
@@ -1,3 +1,4 @@
+import threading
 import numpy as np
 from PIL import ImageGrab
 try:
@@ -9,7 +10,7 @@ except Exception:
 class ScreenCapturer:
     def __init__(self, use_mss=True):
         self.use_mss = use_mss and HAS_MSS
-        self._sct = None
+        self._local = threading.local()   # instance mss tidak boleh dipakai lintas thread
     def grab(self, region):
         if not region:
             return None
@@ -17,10 +18,11 @@ class ScreenCapturer:
         w,h = (r-l),(b-t)
         if self.use_mss:
             try:
-                if self._sct is None:
-                    self._sct = mss.mss()
+                sct = getattr(self._local, "sct", None)
+                if sct is None:
+                    sct = self._local.sct = mss.mss()
                 mon = {"left":l,"top":t,"width":w,"height":h}
-                arr = np.array(self._sct.grab(mon))
+                arr = np.array(sct.grab(mon))
                 import cv2
                 return cv2.cvtColor(arr, cv2.COLOR_BGRA2BGR)
             except Exception:
@@ -0,0 +1,63 @@
+"""
+Antrian antar stage pipeline (capture → inferensi → render).
+Bounded + drop-oldest: put tidak pernah blok, item tertua dibuang bila penuh.
+"""
+import threading
+from collections import deque
+
+class DropOldestQueue:
+    def __init__(self, maxsize=2):
+        self.maxsize = max(1, int(maxsize))
+        self._q = deque()
+        self._cond = threading.Condition()
+        self.dropped = 0
+
+    def put(self, item):
+        with self._cond:
+            if len(self._q) >= self.maxsize:
+                self._q.popleft()
+                self.dropped += 1
+            self._q.append(item)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Item tertua, atau None bila timeout."""
+        with self._cond:
+            if not self._q:
+                self._cond.wait_for(lambda: len(self._q) > 0, timeout)
+            if not self._q:
+                return None
+            return self._q.popleft()
+
+    def get_latest(self, timeout=None):
+        """Item terbaru (sisanya dibuang & dihitung dropped), atau None bila timeout."""
+        with self._cond:
+            if not self._q:
+                self._cond.wait_for(lambda: len(self._q) > 0, timeout)
+            if not self._q:
+                return None
+            item = self._q.pop()
+            self.dropped += len(self._q)
+            self._q.clear()
+            return item
+
+    def depth(self):
+        return len(self._q)
+
+    def clear(self):
+        with self._cond:
+            self._q.clear()
+
+class StageStats:
+    """Latensi per stage (ms): nilai terakhir + EMA."""
+    def __init__(self, alpha=0.1):
+        self.alpha = alpha
+        self.count = 0
+        self.last_ms = 0.0
+        self.avg_ms = 0.0
+
+    def add(self, seconds):
+        ms = seconds * 1000.0
+        self.last_ms = ms
+        self.avg_ms = ms if self.count == 0 else self.avg_ms + self.alpha * (ms - self.avg_ms)
+        self.count += 1
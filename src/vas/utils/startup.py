@@ -0,0 +1,31 @@
+"""
+Waktu startup sejak proses mulai (modul ini diimpor paling awal):
+launch → UI siap → model dimuat → warm-up → frame pertama terhitung.
+"""
+import time
+
+_T0 = time.perf_counter()
+
+class StartupReport:
+    def __init__(self, t0=None):
+        self.t0 = _T0 if t0 is None else t0
+        self.marks = {}
+
+    def mark(self, name):
+        """Catat sekali per tahap → detik sejak launch."""
+        if name not in self.marks:
+            self.marks[name] = time.perf_counter() - self.t0
+            try:
+                from ..metrics import STARTUP_SECONDS
+                STARTUP_SECONDS.labels(stage=name).set(round(self.marks[name], 3))
+            except Exception:
+                pass
+        return self.marks[name]
+
+    def has(self, name):
+        return name in self.marks
+
+    def describe(self):
+        return " ".join(f"{k}={v:.2f}s" for k, v in self.marks.items())
+
+STARTUP = StartupReport()
@@ -0,0 +1,67 @@
+"""
+Kontrol detection_stride (dan opsional imgsz) berdasarkan beban terukur.
+Latency inferensi dan interval kedatangan frame di-EMA; tiap interval_sec:
+  stride = ceil(latency / (target_share * interval_frame))
+yaitu inferensi memakan maksimal target_share dari waktu antar frame.
+Jika adapt_imgsz aktif, imgsz diturunkan/dinaikkan per 32 px agar latency
+satu inferensi mendekati target_latency_ms.
+"""
+import math
+import time
+
+class StrideController:
+    def __init__(self, cfg: dict, base_stride=1, base_imgsz=640):
+        self.enabled = bool(cfg.get("enable", False))
+        self.target_share = max(0.05, float(cfg.get("target_share", 0.6)))
+        self.min_stride = max(1, int(cfg.get("min_stride", 1)))
+        self.max_stride = max(self.min_stride, int(cfg.get("max_stride", 8)))
+        self.adapt_imgsz = bool(cfg.get("adapt_imgsz", False))
+        self.target_latency_ms = float(cfg.get("target_latency_ms", 100))
+        self.min_imgsz = int(cfg.get("min_imgsz", 320))
+        self.max_imgsz = int(cfg.get("max_imgsz") or base_imgsz)
+        self.interval_sec = float(cfg.get("interval_sec", 1.0))
+        self.alpha = 0.2
+        self.stride = min(max(int(base_stride), self.min_stride), self.max_stride)
+        self.imgsz = int(base_imgsz)
+        self.latency_ms = 0.0       # EMA latency inferensi
+        self.frame_ms = 0.0         # EMA interval kedatangan frame
+        self._last_ts = None
+        self._last_seq = None
+        self._next_eval = 0.0
+
+    def _ema(self, cur, v):
+        return v if cur == 0.0 else cur + self.alpha * (v - cur)
+
+    def observe_frame(self, ts, seq=None):
+        """seq: nomor urut frame dari source; frame yang terlewat ikut dihitung."""
+        if self._last_ts is not None and ts > self._last_ts:
+            n = 1
+            if seq is not None and self._last_seq is not None and seq > self._last_seq:
+                n = seq - self._last_seq
+            self.frame_ms = self._ema(self.frame_ms, (ts - self._last_ts) * 1000.0 / n)
+        self._last_ts = ts
+        self._last_seq = seq
+
+    def observe_inference(self, seconds, now=None):
+        self.latency_ms = self._ema(self.latency_ms, seconds * 1000.0)
+        now = time.monotonic() if now is None else now
+        if now >= self._next_eval:
+            self._next_eval = now + self.interval_sec
+            self._adjust()
+
+    def _adjust(self):
+        if self.latency_ms <= 0 or self.frame_ms <= 0:
+            return
+        want = math.ceil(self.latency_ms / (self.target_share * self.frame_ms))
+        # turun satu per satu (hindari osilasi), naik langsung ke kebutuhan
+        if want < self.stride:
+            want = self.stride - 1
+        self.stride = min(max(want, self.min_stride), self.max_stride)
+        if self.adapt_imgsz:
+            if self.latency_ms > self.target_latency_ms * 1.1 and self.imgsz > self.min_imgsz:
+                self.imgsz = max(self.min_imgsz, self.imgsz - 32)
+            elif self.latency_ms < self.target_latency_ms * 0.6 and self.imgsz < self.max_imgsz:
+                self.imgsz = min(self.max_imgsz, self.imgsz + 32)
+
+    def describe(self):
+        return f"stride={self.stride} ({self.min_stride}-{self.max_stride}) imgsz={self.imgsz}"
@@ -0,0 +1,47 @@
+"""
+Tiling frame besar (4K / RTSP lebar) untuk inferensi per tile + NMS lintas
+tile, sehingga orang kecil tidak hilang saat frame diperkecil ke imgsz.
+"""
+import numpy as np
+
+def _starts(length, tile, step):
+    if length <= tile:
+        return [0]
+    starts = list(range(0, length - tile, step))
+    starts.append(length - tile)        # tile terakhir rata ke tepi, ukuran tetap penuh
+    return starts
+
+def tile_grid(x1, y1, x2, y2, tile=640, overlap=0.2):
+    """Tile bertumpuk yang menutup region (x1,y1,x2,y2) → list (x1,y1,x2,y2)."""
+    tile = int(tile)
+    step = max(1, int(tile * (1.0 - overlap)))
+    w, h = x2 - x1, y2 - y1
+    return [(x1 + sx, y1 + sy, x1 + min(sx + tile, w), y1 + min(sy + tile, h))
+            for sy in _starts(h, tile, step) for sx in _starts(w, tile, step)]
+
+def nms(dets: np.ndarray, thr=0.5, metric="ios") -> np.ndarray:
+    """
+    NMS greedy (class-agnostic) pada array N x 6 → array terpilih.
+    metric "ios" (intersection / area terkecil) juga menggabungkan box
+    terpotong di tepi tile dengan box utuhnya; "iou" untuk NMS biasa.
+    """
+    if len(dets) <= 1:
+        return dets
+    x1, y1, x2, y2, conf = dets[:, 0], dets[:, 1], dets[:, 2], dets[:, 3], dets[:, 4]
+    area = np.maximum(0, x2 - x1) * np.maximum(0, y2 - y1)
+    order = np.argsort(-conf)
+    keep = []
+    while order.size:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        iw = np.maximum(0, np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]))
+        ih = np.maximum(0, np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]))
+        inter = iw * ih
+        if metric == "ios":
+            denom = np.minimum(area[i], area[rest])
+        else:
+            denom = area[i] + area[rest] - inter
+        overlap = inter / np.maximum(denom, 1e-6)
+        order = rest[overlap <= thr]
+    return dets[np.asarray(keep)]
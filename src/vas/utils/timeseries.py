@@ -0,0 +1,80 @@
+"""
+Time series jendela geser untuk statistik occupancy per frame.
+Append dan expiry amortized O(1) (deque); min / max lewat monotonic deque,
+mean lewat jumlah berjalan — biaya tetap berapa pun FPS dan panjang jendela.
+"""
+from collections import deque
+
+class SlidingWindow:
+    """Sampel (t, v) dengan umur <= window_sec detik."""
+    def __init__(self, window_sec):
+        self.window = float(window_sec)
+        self._q = deque()
+        self._min = deque()     # v naik dari kiri ke kanan
+        self._max = deque()     # v turun dari kiri ke kanan
+        self._sum = 0
+
+    def append(self, t, v):
+        self._q.append((t, v))
+        self._sum += v
+        while self._min and self._min[-1][1] >= v:
+            self._min.pop()
+        self._min.append((t, v))
+        while self._max and self._max[-1][1] <= v:
+            self._max.pop()
+        self._max.append((t, v))
+        self.expire(t)
+
+    def expire(self, now):
+        cutoff = now - self.window
+        q = self._q
+        while q and q[0][0] < cutoff:
+            self._sum -= q.popleft()[1]
+        while self._min and self._min[0][0] < cutoff:
+            self._min.popleft()
+        while self._max and self._max[0][0] < cutoff:
+            self._max.popleft()
+
+    def __len__(self):
+        return len(self._q)
+
+    def __bool__(self):
+        return bool(self._q)
+
+    def last(self):
+        return self._q[-1][1] if self._q else None
+
+    def mean(self):
+        return self._sum / len(self._q) if self._q else 0.0
+
+    def min(self):
+        return self._min[0][1] if self._min else None
+
+    def max(self):
+        return self._max[0][1] if self._max else None
+
+class LagBuffer:
+    """
+    Nilai sampel terbaru yang umurnya >= lag detik (mis. baseline surge),
+    selama umurnya masih <= max_age. Amortized O(1) per append.
+    """
+    def __init__(self, lag, max_age=None):
+        self.lag = float(lag)
+        self.max_age = float(max_age) if max_age else None
+        self._q = deque()
+        self._base = None       # (t, v)
+
+    def append(self, t, v):
+        self._q.append((t, v))
+        self.advance(t)
+
+    def advance(self, now):
+        q = self._q
+        while q and now - q[0][0] >= self.lag:
+            self._base = q.popleft()
+
+    def value(self, now):
+        self.advance(now)
+        if self._base is None or (self.max_age is not None and now - self._base[0] > self.max_age):
+            return None
+        return self._base[1]
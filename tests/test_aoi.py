@@ -0,0 +1,35 @@
+import numpy as np
+from vas.utils.aoi import AOIIndex, count_in_aoi
+
+def point_in_poly(pt, poly):
+    """Ray-casting referensi (implementasi lama tracker) untuk membandingkan mask AOIIndex."""
+    x, y = pt
+    inside = False
+    for i in range(len(poly)):
+        x1, y1 = poly[i]
+        x2, y2 = poly[(i + 1) % len(poly)]
+        if ((y1 > y) != (y2 > y)) and x < (x2 - x1) * (y - y1) / ((y2 - y1) or 1e-6) + x1:
+            inside = not inside
+    return inside
+
+def test_rect_and_empty():
+    idx = AOIIndex("rect", [10,10,50,50])
+    assert idx.contains([[10,10],[50,50],[51,20],[0,0]]).tolist() == [True,True,False,False]
+    assert AOIIndex("rect", None).contains([[999,999]]).tolist() == [True]
+
+def test_poly_matches_ray_casting():
+    poly = [[20,10],[90,30],[70,90],[30,70],[10,40]]
+    idx = AOIIndex("poly", None, poly)
+    rng = np.random.default_rng(0)
+    pts = rng.integers(0, 100, size=(500,2))
+    got = idx.contains(pts)
+    # abaikan titik tepat di tepi (raster vs ray-casting bisa beda)
+    for (x,y), g in zip(pts.tolist(), got.tolist()):
+        near = [point_in_poly((x+dx,y+dy), poly) for dx in (-1,0,1) for dy in (-1,0,1)]
+        if all(near) or not any(near):
+            assert g == near[4]
+
+def test_count_in_aoi():
+    dets = np.array([[0,0,20,20,.9,0],[100,100,120,120,.9,0]], dtype=np.float32)
+    occ, inside = count_in_aoi(dets, AOIIndex("rect", [0,0,50,50]))
+    assert occ == 1 and inside.tolist() == [True, False]
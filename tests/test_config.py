@@ -0,0 +1,15 @@
+from vas.config import DEFAULT_SETTINGS, parse_setting
+
+def test_db_settings_round_trip_every_key():
+    # dialog DB Settings: Entry berisi str(nilai), Save mem-parse balik per key
+    db = DEFAULT_SETTINGS["database"]
+    saved = {k: parse_setting(v, str(v)) for k, v in db.items()}
+    assert saved == db
+    assert all(type(saved[k]) is type(v) for k, v in db.items())
+
+def test_parse_setting_types():
+    assert parse_setting(False, "True") is True and parse_setting(True, "off") is False
+    assert parse_setting(0, "0.5") == 0.5           # record_interval_sec pecahan
+    assert parse_setting(3306, " 3307 ") == 3307
+    assert parse_setting(0.25, "1") == 1.0
+    assert parse_setting("localhost", " db ") == "db"
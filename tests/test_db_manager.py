@@ -0,0 +1,60 @@
+import threading
+import time
+from datetime import datetime
+
+from vas import db_manager
+from vas.storage.base import StorageBackend
+
+class FakeStore(StorageBackend):
+    name = "fake"
+    fail = 0                # jumlah write_batch pertama yang gagal
+
+    def __init__(self, cfg):
+        self.persons, self.rollups, self.calls = [], [], 0
+        self.lock = threading.Lock()
+
+    def write_batch(self, person_counts=(), rollups=()):
+        with self.lock:
+            self.calls += 1
+            if self.calls <= self.fail:
+                raise ConnectionError("db mati")
+            self.persons += person_counts
+            self.rollups += rollups
+
+def _manager(monkeypatch, fail, **cfg):
+    monkeypatch.setitem(db_manager.BACKENDS, "fake", FakeStore)
+    monkeypatch.setattr(FakeStore, "fail", fail)
+    monkeypatch.setattr(db_manager, "DB_CONFIG", {"enable": True, "type": "fake", "batch_size": 10,
+                                                  "batch_wait_ms": 50, **cfg})
+    status = []
+    return db_manager.DBManager(status.append), status
+
+def _wait(cond, timeout=2.0):
+    end = time.monotonic() + timeout
+    while not cond() and time.monotonic() < end:
+        time.sleep(0.005)
+    return cond()
+
+def test_failed_batch_is_requeued_in_order(monkeypatch):
+    db, status = _manager(monkeypatch, fail=1)
+    for occ in range(3):
+        db.insert_person_snapshot(occ, source="cam1")
+    rollup = (datetime(2024, 5, 1, 12, 0), "1m", "cam1", 0, 2, 1.0, 60)
+    db.insert_rollups([rollup])
+    assert _wait(lambda: db.backend.calls >= 1)
+    assert db.flush(timeout=2)          # flush membatalkan backoff → langsung dicoba ulang
+    assert [r[1] for r in db.backend.persons] == [0, 1, 2]
+    assert db.backend.rollups == [rollup]
+    assert db.written == 4 and db.dropped == 0
+    assert status == [False, True]
+    db.close()
+
+def test_queue_is_trimmed_oldest_first(monkeypatch):
+    db, _ = _manager(monkeypatch, fail=10 ** 6, queue_max=3, batch_wait_ms=0)
+    for occ in range(5):
+        db.insert_person_snapshot(occ)
+    # setelah gagal, baris dikembalikan ke depan antrian lalu dipangkas ke queue_max
+    assert _wait(lambda: db.backend.calls >= 1 and db._inflight == 0)
+    assert [row[1] for _, row in db._q] == [2, 3, 4]
+    assert db.dropped == 2 and db.queue_depth() == 3
+    db.close(flush=False)
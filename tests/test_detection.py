@@ -0,0 +1,86 @@
+import types
+
+import numpy as np
+
+from vas.config import MODEL_CONFIG, RUNTIME_CONFIG
+from vas.detection import (aoi_crop_window, boxes_to_array, detect_persons_array, detect_persons_batch_array,
+                           rect_imgsz)
+from vas.utils.aoi import AOIIndex
+
+def _frame(k):
+    return np.full((32, 48, 3), k, np.uint8)
+
+class TagModel:
+    """Satu box per frame dengan x1 = nilai piksel frame; mencatat ukuran tiap batch."""
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, src, **kw):
+        frames = src if isinstance(src, list) else [src]
+        self.calls.append(len(frames))
+        return [types.SimpleNamespace(boxes=types.SimpleNamespace(
+            data=np.array([[fr[0, 0, 0], 0, 40, 30, .9, 0]], np.float32))) for fr in frames]
+
+def _tags(dets):
+    return [int(d[0, 0]) for d in dets]
+
+def test_batch_array_keeps_order_and_chunks(monkeypatch):
+    monkeypatch.setitem(RUNTIME_CONFIG, "tiled", False)
+    monkeypatch.setitem(MODEL_CONFIG, "detection_confidence", 0.0)
+    model = TagModel()
+    dets = detect_persons_batch_array(model, [_frame(k) for k in range(7)], 3)
+    assert _tags(dets) == list(range(7))
+    assert model.calls == [3, 3, 1]
+    assert detect_persons_batch_array(model, []) == []
+
+def test_boxes_to_array_masks_class_conf_and_size():
+    data = np.array([[0, 0, 20, 40, .9, 0],       # orang
+                     [0, 0, 20, 40, .9, 2],       # mobil
+                     [0, 0, 20, 40, .2, 0],       # conf rendah
+                     [0, 0, 5, 40, .9, 0],        # terlalu sempit
+                     [10, 10, 30, 50, .8, 2]], np.float32)
+    assert boxes_to_array(data, min_conf=0.5).tolist() == data[[0, 3]].tolist()
+    assert boxes_to_array(data, min_conf=0.5, min_size=10).tolist() == data[[0]].tolist()
+    assert boxes_to_array(data, classes=(0, 2), min_conf=0.5, min_size=10).tolist() == data[[0, 1, 4]].tolist()
+    assert boxes_to_array(types.SimpleNamespace(data=data[:0])).shape == (0, 6)
+
+def test_boxes_to_array_drops_track_id_column():
+    tracked = np.array([[0, 0, 20, 40, 7, .9, 0]], np.float32)     # x1 y1 x2 y2 id conf cls
+    assert boxes_to_array(tracked).tolist() == [[0, 0, 20, 40, np.float32(.9), 0]]
+
+class CropModel:
+    """Box tetap dalam koordinat input model; mencatat shape input dan imgsz."""
+    def __init__(self):
+        self.seen = []
+
+    def __call__(self, src, imgsz=None, **kw):
+        frames = src if isinstance(src, list) else [src]
+        self.seen += [(fr.shape[:2], imgsz) for fr in frames]
+        data = np.array([[10, 5, 30, 50, .9, 0]], np.float32)
+        return [types.SimpleNamespace(boxes=types.SimpleNamespace(data=data.copy())) for _ in frames]
+
+def test_rect_imgsz_keeps_aspect_in_stride_multiples():
+    assert rect_imgsz(1920, 131, 640) == [64, 640]
+    assert rect_imgsz(300, 600, 640) == [608, 320]      # tidak di-upscale melebihi potongan
+    assert rect_imgsz(200, 100, 640) == [128, 224]
+    for w, h in ((1000, 250), (333, 777), (50, 40)):
+        ih, iw = rect_imgsz(w, h, 640)
+        assert ih % 32 == 0 and iw % 32 == 0
+        assert abs(iw / ih - w / h) < 32 / min(ih, iw)
+
+def test_aoi_crop_maps_boxes_back_to_frame(monkeypatch):
+    monkeypatch.setitem(RUNTIME_CONFIG, "tiled", False)
+    monkeypatch.setitem(RUNTIME_CONFIG, "aoi_crop", True)
+    monkeypatch.setitem(MODEL_CONFIG, "detection_confidence", 0.0)
+    frame = np.zeros((480, 640, 3), np.uint8)
+    aoi = AOIIndex("rect", [100, 200, 299, 299], None)
+    assert aoi_crop_window(frame.shape, aoi, margin=0) == (100, 200, 300, 300)
+    monkeypatch.setitem(RUNTIME_CONFIG, "aoi_crop_margin", 0)
+    model = CropModel()
+    dets = detect_persons_array(model, frame, aoi)
+    assert model.seen == [((100, 200), [128, 224])]
+    assert dets[:, :4].tolist() == [[110, 205, 130, 250]]
+    batch = detect_persons_batch_array(model, [frame, frame], 4, aoi)
+    assert [d[:, :4].tolist() for d in batch] == [[[110, 205, 130, 250]]] * 2
+    # AOI mencakup seluruh frame → tanpa crop, tanpa offset
+    assert aoi_crop_window(frame.shape, AOIIndex("rect", [0, 0, 639, 479], None), margin=0) is None
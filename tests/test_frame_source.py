@@ -0,0 +1,68 @@
+import time
+
+import numpy as np
+
+from vas.utils.frame_source import CaptureWorker
+
+FRAME = np.zeros((4, 4, 3), np.uint8)
+
+def test_capture_worker_respects_max_fps():
+    w = CaptureWorker(lambda: FRAME, name="test-rate", max_fps=20).start()
+    time.sleep(0.5)
+    w.stop()
+    assert 5 <= w.frames <= 13
+
+def test_open_capture_uses_dshow_only_on_windows(monkeypatch):
+    import cv2
+    from vas.utils import frame_source
+    calls = []
+    class FakeCap:
+        def __init__(self, *args):
+            calls.append(args)
+        def isOpened(self):
+            return True
+    monkeypatch.setattr(cv2, "VideoCapture", FakeCap)
+    monkeypatch.setattr(frame_source.sys, "platform", "linux")
+    assert frame_source.open_capture("webcam", 1) is not None
+    monkeypatch.setattr(frame_source.sys, "platform", "win32")
+    frame_source.open_capture("webcam", 1)
+    assert calls == [(1, cv2.CAP_ANY), (1, cv2.CAP_DSHOW)]
+
+def test_latest_frame_slot_keeps_newest_and_counts_drops():
+    from vas.utils.frame_source import LatestFrameSlot
+    slot = LatestFrameSlot()
+    assert slot.get(0) is None
+    slot.put("a", ts=1.0)
+    slot.put("b", ts=2.0)                # "a" tertimpa sebelum dibaca
+    assert slot.get(0) == (2, 2.0, "b") and slot.dropped == 1
+    assert slot.get(2) is None and slot.pending() == 0
+    slot.put("c", ts=3.0)
+    assert slot.pending() == 1 and slot.dropped == 1
+    assert slot.get(2, timeout=0.01) == (3, 3.0, "c")
+
+def test_capture_worker_counts_failures_and_frames():
+    seq = iter([None, FRAME, None, FRAME] + [None] * 1000)
+    w = CaptureWorker(lambda: next(seq), name="test-fail", retry_sleep=0.001).start()
+    got = w.slot.get(0, timeout=1.0)
+    time.sleep(0.05)
+    w.stop()
+    assert got is not None and w.frames == 2 and w.failures >= 2
+
+def test_capture_worker_releases_only_after_blocked_read_returns():
+    import threading
+    release = threading.Event()
+    unblock = threading.Event()
+    def read():
+        unblock.wait(5)                  # seperti cap.read() pada RTSP macet
+        return FRAME
+    w = CaptureWorker(read, name="test-hang", on_exit=release.set).start()
+    time.sleep(0.05)
+    assert w.stop(timeout=0.05) is False
+    assert not release.is_set()          # cap belum boleh di-release selama read berjalan
+    unblock.set()
+    assert release.wait(2)
+
+def test_capture_worker_never_started_still_releases():
+    released = []
+    CaptureWorker(lambda: FRAME, name="test-idle", on_exit=lambda: released.append(1)).stop()
+    assert released == [1]
@@ -0,0 +1,14 @@
+from vas.metrics import Registry
+
+def test_render_prometheus_text():
+    reg = Registry()
+    c = reg.counter("t_frames_total", "frames", ["source"])
+    h = reg.histogram("t_latency_seconds", "latency", buckets=(0.01, 0.1))
+    c.labels(source="cam1").inc(3)
+    h.observe(0.05)
+    h.observe(5)
+    text = reg.render()
+    assert 't_frames_total{source="cam1"} 3' in text
+    assert 't_latency_seconds_bucket{le="0.1"} 1' in text
+    assert 't_latency_seconds_bucket{le="+Inf"} 2' in text
+    assert "t_latency_seconds_count 2" in text
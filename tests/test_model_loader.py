@@ -0,0 +1,66 @@
+import types
+
+import numpy as np
+
+from vas.config import RUNTIME_CONFIG
+from vas.detection import detect_persons_batch_array, detect_persons_multi_array
+from vas.model_loader import export_info, export_path, is_exported, mark_static, needs_dynamic
+from vas.utils.aoi import AOIIndex
+
+def test_export_path_tags_hash_imgsz_and_dynamic(tmp_path):
+    pt = tmp_path / "yolov8n.pt"
+    pt.write_bytes(b"bobot")
+    p = export_path(pt, "onnxruntime", 640)
+    assert p.parent == tmp_path and p.name.startswith("yolov8n.") and p.name.endswith(".640.onnx")
+    assert export_path(pt, "openvino", 480, dynamic=True).name.endswith(".480d_openvino_model")
+    pt.write_bytes(b"bobot baru")
+    assert export_path(pt, "onnxruntime", 640) != p      # bobot berubah → ekspor baru
+    assert export_info(p) == (640, False)
+    assert export_info(export_path(pt, "openvino", 480, dynamic=True)) == (480, True)
+    assert export_info("m.abc.640.int8.onnx") == (640, False)
+
+def test_is_exported():
+    assert is_exported("m.onnx") and is_exported("m_openvino_model/") and is_exported("m.engine")
+    assert not is_exported("yolov8n.pt")
+
+def test_needs_dynamic(monkeypatch):
+    monkeypatch.setitem(RUNTIME_CONFIG, "max_batch_size", 1)
+    monkeypatch.setitem(RUNTIME_CONFIG, "tiled", False)
+    monkeypatch.setitem(RUNTIME_CONFIG, "aoi_crop", False)
+    assert not needs_dynamic()
+    monkeypatch.setitem(RUNTIME_CONFIG, "aoi_crop", True)
+    assert needs_dynamic()
+
+class StaticModel:
+    """Seperti ONNX statis: hanya satu frame per panggilan, imgsz ekspor."""
+    def __call__(self, src, imgsz=None, **kw):
+        assert not isinstance(src, list) and imgsz == 640
+        data = np.array([[1, 1, 20, 40, .9, 0]], np.float32)
+        return [types.SimpleNamespace(boxes=types.SimpleNamespace(data=data))]
+
+def test_static_model_is_called_per_frame(monkeypatch):
+    monkeypatch.setitem(RUNTIME_CONFIG, "aoi_crop", True)
+    model = mark_static(StaticModel(), "m.abc.640.onnx")
+    frames = [np.zeros((120, 160, 3), np.uint8)] * 3
+    aoi = AOIIndex.from_config({"mode": "rect", "rect": [0, 0, 80, 60]})
+    assert len(detect_persons_batch_array(model, frames, 4, aoi)) == 3
+    assert len(detect_persons_multi_array(model, frames, [aoi, None, aoi])) == 3
+    assert not hasattr(mark_static(types.SimpleNamespace(), "m.abc.640d.onnx"), "vas_static_imgsz")
+
+def test_mark_static_uses_explicit_imgsz(monkeypatch):
+    monkeypatch.setitem(RUNTIME_CONFIG, "imgsz", 640)
+    assert mark_static(types.SimpleNamespace(), "int8.onnx", 480).vas_static_imgsz == 480
+    assert mark_static(types.SimpleNamespace(), "m.abc.320.int8.onnx", 480).vas_static_imgsz == 320
+
+def test_save_keys_only_touches_given_keys(tmp_path, monkeypatch):
+    import json
+    from vas import config
+    f = tmp_path / "settings.json"
+    f.write_text(json.dumps({"model": {"model_path": "a.pt", "conf": 0.3}, "runtime": {"imgsz": 640}}))
+    monkeypatch.setattr(config, "SETTINGS_FILE", f)
+    s = config.Settings()
+    s.data["runtime"]["imgsz"] = 320            # config runtime di memori tidak ikut ditulis
+    s.save_keys("model", model_path="b.int8.onnx", backend="onnxruntime")
+    assert json.loads(f.read_text()) == {"model": {"model_path": "b.int8.onnx", "conf": 0.3, "backend": "onnxruntime"},
+                                         "runtime": {"imgsz": 640}}
+    assert s.data["model"]["backend"] == "onnxruntime"
@@ -0,0 +1,15 @@
+import numpy as np
+from vas.utils.aoi import AOIIndex
+from vas.utils.motion import MotionGate
+
+def test_static_scene_skips_until_motion_or_refresh():
+    gate = MotionGate({"max_interval_sec": 10})
+    aoi = AOIIndex("rect", [0, 100, 319, 239])
+    fr = np.full((240, 320, 3), 60, np.uint8)
+    assert gate.should_infer(fr, aoi, now=0.0)
+    assert not gate.should_infer(fr, aoi, now=1.0)
+    moved = fr.copy(); moved[0:50, 0:50] = 255      # di luar AOI
+    assert not gate.should_infer(moved, aoi, now=2.0)
+    moved[150:200, 100:150] = 255                    # di dalam AOI
+    assert gate.should_infer(moved, aoi, now=3.0)
+    assert gate.should_infer(moved, aoi, now=13.5)   # refresh paksa
@@ -0,0 +1,60 @@
+import csv
+import threading
+import time
+import types
+
+import cv2
+import numpy as np
+
+from vas import offline
+
+class SlowModel:
+    """Model palsu: panggilan pertama macet `delay` detik (CPU mini-PC), sisanya instan."""
+    def __init__(self, delay):
+        self.delay = delay
+    def __call__(self, src, **kw):
+        frames = src if isinstance(src, list) else [src]
+        time.sleep(self.delay)
+        self.delay = 0
+        data = np.array([[10, 10, 40, 80, .9, 0]], np.float32)
+        return [types.SimpleNamespace(boxes=types.SimpleNamespace(data=data)) for _ in frames]
+
+def write_clip(path, n):
+    vw = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 25, (64, 48))
+    for i in range(n):
+        vw.write(np.full((48, 64, 3), i * 5 % 255, np.uint8))
+    vw.release()
+
+def run_with_deadline(fn, timeout):
+    res = {}
+    def target():
+        try:
+            res["out"] = fn()
+        except Exception as e:
+            res["err"] = e
+    th = threading.Thread(target=target, daemon=True)
+    th.start()
+    th.join(timeout)
+    assert not th.is_alive(), "process_video hang"
+    return res
+
+def test_process_video_finishes_with_slow_model(tmp_path):
+    clip, out = tmp_path / "clip.avi", tmp_path / "out.csv"
+    # batch_size=1 → antrian 4: 1 frame di model + 4 di antrian = seluruh klip, jadi
+    # marker akhir menunggu antrian penuh selama model macet (> 1 detik)
+    write_clip(clip, 5)
+    res = run_with_deadline(lambda: offline.process_video(clip, out, SlowModel(1.05), stride=1, batch_size=1), 30)
+    assert res["out"]["frames"] == 5
+    with open(out, newline="") as f:
+        rows = list(csv.reader(f))
+    assert len(rows) == 6 and rows[1][2] == "1"
+
+def test_reader_error_is_raised(tmp_path, monkeypatch):
+    clip, out = tmp_path / "clip.avi", tmp_path / "out.csv"
+    write_clip(clip, 4)
+    def broken(cap, stride=1, seek_threshold=30):
+        yield 0, np.zeros((48, 64, 3), np.uint8)
+        raise IOError("decode gagal")
+    monkeypatch.setattr(offline, "iter_frames", broken)
+    res = run_with_deadline(lambda: offline.process_video(clip, out, SlowModel(0), batch_size=2), 10)
+    assert isinstance(res.get("err"), IOError)
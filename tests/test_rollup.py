@@ -0,0 +1,24 @@
+from vas.utils.rollup import OccupancyRollup
+
+def test_rollup_closes_buckets_per_resolution():
+    r = OccupancyRollup({}, source="cam1")
+    for i in range(300):            # 2.5 menit, 2 frame per detik
+        r.add(i % 5, 1000 * 3600 + i * 0.5)
+    rows = r.drain()
+    secs = [row for row in rows if row[1] == "1s"]
+    mins = [row for row in rows if row[1] == "1m"]
+    assert len(secs) == 149 and len(mins) == 2
+    assert all(row[2] == "cam1" and row[6] == 2 for row in secs)
+    assert mins[0][3:] == (0, 4, 2.0, 120)
+    assert r.drain() == []
+    r.close()
+    assert [row[1] for row in r.drain()] == ["1s", "1m", "1h"]
+
+def test_rollup_ring_is_bounded():
+    r = OccupancyRollup({"keep": {"1s": 10}, "persist": ["1s"]})
+    for i in range(100):
+        r.add(i, float(i))
+    rows = r.drain()
+    assert len(rows) == 10 and rows[-1][3] == 98
+    s = r.series("1s")
+    assert len(s["start"]) == 10 and s["max"][-1] == 98
@@ -0,0 +1,42 @@
+import pytest
+
+from vas.config import INPUT_CONFIG
+from vas.sources import DEFAULT_SOURCE, source_configs
+
+def test_no_sources_falls_back_to_global_input():
+    cfgs = source_configs([])
+    assert [c["name"] for c in cfgs] == [DEFAULT_SOURCE]
+    assert cfgs[0]["input"] is INPUT_CONFIG
+
+def test_sources_inherit_global_keys():
+    cfgs = source_configs([
+        {"name": "curug", "input": {"type": "network", "stream_url": "rtsp://cam1"}, "aoi": {"rect": [0, 0, 5, 5]}},
+        {"input": {"type": "webcam", "webcam_index": 1}},
+        {"name": "mati", "enable": False},
+    ])
+    assert [c["name"] for c in cfgs] == ["curug", "source1"]
+    assert cfgs[0]["input"]["stream_url"] == "rtsp://cam1"
+    assert cfgs[0]["aoi"]["rect"] == [0, 0, 5, 5] and "polygon" in cfgs[0]["aoi"]
+    assert cfgs[1]["aoi"] == {"mode": "rect", "rect": None, "polygon": []}     # seluruh frame
+    assert cfgs[1]["input"]["file_stride"] == INPUT_CONFIG["file_stride"]
+
+def test_duplicate_source_names_rejected():
+    with pytest.raises(ValueError):
+        source_configs([{"name": "a"}, {"name": "a"}])
+
+def test_all_disabled_or_file_sources_rejected():
+    with pytest.raises(ValueError):
+        source_configs([{"name": "a", "enable": False}])
+    with pytest.raises(ValueError):
+        source_configs([{"name": "a", "input": {"type": "file", "file_path": "x.mp4"}}])
+
+def test_source_rect_not_shadowed_by_global_poly(monkeypatch):
+    from vas.config import AOI_CONFIG
+    from vas.utils.aoi import AOIIndex
+    monkeypatch.setitem(AOI_CONFIG, "mode", "poly")
+    monkeypatch.setitem(AOI_CONFIG, "polygon", [[0, 0], [50, 0], [50, 50]])
+    cfgs = source_configs([{"name": "a", "aoi": {"rect": [10, 10, 20, 20]}}, {"name": "b"},
+                           {"name": "c", "aoi": {"polygon": [[0, 0], [9, 0], [9, 9]]}}])
+    assert AOIIndex.from_config(cfgs[0]["aoi"]).kind == "rect"
+    assert AOIIndex.from_config(cfgs[1]["aoi"]).is_empty()
+    assert AOIIndex.from_config(cfgs[2]["aoi"]).kind == "poly"
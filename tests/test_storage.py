@@ -0,0 +1,75 @@
+from datetime import datetime
+
+from vas.storage import sync
+from vas.storage.sqlite_store import SQLiteStore, sqlite_connect
+
+T0 = datetime(2024, 5, 1, 12, 0, 0)
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def executemany(self, sql, rows):
+        self.conn.pending.extend((sql, tuple(r)) for r in rows)
+
+class FakeMySQL:
+    def __init__(self):
+        self.rows, self.pending, self.closed = [], [], False
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.rows.extend(self.pending)
+        self.pending = []
+
+    def close(self):
+        self.closed = True
+
+def _write(store):
+    store.write_batch([(T0, 3, None, "cam1"), (T0, 4, "alert", "cam2")],
+                      [(T0, "1m", "cam1", 1, 5, 3.25, 120)])
+
+def test_sqlite_store_round_trip(tmp_path):
+    store = SQLiteStore({"sqlite_path": str(tmp_path / "vas.db")})
+    _write(store)
+    store.close()
+    conn = sqlite_connect(str(tmp_path / "vas.db"))
+    assert conn.execute("SELECT created_at, occupancy, note, source FROM vas_person_counts ORDER BY id").fetchall() == [
+        ("2024-05-01 12:00:00", 3, None, "cam1"), ("2024-05-01 12:00:00", 4, "alert", "cam2")]
+    assert conn.execute("SELECT bucket_start, resolution, source, occ_min, occ_max, occ_mean, samples "
+                        "FROM vas_occupancy_rollups").fetchall() == [("2024-05-01 12:00:00", "1m", "cam1", 1, 5, 3.25, 120)]
+    conn.close()
+
+def test_sync_sqlite_to_mysql_is_resumable(tmp_path, monkeypatch):
+    mconns = []
+    def connect(cfg):
+        mconns.append(FakeMySQL())
+        return mconns[-1]
+    monkeypatch.setattr(sync, "mysql_connect", connect)
+    monkeypatch.setattr(sync, "init_mysql_tables", lambda conn: None)
+    store = SQLiteStore({"sqlite_path": str(tmp_path / "vas.db")})
+    _write(store)
+    store.close()
+    lconn = sqlite_connect(str(tmp_path / "vas.db"))
+
+    assert sync.sync_sqlite_to_mysql(mysql_cfg={}, batch=1, sqlite_conn=lconn) == 3
+    rows = mconns[0].rows
+    assert [r[0] for r in rows] == [sync.SYNC_INSERT_PERSON_COUNT] * 2 + [sync.SYNC_INSERT_ROLLUP]
+    origin = sync.sync_origin(lconn)
+    assert rows[1][1] == ("2024-05-01 12:00:00", 4, "alert", "cam2", f"{origin}:2")
+    assert rows[2][1] == ("2024-05-01 12:00:00", "1m", "cam1", 1, 5, 3.25, 120, f"{origin}:1")
+    assert mconns[0].closed
+
+    # posisi tersimpan di vas_sync_state: run kedua tidak menduplikasi
+    assert sync.sync_sqlite_to_mysql(mysql_cfg={}, sqlite_conn=lconn) == 0
+    assert mconns[1].rows == []
+
+    # crash setelah commit MySQL, sebelum posisi disimpan → batch terkirim ulang
+    # dengan sync_key yang sama (MySQL melewatinya lewat unique key)
+    with lconn:
+        lconn.execute("DELETE FROM vas_sync_state")
+    assert sync.sync_sqlite_to_mysql(mysql_cfg={}, sqlite_conn=lconn) == 3
+    assert [r[1][-1] for r in mconns[2].rows] == [r[1][-1] for r in rows]
+    assert sync.sync_origin(lconn) == origin
+    lconn.close()
@@ -0,0 +1,36 @@
+from vas.utils.stride_control import StrideController
+
+def _feed(ctl, latency, n, t0=0.0, fps=30.0):
+    """n frame pada fps, satu inferensi per frame; → waktu terakhir."""
+    t = t0
+    for i in range(n):
+        t = t0 + i / fps
+        ctl.observe_frame(t)
+        ctl.observe_inference(latency, now=t)
+    return t
+
+def test_stride_rises_to_load_then_steps_down():
+    ctl = StrideController({"enable": True, "target_share": 0.6, "max_stride": 8, "interval_sec": 1.0})
+    t = _feed(ctl, 0.1, 90)             # 100 ms vs 33 ms/frame → ceil(100 / 20) = 5
+    assert ctl.stride == 5
+    strides = []
+    for k in range(6):                  # beban hilang → turun satu per interval
+        t = _feed(ctl, 0.005, 31, t0=t + 1 / 30)
+        strides.append(ctl.stride)
+    assert strides == [4, 3, 2, 1, 1, 1]
+
+def test_stride_clamped_and_counts_skipped_frames():
+    ctl = StrideController({"enable": True, "max_stride": 3})
+    for i in range(10):                 # seq loncat 2: interval per frame 33 ms, bukan 66 ms
+        ctl.observe_frame(i / 15, seq=2 * i)
+    assert abs(ctl.frame_ms - 1000 / 30) < 1e-6
+    ctl.observe_inference(1.0, now=0.0)
+    assert ctl.stride == 3
+
+def test_imgsz_follows_target_latency():
+    ctl = StrideController({"enable": True, "adapt_imgsz": True, "target_latency_ms": 50, "min_imgsz": 320},
+                           base_imgsz=416)
+    _feed(ctl, 0.2, 4 * 30)
+    assert ctl.imgsz == 320
+    _feed(ctl, 0.01, 6 * 30, t0=10.0)
+    assert ctl.imgsz == 416             # naik lagi, tidak melebihi max_imgsz = base_imgsz
@@ -0,0 +1,45 @@
+import types
+
+import numpy as np
+from vas.config import MODEL_CONFIG, RUNTIME_CONFIG
+from vas.detection import detect_persons_tiled_array
+from vas.utils.aoi import AOIIndex
+from vas.utils.tiling import tile_grid, nms
+
+def test_tile_grid_covers_region_with_full_tiles():
+    tiles = tile_grid(0, 0, 1920, 1080, tile=640, overlap=0.25)
+    assert all(x2 - x1 == 640 and y2 - y1 == 640 for x1, y1, x2, y2 in tiles)
+    assert max(t[2] for t in tiles) == 1920 and max(t[3] for t in tiles) == 1080
+
+def test_tiles_outside_aoi_skipped():
+    aoi = AOIIndex("poly", None, [[0, 900], [1919, 900], [1919, 1079], [0, 1079]])
+    tiles = tile_grid(0, 0, 1920, 1080, tile=640, overlap=0.25)
+    assert 0 < sum(aoi.intersects(t) for t in tiles) < len(tiles)
+
+def test_nms_merges_cut_box_across_tiles():
+    dets = np.array([[100, 100, 140, 200, .9, 0],    # box utuh
+                     [100, 100, 140, 150, .6, 0],    # potongan di tepi tile
+                     [400, 100, 440, 200, .8, 0]], np.float32)
+    assert nms(dets, 0.6).tolist() == dets[[0, 2]].tolist()
+
+class ShapeModel:
+    def __init__(self):
+        self.calls = []
+    def __call__(self, src, **kw):
+        frames = src if isinstance(src, list) else [src]
+        self.calls.append([fr.shape[:2] for fr in frames])
+        return [types.SimpleNamespace(boxes=types.SimpleNamespace(data=np.zeros((0, 6), np.float32)))
+                for _ in frames]
+
+def test_tiles_chunked_and_full_pass_uses_aoi_window(monkeypatch):
+    for k, v in {"tile_size": 640, "tile_overlap": 0.25, "tile_with_full": True,
+                 "aoi_crop": True, "aoi_crop_margin": 0, "max_batch_size": 2}.items():
+        monkeypatch.setitem(RUNTIME_CONFIG, k, v)
+    monkeypatch.setitem(MODEL_CONFIG, "detection_confidence", 0.0)
+    model = ShapeModel()
+    aoi = AOIIndex("rect", [0, 400, 1919, 1079], None)
+    detect_persons_tiled_array(model, np.zeros((1080, 1920, 3), np.uint8), aoi)
+    assert all(len(c) <= 2 for c in model.calls)
+    shapes = [s for c in model.calls for s in c]
+    assert shapes[-1] == (680, 1920)            # crop AOI, bukan frame 1080 x 1920
+    assert len(shapes) > 3
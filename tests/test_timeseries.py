@@ -0,0 +1,19 @@
+from vas.utils.timeseries import SlidingWindow, LagBuffer
+
+def test_sliding_window_matches_brute_force():
+    w = SlidingWindow(10)
+    samples = []
+    for i in range(200):
+        t, v = i * 0.5, (i * 7) % 13
+        w.append(t, v)
+        samples = [(st, sv) for st, sv in samples + [(t, v)] if t - st <= 10]
+        vals = [sv for _, sv in samples]
+        assert (w.min(), w.max(), len(w)) == (min(vals), max(vals), len(vals))
+        assert abs(w.mean() - sum(vals) / len(vals)) < 1e-9
+
+def test_lag_buffer_returns_latest_sample_older_than_lag():
+    lag = LagBuffer(60, max_age=600)
+    for t in range(0, 100, 10):
+        lag.append(t, t)
+    assert lag.value(95) == 30
+    assert LagBuffer(60).value(0) is None